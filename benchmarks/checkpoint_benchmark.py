@@ -0,0 +1,52 @@
+"""
+Time a checkpoint costs the simulation thread: writing a snapshot synchronously against the capture of
+a background `Checkpointer`, for a full checkpoint and for a delta after 1% of the agents changed.
+
+Run with `python -m benchmarks.checkpoint_benchmark`.
+"""
+from __future__ import annotations
+import os
+import random
+import tempfile
+import time
+
+from src.checkpoint import Checkpointer
+from src.gene_arrays import GenomeStore
+from src.population import RealTimePopulation
+from src.serialization import write_snapshot
+from .util import BenchGenome
+
+
+def main() -> None:
+    rng = random.Random(0)
+    for num_genomes in (10000, 50000):
+        genomes = [BenchGenome(rng, 8, 4, rng.randint(0, 10)) for _ in range(num_genomes)]
+        population = RealTimePopulation(genomes, energy=1.0)
+        for g in genomes:
+            g.gene_arrays()
+
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            write_snapshot(os.path.join(directory, "sync.snapshot"), GenomeStore.pack(genomes))
+            sync = time.perf_counter() - start
+
+            with Checkpointer(os.path.join(directory, "checkpoints")) as checkpointer:
+                start = time.perf_counter()
+                checkpointer.checkpoint(population)
+                full = time.perf_counter() - start
+                checkpointer.wait()
+
+                for g in rng.sample(genomes, num_genomes // 100):
+                    g.version += 1
+                start = time.perf_counter()
+                checkpointer.checkpoint(population)
+                delta = time.perf_counter() - start
+                checkpointer.wait()
+
+        print(f"genomes={num_genomes:6d}  synchronous write {sync * 1e3:8.2f} ms  |  "
+              f"background capture full {full * 1e3:7.2f} ms  delta {delta * 1e3:7.2f} ms  "
+              f"(written in background {checkpointer.write_time * 1e3:8.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
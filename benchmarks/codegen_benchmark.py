@@ -0,0 +1,41 @@
+"""
+Per-tick latency of a generated network against the generic feed-forward evaluator, and what the
+generation costs when the structure is compiled for the first time and when its code is cached.
+
+Run with `python -m benchmarks.codegen_benchmark`.
+"""
+from __future__ import annotations
+import random
+import time
+
+from src.nn.codegen import GeneratedNetwork
+from src.nn.network import FeedForwardNetwork
+from .util import BenchGenome, timeit
+
+NUM_INPUTS = 8
+NUM_OUTPUTS = 4
+
+
+def main() -> None:
+    rng = random.Random(0)
+    for num_hidden in (0, 10, 50):
+        genome = BenchGenome(rng, NUM_INPUTS, NUM_OUTPUTS, num_hidden)
+        inputs = [rng.random() for _ in range(NUM_INPUTS)]
+        ff = FeedForwardNetwork.create(genome)
+
+        GeneratedNetwork.code_cache.clear()
+        start = time.perf_counter()
+        generated = GeneratedNetwork.create(genome)
+        compile_time = time.perf_counter() - start
+        cached_time = timeit(lambda: GeneratedNetwork.create(genome), 200)
+
+        generic_tick = timeit(lambda: ff.activate(inputs), 5000)
+        generated_tick = timeit(lambda: generated.activate(inputs), 5000)
+        print(f"hidden={num_hidden:3d} connections={len(genome.connections):5d}  "
+              f"generic {generic_tick * 1e6:8.2f} us/tick  generated {generated_tick * 1e6:8.2f} us/tick "
+              f"({generic_tick / generated_tick:4.1f}x)  |  create compiled {compile_time * 1e3:7.2f} ms "
+              f"cached {cached_time * 1e3:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
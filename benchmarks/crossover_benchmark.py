@@ -0,0 +1,69 @@
+"""
+Offspring produced per second by crossover over gene dicts with a single RNG call and over sorted gene
+arrays, against the per-gene dict walk Genome.crossover used to do. The last column leaves the
+offspring as arrays, as a population kept in a GenomeStore would.
+
+Run with `python -m benchmarks.crossover_benchmark`.
+"""
+from __future__ import annotations
+import random
+
+from src.gene import NodeGene, ConnectionGene, crossover_genes
+from src.gene_arrays import GeneArrays
+from .util import BenchGenome, timeit
+
+
+def dict_crossover(nn1: BenchGenome, nn2: BenchGenome) -> tuple[dict, dict]:
+    """
+    The former Genome.crossover: set unions, one coin flip per gene and a validating copy of every gene.
+    """
+    connections = {}
+    for key in set(nn1.connections) | set(nn2.connections):
+        cg1, cg2 = nn1.connections.get(key), nn2.connections.get(key)
+        if cg1 is None or cg2 is None:
+            if random.getrandbits(1):
+                cg = cg1 or cg2
+                connections[key] = ConnectionGene(cg._from, cg._to, cg.weight, cg.enabled)
+        else:
+            connections[key] = ConnectionGene(cg1._from, cg1._to, cg1.weight if random.random() > 0.5 else cg2.weight,
+                                              cg1.enabled if random.random() > 0.5 else cg2.enabled)
+    nodes = {}
+    for key in set(nn1.nodes) | set(nn2.nodes):
+        ng1, ng2 = nn1.nodes.get(key), nn2.nodes.get(key)
+        if ng1 is None or ng2 is None:
+            if random.getrandbits(1):
+                ng = ng1 or ng2
+                nodes[key] = NodeGene(ng.key, ng.bias, ng.activation, ng.aggregation, ng.response)
+        else:
+            nodes[key] = NodeGene(key, ng1.bias if random.random() > 0.5 else ng2.bias,
+                                  ng1.activation if random.random() > 0.5 else ng2.activation,
+                                  ng1.aggregation if random.random() > 0.5 else ng2.aggregation,
+                                  ng1.response if random.random() > 0.5 else ng2.response)
+    return nodes, connections
+
+
+def best(func, repeat: int) -> float:
+    """
+    Return the best of a few `timeit` runs, the crossovers are short enough for noise to dominate the mean.
+    """
+    return min(timeit(func, repeat) for _ in range(5))
+
+
+def main() -> None:
+    rng = random.Random(0)
+    for num_hidden, connection_prob in ((2, 0.3), (20, 0.2), (40, 0.3), (80, 0.25)):
+        a = BenchGenome(rng, 8, 4, num_hidden, connection_prob)
+        b = BenchGenome(rng, 8, 4, num_hidden, connection_prob)
+        repeat = max(10, 5000 // len(a.connections))
+        old = best(lambda: dict_crossover(a, b), repeat)
+        genes = best(lambda: crossover_genes(a.nodes, a.connections, b.nodes, b.connections), repeat)
+        arrays = best(lambda: GeneArrays.crossover(a.gene_arrays(), b.gene_arrays()).genes(), repeat)
+        arrays_only = best(lambda: GeneArrays.crossover(a.gene_arrays(), b.gene_arrays()), repeat)
+        print(f"connections={len(a.connections):5d}  dict walk {1 / old:9.0f} offspring/s  "
+              f"single flip call {1 / genes:9.0f} offspring/s ({old / genes:5.2f}x)  "
+              f"sorted arrays {1 / arrays:9.0f} offspring/s ({old / arrays:5.2f}x), "
+              f"without building genes {1 / arrays_only:9.0f} offspring/s ({old / arrays_only:5.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
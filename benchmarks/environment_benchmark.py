@@ -0,0 +1,49 @@
+"""
+Sensing the 4 nearest agents within a radius for every agent of a population: a brute-force scan of
+every pair against the queries of a `SpatialGrid`, including a tick of moves.
+
+Run with `python -m benchmarks.environment_benchmark`.
+"""
+from __future__ import annotations
+import numpy as np
+
+from src.environment import SpatialGrid
+from .util import timeit
+
+K = 4
+RADIUS = 5.0
+DENSITY = 0.05 # Agents per unit of area.
+
+
+def brute_force(positions: np.ndarray) -> np.ndarray:
+    """
+    Return the ids of the K nearest other agents within `RADIUS` of every agent, padded with -1.
+    """
+    delta = positions[:, None, :] - positions[None, :, :]
+    distances = np.sqrt(np.einsum("ijk,ijk->ij", delta, delta))
+    np.fill_diagonal(distances, np.inf)
+    nearest = np.argsort(distances, axis=1)[:, :K]
+    return np.where(np.take_along_axis(distances, nearest, axis=1) <= RADIUS, nearest, -1)
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    for num_agents in (1000, 5000, 20000):
+        size = np.sqrt(num_agents / DENSITY)
+        positions = rng.random((num_agents, 2)) * size
+        ids = np.arange(num_agents)
+        grid = SpatialGrid(size, size, RADIUS)
+        grid.insert(ids, positions)
+        inputs = np.zeros((num_agents, 3 * K + 2))
+
+        def tick() -> None:
+            grid.move(ids, positions + rng.normal(0, 0.1, positions.shape))
+            grid.sense(grid.positions[ids], K, RADIUS, inputs[:, 2:], exclude=ids)
+
+        brute = timeit(lambda: brute_force(positions), 1) if num_agents <= 5000 else float("nan")
+        print(f"agents={num_agents:6d}  brute force {brute * 1e3:9.2f} ms/tick  "
+              f"grid {timeit(tick, 10) * 1e3:7.2f} ms/tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Cold start time of `import src.genome`, which every spawned worker process pays, measured in fresh
+interpreters against the interpreter and NumPy alone.
+
+Run with `python -m benchmarks.import_benchmark`.
+"""
+from __future__ import annotations
+import statistics
+import subprocess
+import sys
+import time
+
+REPEAT = 15
+
+
+def cold_time(statement: str) -> float:
+    """
+    Return the median wall time of running `statement` in a new interpreter, in seconds.
+    """
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main() -> None:
+    interpreter = cold_time("pass")
+    for statement in ("import numpy", "import src.genome"):
+        print(f"{statement:20s} {(cold_time(statement) - interpreter) * 1e3:8.2f} ms over a bare interpreter")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Memory used per genome by the gene object graph and by the packed GenomeStore.
+
+Run with `python -m benchmarks.memory_benchmark`.
+"""
+from __future__ import annotations
+import gc
+import random
+import tracemalloc
+
+from src.gene_arrays import GenomeStore
+from .util import BenchGenome
+
+NUM_GENOMES = 2000
+
+
+def measure(build) -> tuple[object, int]:
+    """
+    Return the result of `build()` and the bytes it allocated.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main() -> None:
+    for num_hidden in (0, 10, 30):
+        rng = random.Random(0)
+        genomes, object_bytes = measure(lambda: [BenchGenome(rng, 8, 4, num_hidden) for _ in range(NUM_GENOMES)])
+        num_genes = sum(len(g.nodes) + len(g.connections) for g in genomes) / NUM_GENOMES
+        store, _ = measure(lambda: GenomeStore.pack(genomes))
+        print(f"hidden={num_hidden:3d} genes/genome={num_genes:7.1f}  "
+              f"objects {object_bytes / NUM_GENOMES:9.0f} B/genome  "
+              f"store {store.nbytes / NUM_GENOMES:9.0f} B/genome")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Parameter mutation of a whole population: per-gene `mutate` calls against one bulk draw over a GenomeStore.
+
+Run with `python -m benchmarks.mutation_benchmark`.
+"""
+from __future__ import annotations
+import random
+import time
+import numpy as np
+
+from src.gene import NodeGene, ConnectionGene
+from src.gene_arrays import GenomeStore
+from .util import BenchGenome
+
+NodeGene.BIAS_MUTATION_CHANCE = 0.1
+NodeGene.ACTIVATION_FUNCTION_MUTATION_CHANCE = 0.02
+NodeGene.AGGREGATION_FUNCTION_MUTATION_CHANCE = 0.02
+NodeGene.RESPONSE_FUNCTION_MUTATION_CHANCE = 0.1
+ConnectionGene.WEIGHT_MUTATION_CHANCE = 0.8
+ConnectionGene.ENABLED_MUTATION_CHANCE = 0.01
+
+
+def main() -> None:
+    rng = random.Random(0)
+    for num_genomes in (1000, 10000):
+        genomes = [BenchGenome(rng, 8, 4, rng.randint(0, 20)) for _ in range(num_genomes)]
+        num_genes = sum(len(g.nodes) + len(g.connections) for g in genomes)
+        store = GenomeStore.pack(genomes)
+
+        start = time.perf_counter()
+        for g in genomes:
+            for cg in g.connections.values():
+                cg.mutate()
+            for ng in g.nodes.values():
+                ng.mutate()
+        per_gene = time.perf_counter() - start
+
+        generator = np.random.default_rng(0)
+        start = time.perf_counter()
+        store.mutate(generator)
+        bulk = time.perf_counter() - start
+        print(f"genomes={num_genomes:6d} genes={num_genes:8d}  per-gene {per_gene * 1e3:8.2f} ms  "
+              f"bulk {bulk * 1e3:8.2f} ms  speedup {per_gene / bulk:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
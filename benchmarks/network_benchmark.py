@@ -0,0 +1,40 @@
+"""
+Per-tick latency of the network evaluators.
+
+Run with `python -m benchmarks.network_benchmark`.
+"""
+from __future__ import annotations
+import random
+import numpy as np
+
+from src.nn.network import FeedForwardNetwork, RecurrentNetwork
+from src.nn.batch import BatchNetwork, RecurrentBatchNetwork
+from .util import BenchGenome, timeit
+
+NUM_INPUTS = 8
+NUM_OUTPUTS = 4
+
+
+def main() -> None:
+    rng = random.Random(0)
+    for num_hidden in (0, 10, 50):
+        genome = BenchGenome(rng, NUM_INPUTS, NUM_OUTPUTS, num_hidden)
+        inputs = [rng.random() for _ in range(NUM_INPUTS)]
+        ff = FeedForwardNetwork.create(genome)
+        rn = RecurrentNetwork.create(BenchGenome(rng, NUM_INPUTS, NUM_OUTPUTS, num_hidden, recurrent=True))
+        print(f"hidden={num_hidden:3d} connections={len(genome.connections):5d}  "
+              f"feed-forward {timeit(lambda: ff.activate(inputs), 2000) * 1e6:8.2f} us/tick  "
+              f"recurrent {timeit(lambda: rn.step(inputs), 2000) * 1e6:8.2f} us/tick")
+
+    for num_agents in (100, 1000, 10000):
+        genomes = [BenchGenome(rng, NUM_INPUTS, NUM_OUTPUTS, rng.randint(0, 10)) for _ in range(num_agents)]
+        inputs = np.random.default_rng(0).random((num_agents, NUM_INPUTS))
+        ff = BatchNetwork.create(genomes)
+        rn = RecurrentBatchNetwork.create(genomes)
+        print(f"agents={num_agents:6d}  "
+              f"batch feed-forward {timeit(lambda: ff.activate(inputs), 20) * 1e3:8.2f} ms/tick  "
+              f"batch recurrent {timeit(lambda: rn.step_many(inputs), 20) * 1e3:8.2f} ms/tick")
+
+
+if __name__ == "__main__":
+    main()
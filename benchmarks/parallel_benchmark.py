@@ -0,0 +1,38 @@
+"""
+Per-tick latency of activating a whole population in worker processes sharing memory, against a
+single in-process batch.
+
+Run with `python -m benchmarks.parallel_benchmark`.
+"""
+from __future__ import annotations
+import os
+import random
+import numpy as np
+
+from src.nn.network import FeedForwardNetwork
+from src.nn.batch import BatchNetwork
+from src.nn.parallel import ParallelBatchNetwork
+from .util import BenchGenome, timeit
+
+NUM_INPUTS = 8
+NUM_OUTPUTS = 4
+
+
+def main() -> None:
+    print(f"{os.cpu_count()} CPUs")
+    rng = random.Random(0)
+    for num_agents in (10000, 50000):
+        networks = [FeedForwardNetwork.create(BenchGenome(rng, NUM_INPUTS, NUM_OUTPUTS, rng.randint(0, 20)))
+                    for _ in range(num_agents)]
+        inputs = np.random.default_rng(0).random((num_agents, NUM_INPUTS))
+        batch = BatchNetwork(networks)
+        baseline = timeit(lambda: batch.activate(inputs), 10)
+        print(f"agents={num_agents:6d}  in-process {baseline * 1e3:8.2f} ms/tick")
+        for num_workers in (1, 2, 4, 8):
+            with ParallelBatchNetwork(networks, num_workers) as parallel:
+                seconds = timeit(lambda: parallel.activate(inputs), 10)
+            print(f"              workers={num_workers}  {seconds * 1e3:8.2f} ms/tick  speedup {baseline / seconds:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
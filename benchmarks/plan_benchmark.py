@@ -0,0 +1,53 @@
+"""
+Network construction for offspring that only differ from their parent in parameters: compiling every
+offspring from scratch against building it from the cached plan of the parent's structure, including
+the structure hash. The gene arrays the hash is computed from are built beforehand, as speciation
+needs them anyway.
+
+Run with `python -m benchmarks.plan_benchmark`.
+"""
+from __future__ import annotations
+import random
+
+from src.gene import NodeGene, ConnectionGene
+from src.nn.network import create_network
+from src.nn.plan import PlanCache
+from .util import BenchGenome, timeit
+
+NUM_INPUTS = 8
+NUM_OUTPUTS = 4
+
+
+def offspring(parent: BenchGenome, rng: random.Random) -> BenchGenome:
+    """
+    Return a copy of the parent with new weights and biases.
+    """
+    child = BenchGenome.__new__(BenchGenome)
+    child.key, child.version, child._gene_arrays = parent.key, 0, None
+    child.INPUT_KEYS, child.OUTPUT_KEYS = parent.INPUT_KEYS, parent.OUTPUT_KEYS
+    child.nodes = {key: NodeGene(key, rng.gauss(0, 1), ng.activation, ng.aggregation, ng.response)
+                   for key, ng in parent.nodes.items()}
+    child.connections = {key: ConnectionGene(child.nodes[key[0]], child.nodes[key[1]], rng.gauss(0, 1), cg.enabled)
+                         for key, cg in parent.connections.items()}
+    return child
+
+
+def main() -> None:
+    rng = random.Random(0)
+    for num_hidden in (0, 10, 50):
+        parent = BenchGenome(rng, NUM_INPUTS, NUM_OUTPUTS, num_hidden)
+        children = [offspring(parent, rng) for _ in range(200)]
+        for child in children:
+            child.gene_arrays()
+        cache = PlanCache()
+        cache.plan(parent)
+
+        compiled = timeit(lambda: [create_network(c) for c in children], 5) / len(children)
+        planned = timeit(lambda: [cache.create_network(c) for c in children], 5) / len(children)
+        print(f"hidden={num_hidden:3d} connections={len(parent.connections):5d}  "
+              f"compiled {compiled * 1e6:8.2f} us  from plan {planned * 1e6:8.2f} us "
+              f"({compiled / planned:4.1f}x)  hit rate {cache.hit_rate:.3f}")
+
+
+if __name__ == "__main__":
+    main()
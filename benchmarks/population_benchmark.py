@@ -0,0 +1,35 @@
+"""
+Ticks per second of the real-time population at different sizes.
+
+The genomes are `TraitGenome`s with trivial crossover, mutation and distance, so this measures the
+overhead of the population engine itself: bulk energy updates, event detection, slot recycling and mate selection.
+
+Run with `python -m benchmarks.population_benchmark`.
+"""
+from __future__ import annotations
+import random
+import numpy as np
+
+from src.population import RealTimePopulation
+from .util import TraitGenome, timeit
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    for size in (1_000, 10_000, 100_000):
+        population = RealTimePopulation([TraitGenome(random.random()) for _ in range(size)],
+                                        energy=RealTimePopulation.REPRODUCTION_THRESHOLD / 2)
+
+        def tick() -> None:
+            # Roughly balanced births and deaths keep the population size stable.
+            alive = population.alive
+            population.energy[alive] += rng.normal(0.0, 0.5, len(alive))
+            population.update()
+
+        seconds = timeit(tick, 100)
+        print(f"agents={size:7d}  {1 / seconds:8.1f} ticks/s  "
+              f"births={population.births:7d} deaths={population.deaths:7d} alive={len(population):7d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Overhead of the `Profiler` on a loop of mutation, activation, distance and crossover: disabled, enabled,
+and enabled with size sampling, followed by the sampled activation time per genome size bucket.
+
+Run with `python -m benchmarks.profiling_benchmark`.
+"""
+from __future__ import annotations
+from typing import Callable
+
+from src.config import Config
+from src.genome import Genome
+from src.profiling import Profiler
+from src.rng import RandomStream
+from .util import timeit
+
+NUM_GENOMES = 200
+SAMPLE_EVERY = 16
+
+
+def main() -> None:
+    Genome.configure(Config(num_inputs=8, num_outputs=4, connection_add_prob=0.5, node_add_prob=0.2,
+                            weight_mutation_chance=0.8))
+    inputs = [0.5] * 8
+
+    def generation() -> Callable[[], None]:
+        """
+        Return one generation over a fresh population of a range of sizes, the same for every mode.
+        """
+        rng = RandomStream(0)
+        genomes = [Genome(rng=rng) for _ in range(NUM_GENOMES)]
+        for i, genome in enumerate(genomes):
+            for _ in range(i // 2):
+                genome.mutate(rng)
+
+        def run() -> None:
+            for i, genome in enumerate(genomes):
+                genome.mutate(rng)
+                genome.activate(inputs)
+                genome.distance(genomes[i - 1])
+            Genome.crossover(genomes[0], genomes[1], rng)
+        return run
+
+    disabled = timeit(generation(), 10)
+    with Profiler():
+        enabled = timeit(generation(), 10)
+    with Profiler(sample_every=SAMPLE_EVERY) as profiler:
+        sampled = timeit(generation(), 10)
+    print(f"disabled {disabled * 1e3:7.2f} ms/generation")
+    print(f"enabled  {enabled * 1e3:7.2f} ms/generation  ({enabled / disabled - 1:+.1%})")
+    print(f"sampled  {sampled * 1e3:7.2f} ms/generation  ({sampled / disabled - 1:+.1%}), every {SAMPLE_EVERY}th call")
+
+    for name in ("activate", "mutate"):
+        print(f"{name}: mean time by enabled connections")
+        for connections, bucket in profiler.stats()[name]["sampled"].items():
+            print(f"  {connections:>9}  {bucket['mean_seconds'] * 1e6:8.2f} µs  ({bucket['count']} samples)")
+
+
+if __name__ == "__main__":
+    main()
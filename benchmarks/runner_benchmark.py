@@ -0,0 +1,61 @@
+"""
+Tick time percentiles of the reference world: stepped in a plain loop, which assigns every newborn to
+its species on the critical path, against driven by a `RealTimeRunner`, which defers speciation to the
+time left in the tick budget.
+
+Run with `python -m benchmarks.runner_benchmark`.
+"""
+from __future__ import annotations
+import asyncio
+import time
+import numpy as np
+
+from src.config import Config
+from src.genome import Genome
+from src.population import RealTimePopulation
+from src.rng import RandomStream
+from src.runner import RealTimeRunner
+from src.speciation import SpeciesSet
+from src.world import World
+
+NUM_AGENTS = 1000
+TICKS = 60
+TICK_RATES = (10.0, 50.0)
+
+
+def world() -> World:
+    rng = RandomStream(0)
+    genomes = [Genome(rng=rng) for _ in range(NUM_AGENTS)]
+    for genome in genomes:
+        for _ in range(10):
+            genome.mutate(rng)
+    population = RealTimePopulation(genomes, energy=5.0, species=SpeciesSet(), rng=rng)
+    return World(population, 220.0, 220.0, NUM_AGENTS, rng=rng)
+
+
+def report(name: str, times: list[float], population: RealTimePopulation) -> None:
+    p50, p90, p99 = np.percentile(times, (50, 90, 99)) * 1e3
+    print(f"{name:16s}  tick p50 {p50:7.2f} ms  p90 {p90:7.2f} ms  p99 {p99:7.2f} ms  births {population.births:4d}", end="")
+
+
+def main() -> None:
+    Genome.configure(Config(num_inputs=World.NUM_INPUTS, num_outputs=World.NUM_OUTPUTS, connection_add_prob=0.5,
+                            node_add_prob=0.2, weight_mutation_chance=0.8, bias_mutation_chance=0.3))
+    inline = world()
+    times = []
+    for _ in range(TICKS):
+        start = time.perf_counter()
+        inline.step()
+        times.append(time.perf_counter() - start)
+    report("loop", times, inline.population)
+    print()
+
+    for tick_rate in TICK_RATES:
+        runner = RealTimeRunner(world(), tick_rate=tick_rate)
+        asyncio.run(runner.run(ticks=TICKS))
+        report(f"runner {tick_rate:4.0f} Hz", list(runner.tick_times), runner.population)
+        print(f"  overruns {runner.overruns:3d}/{TICKS}  speciation deferrals {runner.deferrals['speciation']:3d}")
+
+
+if __name__ == "__main__":
+    main()
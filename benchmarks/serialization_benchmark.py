@@ -0,0 +1,55 @@
+"""
+Population checkpoints: pickling every genome's genes against a memory-mapped snapshot, for writing,
+restarting and reading back a single genome.
+
+Run with `python -m benchmarks.serialization_benchmark`.
+"""
+from __future__ import annotations
+import os
+import pickle
+import random
+import tempfile
+import time
+
+from src.gene_arrays import GenomeStore
+from src.serialization import Snapshot, write_snapshot
+from .util import BenchGenome
+
+
+def elapsed(func) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        pickled, snapshot = os.path.join(directory, "population.pickle"), os.path.join(directory, "population.snapshot")
+        for num_genomes in (1000, 10000):
+            genomes = [BenchGenome(rng, 8, 4, rng.randint(0, 20)) for _ in range(num_genomes)]
+
+            def dump() -> None:
+                with open(pickled, "wb") as f:
+                    pickle.dump([(g.key, g.nodes, g.connections) for g in genomes], f, pickle.HIGHEST_PROTOCOL)
+
+            def load_one():
+                with open(pickled, "rb") as f:
+                    return pickle.load(f)[num_genomes // 2]
+
+            def read_one():
+                with Snapshot(snapshot) as s:
+                    return s.gene_arrays(num_genomes // 2).genes()
+
+            pickle_write, _ = elapsed(dump)
+            pickle_read, _ = elapsed(load_one)
+            snapshot_write, _ = elapsed(lambda: write_snapshot(snapshot, GenomeStore.pack(genomes)))
+            snapshot_read, _ = elapsed(read_one)
+            print(f"genomes={num_genomes:6d}  pickle {os.path.getsize(pickled) / 1e6:6.2f} MB "
+                  f"write {pickle_write * 1e3:8.2f} ms read one {pickle_read * 1e3:8.2f} ms  |  "
+                  f"snapshot {os.path.getsize(snapshot) / 1e6:6.2f} MB "
+                  f"write {snapshot_write * 1e3:8.2f} ms read one {snapshot_read * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
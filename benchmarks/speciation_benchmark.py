@@ -0,0 +1,36 @@
+"""
+Full distance evaluations per speciation of a newborn, with the gene count index against a scan of
+every representative.
+
+Run with `python -m benchmarks.speciation_benchmark`.
+"""
+from __future__ import annotations
+import random
+import time
+
+from src.speciation import SpeciesSet
+from .util import BenchGenome
+
+NUM_GENOMES = 3000
+
+
+def main() -> None:
+    for spread in (10, 40, 120):
+        rng = random.Random(0)
+        genomes = [BenchGenome(rng, 8, 4, rng.randrange(spread), rng.uniform(0.1, 0.5)) for _ in range(NUM_GENOMES)]
+        for g in genomes:
+            g.gene_arrays()
+        species_set = SpeciesSet()
+        scanned = 0
+        start = time.perf_counter()
+        for g in genomes:
+            scanned += len(species_set)
+            species_set.assign(g)
+        seconds = time.perf_counter() - start
+        print(f"hidden<{spread:4d} species={len(species_set):5d}  "
+              f"evaluations/assignment {species_set.mean_evaluations:7.2f} (full scan {scanned / NUM_GENOMES:7.2f})  "
+              f"{seconds / NUM_GENOMES * 1e6:8.1f} us/assignment")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+import random
+import time
+from itertools import count
+from typing import Callable
+
+from src.gene import NodeGene, ConnectionGene
+from src.gene_arrays import GeneArrays
+from src.functions.activations import Activations
+from src.functions.aggregations import Aggregations
+
+
+class BenchGenome:
+    """
+    A randomly wired genome exposing the attributes the network compilers read.
+    """
+    _keys = count()
+
+    def __init__(self, rng: random.Random, num_inputs: int, num_outputs: int, num_hidden: int,
+                 connection_prob: float = 0.3, recurrent: bool = False) -> None:
+        self.key = next(BenchGenome._keys)
+        self.version = 0
+        self.INPUT_KEYS = [-i - 1 for i in range(num_inputs)]
+        self.OUTPUT_KEYS = list(range(num_outputs))
+        hidden = list(range(num_outputs, num_outputs + num_hidden))
+
+        self.nodes = {}
+        for key in self.INPUT_KEYS + self.OUTPUT_KEYS + hidden:
+            self.nodes[key] = NodeGene(key, rng.gauss(0, 1), Activations.TANH, Aggregations.SUM, 1.0)
+
+        # Acyclic unless recurrent: connections only go from lower to higher rank.
+        rank = self.INPUT_KEYS + hidden + self.OUTPUT_KEYS
+        self.connections = {}
+        for i, a in enumerate(rank):
+            for b in rank[num_inputs if recurrent else max(i + 1, num_inputs):]:
+                if rng.random() < connection_prob:
+                    cg = ConnectionGene(self.nodes[a], self.nodes[b], rng.gauss(0, 1))
+                    self.connections[cg.key] = cg
+
+        self._gene_arrays: GeneArrays = None
+
+    def gene_arrays(self) -> GeneArrays:
+        if self._gene_arrays is None:
+            self._gene_arrays = GeneArrays.create(self.nodes, self.connections)
+        return self._gene_arrays
+
+    def distance(self, other: BenchGenome) -> float:
+        return self.gene_arrays().distance(other.gene_arrays(), 1, 1)
+
+
+class TraitGenome:
+    """
+    A genome of a single trait with trivial crossover, mutation and distance, for benchmarking the code
+    around genomes rather than the genomes themselves.
+    """
+    __slots__ = ("trait",)
+
+    def __init__(self, trait: float) -> None:
+        self.trait = trait
+
+    @classmethod
+    def crossover(cls, g1: TraitGenome, g2: TraitGenome, rng: random.Random = random) -> TraitGenome:
+        return cls(g1.trait)
+
+    def mutate(self, rng: random.Random = random) -> None:
+        self.trait += rng.gauss(0, 0.1)
+
+    def distance(self, other: TraitGenome) -> float:
+        return abs(self.trait - other.trait)
+
+
+def timeit(func: Callable, repeat: int) -> float:
+    """
+    Return the mean wall time of one call of `func`, in seconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
@@ -0,0 +1,60 @@
+"""
+Throughput of the reference world, the canonical end-to-end benchmark of the library: agent ticks per
+second of `World.step` for populations of evolved genomes, births included, and of its activation step
+alone against activating every agent's network one by one through `Genome.activate`.
+
+Run with `python -m benchmarks.world_benchmark`.
+"""
+from __future__ import annotations
+import time
+import numpy as np
+
+from src.config import Config
+from src.genome import Genome
+from src.population import RealTimePopulation
+from src.rng import RandomStream
+from src.world import World
+
+TICKS = 50
+DENSITY = 0.02 # Agents per unit of area.
+
+
+def main() -> None:
+    Genome.configure(Config(num_inputs=World.NUM_INPUTS, num_outputs=World.NUM_OUTPUTS, connection_add_prob=0.5,
+                            node_add_prob=0.2, weight_mutation_chance=0.8, bias_mutation_chance=0.3))
+    rng = RandomStream(0)
+    for num_agents in (1000, 5000, 20000):
+        genomes = [Genome(rng=rng) for _ in range(num_agents)]
+        for genome in genomes:
+            for _ in range(10):
+                genome.mutate(rng)
+        population = RealTimePopulation(genomes, energy=5.0, rng=rng)
+        size = (num_agents / DENSITY) ** 0.5
+        world = World(population, size, size, num_agents, rng=rng)
+
+        inputs = np.random.default_rng(0).random((num_agents, World.NUM_INPUTS))
+        rows = inputs.tolist()
+        for genome, row in zip(genomes, rows):
+            genome.activate(row)
+        start = time.perf_counter()
+        for genome, row in zip(genomes, rows):
+            genome.activate(row)
+        scalar = time.perf_counter() - start
+
+        world.step()
+        start = time.perf_counter()
+        world.batch.step_many(world.batch_inputs)
+        batch = time.perf_counter() - start
+        agent_ticks = 0
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            agent_ticks += len(population)
+            world.step()
+        elapsed = time.perf_counter() - start
+        print(f"agents={num_agents:6d}  world {agent_ticks / elapsed:8.0f} agent ticks/s "
+              f"({elapsed / TICKS * 1e3:7.2f} ms/tick, {population.births} births)  |  activation: "
+              f"batch {num_agents / batch:9.0f} agent ticks/s  Genome.activate {num_agents / scalar:8.0f} agent ticks/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1 @@
-__all__ = ["config", "gene", "genome"]
\ No newline at end of file
+__all__ = ["checkpoint", "config", "distance_cache", "environment", "gene", "gene_arrays", "genome", "innovation", "lru", "population", "profiling", "rng", "runner", "serialization", "speciation", "world"]
\ No newline at end of file
@@ -0,0 +1,255 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+import os
+import queue
+import re
+import threading
+import time
+import numpy as np
+
+from .gene_arrays import GeneArrays, GenomeStore
+from .serialization import Snapshot, write_snapshot
+
+if TYPE_CHECKING:
+    from .population import RealTimePopulation
+    from .speciation import SpeciesSet
+    from .innovation import InnovationTracker
+    from random import Random
+
+_NAME = re.compile(r"^(\d{8})\.state\.npz$")
+
+
+class _Capture:
+    """
+    The part of a population a checkpoint writes, captured on the simulation thread.
+    """
+
+    __slots__ = ("index", "full", "slots", "keys", "arrays", "alive", "energy")
+
+    def __init__(self, index: int, full: bool, slots: list[int], keys: list[int], arrays: list[GeneArrays],
+                 alive: np.ndarray, energy: np.ndarray) -> None:
+        self.index = index
+        self.full = full
+        self.slots = slots
+        self.keys = keys
+        self.arrays = arrays
+        self.alive = alive
+        self.energy = energy
+
+
+class Checkpointer:
+    """
+    Writes checkpoints of a live `RealTimePopulation` on a background thread.
+
+    `checkpoint` only captures the population on the calling thread: the slot, energy and the cached
+    `gene_arrays()` of every genome that was born or mutated since the previous checkpoint. Genomes
+    rebuild their gene arrays after a change instead of modifying them, so holding on to them is a
+    copy-on-write snapshot. Packing and writing happens on the background thread.
+
+    Every `FULL_EVERY`-th checkpoint is full and holds every living genome, the others are deltas. A
+    checkpoint consists of `<index>.genes.snapshot` (see `Snapshot`), and `<index>.state.npz` with the
+    slots of the written genomes and the slots and energy of all living agents. The state file is written
+    last and marks the checkpoint as complete. Checkpoints before the latest full one are deleted.
+    `replay` and `restore` read the latest full checkpoint and apply the deltas after it.
+
+    A write error is raised by the next `checkpoint`, `wait` or `close`. The deltas queued after a failed
+    write are dropped unwritten, as they would not apply on top of the checkpoints on disk, and counted in
+    `dropped`. The first checkpoint after the error is raised is full, so it holds the genomes of the
+    failed and dropped checkpoints again.
+    """
+
+    FULL_EVERY = 10 # Checkpoints per full checkpoint, the others are deltas.
+
+    def __init__(self, directory: str | os.PathLike, full_every: int = None) -> None:
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.full_every = Checkpointer.FULL_EVERY if full_every is None else full_every
+        if self.full_every < 1:
+            raise ValueError(f"{self.full_every} must be at least 1.")
+        indices = _indices(self.directory)
+        self.index = indices[-1] + 1 if indices else 0
+        # Slot -> (genome key, genome version) as of the last capture.
+        self.written: dict[int, tuple[int, int]] = {}
+        self.since_full = self.full_every
+
+        self.checkpoints = 0
+        self.dropped = 0 # Checkpoints dropped after a write error.
+        self.bytes_written = 0
+        self.capture_time = 0.0 # Seconds spent capturing on the simulation thread, in total.
+        self.write_time = 0.0 # Seconds spent writing on the background thread, in total.
+
+        self._queue: queue.Queue[_Capture | None] = queue.Queue()
+        self._error: BaseException = None
+        # Set by the background thread after a write error, until a full checkpoint is written.
+        self._failed = False
+        self._thread = threading.Thread(target=self._run, name="checkpointer", daemon=True)
+        self._thread.start()
+
+    def checkpoint(self, population: RealTimePopulation, full: bool = False) -> int:
+        """
+        Capture the population and queue it for writing.
+
+        Parameters:
+        - population (RealTimePopulation): The population to checkpoint.
+        - full (bool): Write every living genome, even if the checkpoint would be a delta.
+
+        Returns:
+        - int: The index of the checkpoint.
+        """
+        self._raise()
+        start = time.perf_counter()
+        full = full or self.since_full >= self.full_every
+        if full:
+            self.written.clear()
+            self.since_full = 0
+        self.since_full += 1
+
+        written = self.written
+        slots, keys, arrays = [], [], []
+        genomes = population.genomes
+        for slot in population.alive:
+            genome = genomes[slot]
+            state = genome.key, genome.version
+            if written.get(slot) != state:
+                written[slot] = state
+                slots.append(slot)
+                keys.append(genome.key)
+                arrays.append(genome.gene_arrays())
+        alive = np.array(population.alive, dtype=np.int64)
+        if len(written) > len(alive):
+            # Forget the slots of the dead, a new genome in them is always a change.
+            for slot in written.keys() - set(population.alive):
+                del written[slot]
+
+        capture = _Capture(self.index, full, slots, keys, arrays, alive, population.energy[alive])
+        self.index += 1
+        self.checkpoints += 1
+        self.capture_time += time.perf_counter() - start
+        self._queue.put(capture)
+        return capture.index
+
+    def wait(self) -> None:
+        """
+        Block until every queued checkpoint is written.
+        """
+        self._queue.join()
+        self._raise()
+
+    def close(self) -> None:
+        """
+        Write the queued checkpoints and stop the background thread.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raise()
+
+    def __enter__(self) -> Checkpointer:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _raise(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            # What was captured since the last written checkpoint was lost, start over from a full one.
+            self.written.clear()
+            self.since_full = self.full_every
+            raise error
+
+    def _run(self) -> None:
+        while True:
+            capture = self._queue.get()
+            try:
+                if capture is None:
+                    return
+                if self._failed and not capture.full:
+                    self.dropped += 1
+                else:
+                    self._failed = False
+                    start = time.perf_counter()
+                    self._write(capture)
+                    self.write_time += time.perf_counter() - start
+            except BaseException as e:
+                self._failed = True
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write(self, capture: _Capture) -> None:
+        prefix = os.path.join(self.directory, f"{capture.index:08d}")
+        self.bytes_written += write_snapshot(f"{prefix}.genes.snapshot", GenomeStore.concatenate(capture.keys, capture.arrays))
+        temporary = f"{prefix}.state.tmp"
+        with open(temporary, "wb") as f:
+            np.savez(f, full=capture.full, slots=np.array(capture.slots, dtype=np.int64), alive=capture.alive,
+                     energy=capture.energy)
+            self.bytes_written += f.tell()
+        os.replace(temporary, f"{prefix}.state.npz")
+        if capture.full:
+            for index in _indices(self.directory):
+                if index < capture.index:
+                    _remove(self.directory, index)
+
+
+def _indices(directory: str) -> list[int]:
+    """
+    The indices of the complete checkpoints in the directory, in ascending order.
+    """
+    return sorted(int(match[1]) for name in os.listdir(directory) if (match := _NAME.match(name)))
+
+
+def _remove(directory: str, index: int) -> None:
+    for suffix in (".state.npz", ".genes.snapshot"):
+        try:
+            os.remove(os.path.join(directory, f"{index:08d}{suffix}"))
+        except FileNotFoundError:
+            pass
+
+
+def replay(directory: str | os.PathLike) -> tuple[list[int], list[GeneArrays], np.ndarray]:
+    """
+    Rebuild the population of the latest checkpoint from its full checkpoint and the deltas after it.
+
+    Parameters:
+    - directory (str | os.PathLike): The directory of a `Checkpointer`.
+
+    Raises:
+    - FileNotFoundError: If the directory holds no full checkpoint.
+
+    Returns:
+    - tuple[list[int], list[GeneArrays], np.ndarray]: The genome keys, genes and energy of the living
+    agents, in the order they were alive in.
+    """
+    directory = os.fspath(directory)
+    states = {}
+    for index in _indices(directory):
+        with np.load(os.path.join(directory, f"{index:08d}.state.npz")) as state:
+            states[index] = {name: state[name] for name in state.files}
+    full = [index for index, state in states.items() if state["full"]]
+    if not full:
+        raise FileNotFoundError(f"{directory} holds no full checkpoint.")
+
+    genes: dict[int, tuple[int, GeneArrays]] = {}
+    for index in (index for index in states if index >= full[-1]):
+        with Snapshot(os.path.join(directory, f"{index:08d}.genes.snapshot")) as snapshot:
+            for i, slot in enumerate(states[index]["slots"].tolist()):
+                genes[slot] = int(snapshot.keys[i]), snapshot.gene_arrays(i)
+    last = states[max(states)]
+    alive = last["alive"].tolist()
+    return [genes[slot][0] for slot in alive], [genes[slot][1] for slot in alive], last["energy"]
+
+
+def restore(directory: str | os.PathLike, species: SpeciesSet = None, innovations: InnovationTracker = None,
+            rng: Random = None) -> RealTimePopulation:
+    """
+    Create a population from the latest checkpoint in the directory, see `replay`. The agents get new
+    slots and their genomes new keys, and the node keys of all genomes are reserved in `Genome.innovations`.
+    """
+    from .genome import Genome
+    from .population import RealTimePopulation
+    population = RealTimePopulation(species=species, innovations=innovations, rng=rng)
+    _, arrays, energy = replay(directory)
+    for genes, e in zip(arrays, energy.tolist()):
+        population.add(Genome.from_gene_arrays(genes), e)
+    return population
@@ -0,0 +1,169 @@
+from __future__ import annotations
+from dataclasses import dataclass, field, fields
+import os
+import numpy as np
+
+from .functions.activations import Activations
+from .functions.aggregations import Aggregations
+
+# The neat-python names of the options, so that its config files can be read as they are.
+NEAT_PYTHON_NAMES = {
+    "conn_add_prob": "connection_add_prob",
+    "conn_delete_prob": "connection_delete_prob",
+    "bias_mutate_rate": "bias_mutation_chance",
+    "activation_mutate_rate": "activation_mutation_chance",
+    "aggregation_mutate_rate": "aggregation_mutation_chance",
+    "response_mutate_rate": "response_mutation_chance",
+    "weight_mutate_rate": "weight_mutation_chance",
+    "enabled_mutate_rate": "enabled_mutation_chance",
+}
+# Sections the options are read from, all other sections are ignored.
+SECTIONS = ("Genome", "DefaultGenome", "DefaultSpeciesSet")
+
+
+@dataclass(frozen=True)
+class Config:
+    """
+    The settings of a run, validated once when created.
+
+    Besides the options, a config holds the values derived from them that hot paths need, computed
+    once: `input_keys` and `output_keys` as read-only NumPy ranges, `input_key_set` and `output_key_set`
+    for membership tests, `structural_chances`, the column of structural mutation chances `Genome.mutate_population`
+    compares a whole population's draws against, and `activation_table` and `aggregation_table`, the
+    registered functions indexed by id that mutation and deserialization look ids up in. Register custom
+    functions before creating the config. Every mutation has its own independent chance, so the chances
+    are kept as they are rather than as cumulative thresholds. A config is applied with `Genome.configure`.
+    """
+
+    num_inputs: int = 1
+    num_outputs: int = 1
+
+    # Chances of the structural mutations of a genome.
+    connection_add_prob: float = 0.0
+    connection_delete_prob: float = 0.0
+    node_add_prob: float = 0.0
+    node_delete_prob: float = 0.0
+
+    # Chances of the parameter mutations of every gene.
+    bias_mutation_chance: float = 0.0
+    activation_mutation_chance: float = 0.0
+    aggregation_mutation_chance: float = 0.0
+    response_mutation_chance: float = 0.0
+    weight_mutation_chance: float = 0.0
+    enabled_mutation_chance: float = 0.0
+
+    compatibility_weight_coefficient: float = 1.0
+    compatibility_disjoint_coefficient: float = 1.0
+    # Genomes closer than this distance are compatible: they mate and share a species.
+    compatibility_threshold: float = 3.0
+
+    input_keys: np.ndarray = field(init=False, repr=False, compare=False)
+    output_keys: np.ndarray = field(init=False, repr=False, compare=False)
+    input_key_set: frozenset[int] = field(init=False, repr=False, compare=False)
+    output_key_set: frozenset[int] = field(init=False, repr=False, compare=False)
+    structural_chances: np.ndarray = field(init=False, repr=False, compare=False)
+    activation_table: tuple = field(init=False, repr=False, compare=False)
+    aggregation_table: tuple = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        for option in _options():
+            value = getattr(self, option.name)
+            if option.type == "int":
+                if isinstance(value, bool) or not isinstance(value, int):
+                    raise TypeError(f"{option.name} must be of type int, got {value!r}.")
+                if value < 1:
+                    raise ValueError(f"{option.name} must be at least 1, got {value}.")
+            else:
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise TypeError(f"{option.name} must be of type float, got {value!r}.")
+                if option.name.startswith("compatibility_") and value < 0:
+                    raise ValueError(f"{option.name} must not be negative, got {value}.")
+                if not option.name.startswith("compatibility_") and not 0 <= value <= 1:
+                    raise ValueError(f"{option.name} must be a probability, got {value}.")
+                object.__setattr__(self, option.name, float(value))
+
+        # By convention, input pins have negative keys, and the output pins have keys 0,1,...
+        derived = {
+            "input_keys": np.arange(-1, -self.num_inputs - 1, -1),
+            "output_keys": np.arange(self.num_outputs),
+            "structural_chances": np.array([[self.connection_add_prob], [self.connection_delete_prob],
+                                            [self.node_add_prob], [self.node_delete_prob]]),
+        }
+        for name, array in derived.items():
+            array.flags.writeable = False
+            object.__setattr__(self, name, array)
+        object.__setattr__(self, "input_key_set", frozenset(self.input_keys.tolist()))
+        object.__setattr__(self, "output_key_set", frozenset(self.output_keys.tolist()))
+        object.__setattr__(self, "activation_table", tuple(Activations.registry))
+        object.__setattr__(self, "aggregation_table", tuple(Aggregations.registry))
+
+    @classmethod
+    def from_dict(cls, options: dict[str, object]) -> Config:
+        """
+        Create a config from a dict of options, which may use the neat-python names.
+
+        Raises:
+        - TypeError: If an option has the wrong type.
+        - ValueError: If an option is unknown or out of range.
+        """
+        names = {option.name for option in _options()}
+        values = {}
+        for name, value in options.items():
+            name = NEAT_PYTHON_NAMES.get(name, name)
+            if name not in names:
+                raise ValueError(f"Unknown option {name!r}.")
+            values[name] = value
+        return cls(**values)
+
+    @classmethod
+    def from_file(cls, path: str | os.PathLike) -> Config:
+        """
+        Read a config from the `[Genome]` section of an INI file, or of a TOML file if the path ends with
+        `.toml`. The `[DefaultGenome]` and `[DefaultSpeciesSet]` sections of a neat-python config are read as
+        well, ignoring the options this library does not have.
+
+        Parameters:
+        - path (str | os.PathLike): The file to read.
+
+        Raises:
+        - TypeError: If an option has the wrong type.
+        - ValueError: If an option is unknown, malformed or out of range.
+
+        Returns:
+        - Config: The validated config.
+        """
+        if os.fspath(path).endswith(".toml"):
+            import tomllib
+            with open(path, "rb") as f:
+                document = tomllib.load(f)
+            sections = {section: document.get(section, {}) for section in SECTIONS}
+        else:
+            import configparser
+            parser = configparser.ConfigParser()
+            with open(path) as f:
+                parser.read_file(f)
+            sections = {section: dict(parser.items(section)) if parser.has_section(section) else {} for section in SECTIONS}
+
+        types = {option.name: option.type for option in _options()}
+        options = {}
+        for section, values in sections.items():
+            for name, value in values.items():
+                option = NEAT_PYTHON_NAMES.get(name, name)
+                if option not in types:
+                    if section != "Genome":
+                        continue
+                    raise ValueError(f"Unknown option {name!r} in section [{section}].")
+                if isinstance(value, str):
+                    try:
+                        value = int(value) if types[option] == "int" else float(value)
+                    except ValueError:
+                        raise ValueError(f"Invalid value {value!r} for {name!r} in section [{section}].") from None
+                options[option] = value
+        return cls(**options)
+
+
+def _options() -> list:
+    """
+    The fields of `Config` that are set from options, in declaration order.
+    """
+    return [option for option in fields(Config) if option.init]
@@ -0,0 +1,28 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+from .lru import LRUCache
+
+if TYPE_CHECKING:
+    from .genome import Genome
+
+
+class DistanceCache(LRUCache):
+    """
+    A bounded cache of genomic distances with least recently used eviction, see `LRUCache`.
+
+    Entries are keyed by the (key, version) of both genomes. Every mutation bumps the version of a
+    genome, so distances involving its previous state are never returned again and simply age out.
+    """
+
+    def __init__(self, maxsize: int = 100_000) -> None:
+        super().__init__(maxsize)
+
+    @staticmethod
+    def key(g1: Genome, g2: Genome) -> tuple[int, int, int, int]:
+        """
+        Return the cache key of a pair of genomes. Distance is symmetric, so both orders share a key.
+        """
+        if g1.key <= g2.key:
+            return g1.key, g1.version, g2.key, g2.version
+        return g2.key, g2.version, g1.key, g1.version
@@ -0,0 +1,240 @@
+from __future__ import annotations
+import math
+import numpy as np
+
+
+class SpatialGrid:
+    """
+    A uniform grid over points in a rectangular world, answering batches of radius and nearest neighbor
+    queries with a handful of NumPy calls.
+
+    Every point has an integer id, e.g. the slot of an agent in a `RealTimePopulation` or the index of an
+    energy source, and the per-id arrays grow like the population's. The ids are kept sorted by grid
+    cell, so the points of a cell are one contiguous run of `order`. A query only visits the cells within
+    its radius, which makes sensing O(n) per tick instead of the O(n²) of scanning every point. Choose a
+    `cell_size` close to the typical query radius.
+
+    Moving points only re-sorts the ids if one of them changed its cell, and the re-sort is deferred to
+    the next query, so a whole tick of moves costs at most one rebuild. The rebuild is O(n) for grids of
+    up to 65536 cells, whose cell indices NumPy sorts with a radix sort, and O(n log n) beyond. Points
+    outside of the world are kept in the nearest border cell.
+    """
+
+    def __init__(self, width: float, height: float, cell_size: float) -> None:
+        if width <= 0 or height <= 0:
+            raise ValueError(f"The world must have a positive size, got {width}x{height}.")
+        if cell_size <= 0:
+            raise ValueError(f"{cell_size} must be positive.")
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.columns = max(1, math.ceil(width / cell_size))
+        self.rows = max(1, math.ceil(height / cell_size))
+
+        self.positions = np.zeros((0, 2))
+        self.active = np.zeros(0, dtype=bool)
+        # The cell of every active id, -1 for inactive ids.
+        self.cells = np.zeros(0, dtype=np.intp)
+        # The active ids sorted by cell, and the index of the first id of every cell in `order`.
+        self.order = np.zeros(0, dtype=np.intp)
+        self.cell_start = np.zeros(self.columns * self.rows + 1, dtype=np.intp)
+        # The stable sort of NumPy is a radix sort for integers of up to 16 bits, and a merge sort otherwise.
+        self._sort_dtype = np.uint16 if self.columns * self.rows <= 1 << 16 else np.intp
+        self.stale = False
+        self.rebuilds = 0
+        self._grow(0)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.active))
+
+    def _grow(self, capacity: int) -> None:
+        """
+        Extend the per-id arrays to hold at least `capacity` ids, doubling them so that growing is amortized O(1).
+        """
+        old = len(self.active)
+        new = max(16, 2 * old, capacity)
+        self.positions = np.concatenate([self.positions, np.zeros((new - old, 2))])
+        self.active = np.concatenate([self.active, np.zeros(new - old, dtype=bool)])
+        self.cells = np.concatenate([self.cells, np.full(new - old, -1, dtype=np.intp)])
+
+    def cell_of(self, points: np.ndarray) -> np.ndarray:
+        """
+        Return the index of the grid cell of every point of a (n, 2) array.
+        """
+        column = np.clip((points[:, 0] // self.cell_size).astype(np.intp), 0, self.columns - 1)
+        row = np.clip((points[:, 1] // self.cell_size).astype(np.intp), 0, self.rows - 1)
+        return row * self.columns + column
+
+    def insert(self, ids: np.ndarray, positions: np.ndarray) -> None:
+        """
+        Add points with the given ids, which must not be active yet.
+
+        Parameters:
+        - ids (np.ndarray): The ids of the new points.
+        - positions (np.ndarray): The (len(ids), 2) positions of the new points.
+
+        Raises:
+        - ValueError: If one of the ids is already active.
+        """
+        ids = np.asarray(ids, dtype=np.intp).reshape(-1)
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        if len(ids) and ids.max() >= len(self.active):
+            self._grow(ids.max() + 1)
+        if self.active[ids].any():
+            raise ValueError(f"Ids {ids[self.active[ids]].tolist()} are already active.")
+        self.positions[ids] = positions
+        self.active[ids] = True
+        self.cells[ids] = self.cell_of(positions)
+        self.stale = True
+
+    def remove(self, ids: np.ndarray) -> None:
+        """
+        Remove the points with the given ids.
+
+        Raises:
+        - ValueError: If one of the ids is not active.
+        """
+        ids = np.asarray(ids, dtype=np.intp).reshape(-1)
+        if not self.active[ids].all():
+            raise ValueError(f"Ids {ids[~self.active[ids]].tolist()} are not active.")
+        self.active[ids] = False
+        self.cells[ids] = -1
+        self.stale = True
+
+    def move(self, ids: np.ndarray, positions: np.ndarray) -> None:
+        """
+        Move the points with the given ids. The index is only rebuilt, on the next query, if a point changed its cell.
+
+        Raises:
+        - ValueError: If one of the ids is not active.
+        """
+        ids = np.asarray(ids, dtype=np.intp).reshape(-1)
+        if not self.active[ids].all():
+            raise ValueError(f"Ids {ids[~self.active[ids]].tolist()} are not active.")
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        self.positions[ids] = positions
+        cells = self.cell_of(positions)
+        if not self.stale and np.any(cells != self.cells[ids]):
+            self.stale = True
+        self.cells[ids] = cells
+
+    def _index(self) -> None:
+        """
+        Sort the active ids by cell if points were added, removed or changed their cell since the last query.
+        """
+        if not self.stale:
+            return
+        ids = np.flatnonzero(self.active)
+        self.order = ids[np.argsort(self.cells[ids].astype(self._sort_dtype), kind="stable")]
+        counts = np.bincount(self.cells[self.order], minlength=self.columns * self.rows)
+        self.cell_start[0] = 0
+        np.cumsum(counts, out=self.cell_start[1:])
+        self.stale = False
+        self.rebuilds += 1
+
+    def within(self, points: np.ndarray, radius: float, exclude: np.ndarray = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find the points within a radius of every query point.
+
+        Parameters:
+        - points (np.ndarray): The (m, 2) query points.
+        - radius (float): The query radius.
+        - exclude (np.ndarray): The id to leave out of the results of every query, e.g. the querying agent
+          itself, or None.
+
+        Returns:
+        - tuple[np.ndarray, np.ndarray, np.ndarray]: The query index, id and distance of every pair of a
+          query and a point within its radius, sorted by query.
+        """
+        self._index()
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        reach = math.ceil(radius / self.cell_size)
+        offsets = np.arange(-reach, reach + 1)
+        column = np.clip((points[:, 0] // self.cell_size).astype(np.intp), 0, self.columns - 1)
+        row = np.clip((points[:, 1] // self.cell_size).astype(np.intp), 0, self.rows - 1)
+
+        # The (query, row offset, column offset) cells around every query that lie in the grid.
+        columns = column[:, None, None] + offsets[None, None, :]
+        rows = row[:, None, None] + offsets[None, :, None]
+        valid = (columns >= 0) & (columns < self.columns) & (rows >= 0) & (rows < self.rows)
+        cells = (rows * self.columns + columns)[valid]
+        queries = np.broadcast_to(np.arange(len(points))[:, None, None], valid.shape)[valid]
+
+        # Expand every visited cell into its run of ids.
+        begin = self.cell_start[cells]
+        counts = self.cell_start[cells + 1] - begin
+        queries = np.repeat(queries, counts)
+        runs = np.repeat(begin - (np.cumsum(counts) - counts), counts)
+        ids = self.order[runs + np.arange(len(runs))]
+
+        delta = self.positions[ids] - points[queries]
+        squared = np.einsum("ij,ij->i", delta, delta)
+        keep = squared <= radius * radius
+        if exclude is not None:
+            keep &= ids != np.asarray(exclude)[queries]
+        return queries[keep], ids[keep], np.sqrt(squared[keep])
+
+    def nearest(self, points: np.ndarray, k: int, radius: float, exclude: np.ndarray = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k nearest points within a radius of every query point.
+
+        Parameters:
+        - points (np.ndarray): The (m, 2) query points.
+        - k (int): The number of neighbors to find per query.
+        - radius (float): The query radius, points further away are never returned.
+        - exclude (np.ndarray): The id to leave out of the results of every query, or None.
+
+        Returns:
+        - tuple[np.ndarray, np.ndarray]: The (m, k) ids of the neighbors, nearest first and padded with -1,
+          and their (m, k) distances, padded with infinity.
+        """
+        queries, ids, distances = self.within(points, radius, exclude)
+        m = len(np.asarray(points).reshape(-1, 2))
+        # Sort by query, then by distance: distances are at most the radius, so they only order the pairs
+        # of a query among themselves. One float sort is several times faster than `np.lexsort`.
+        by_distance = np.argsort(queries + distances / (2.0 * radius) if radius > 0 else queries, kind="stable")
+        queries, ids, distances = queries[by_distance], ids[by_distance], distances[by_distance]
+        # The rank of every pair within its query, the pairs of a query being contiguous.
+        rank = np.arange(len(queries)) - np.searchsorted(queries, queries)
+        keep = rank < k
+
+        nearest_ids = np.full((m, k), -1, dtype=np.intp)
+        nearest_distances = np.full((m, k), np.inf)
+        nearest_ids[queries[keep], rank[keep]] = ids[keep]
+        nearest_distances[queries[keep], rank[keep]] = distances[keep]
+        return nearest_ids, nearest_distances
+
+    def sense(self, points: np.ndarray, k: int, radius: float, out: np.ndarray, exclude: np.ndarray = None) -> np.ndarray:
+        """
+        Write what every query point senses of its k nearest points into network inputs.
+
+        Each neighbor takes three consecutive columns of `out`: its offset along x and y divided by the
+        radius, and its proximity, 1 at the query point falling to 0 at the radius. The columns of missing
+        neighbors are set to 0. `out` is typically a column slice of the input array of a `BatchNetwork`,
+        e.g. `inputs[:, 4:4 + 3 * k]`, which is written in place.
+
+        Parameters:
+        - points (np.ndarray): The (m, 2) query points.
+        - k (int): The number of neighbors to sense per query.
+        - radius (float): The sensing radius.
+        - out (np.ndarray): The (m, 3 * k) array to write into.
+        - exclude (np.ndarray): The id to leave out of the results of every query, or None.
+
+        Raises:
+        - ValueError: If the radius is not positive, or `out` does not have the shape (m, 3 * k).
+
+        Returns:
+        - np.ndarray: The (m, k) ids of the sensed neighbors, nearest first and padded with -1.
+        """
+        if radius <= 0:
+            raise ValueError(f"{radius} must be positive.")
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if out.shape != (len(points), 3 * k):
+            raise ValueError(f"Expected an output of shape {(len(points), 3 * k)}, got {out.shape}.")
+        ids, distances = self.nearest(points, k, radius, exclude)
+        found = ids >= 0
+        offsets = (self.positions[ids] - points[:, None, :]) / radius
+        out[:, 0::3] = np.where(found, offsets[:, :, 0], 0.0)
+        out[:, 1::3] = np.where(found, offsets[:, :, 1], 0.0)
+        out[:, 2::3] = np.where(found, 1.0 - distances / radius, 0.0)
+        return ids
@@ -1 +1 @@
-__all__ = ["activations", "aggregations"]
\ No newline at end of file
+__all__ = ["activations", "aggregations", "registry", "vectorized"]
\ No newline at end of file
@@ -1,11 +1,11 @@
 from __future__ import annotations
-
-from enum import Enum
-import random
 import math
+import random
 
+from .registry import Function, FunctionRegistry
 
-class Activations(Enum):
+
+class Activations():
     def sigmoid_activation(z: float) -> float:
         z = max(-60.0, min(60.0, 5.0 * z))
         return 1.0 / (1.0 + math.exp(-z))
@@ -90,43 +90,28 @@ class Activations(Enum):
     def cube_activation(z: float) -> float:
         return z ** 3
 
-    TANH = tanh_activation
-    SIGMOID = sigmoid_activation
-    SIN = sin_activation
-    GAUSS = gauss_activation
-    RELU = relu_activation
-    ELU = elu_activation
-    SELU = selu_activation
-    LELU = lelu_activation
-    EXP = exp_activation
-    HAT = hat_activation
-    INV = inv_activation
-    LOG = log_activation
-    CUBE = cube_activation
-    SQUARE = square_activation
-    CLAMPED = clamped_activation
-    ID = identity_activation
-    SOFTPLUS = softplus_activation
-
-    activations = {
-        TANH,
-        SIGMOID,
-        SIN,
-        GAUSS,
-        RELU,
-        ELU,
-        SELU,
-        LELU,
-        EXP,
-        HAT,
-        INV,
-        LOG,
-        CUBE,
-        SQUARE,
-        CLAMPED,
-        ID,
-        SOFTPLUS
-    }
+    # The dispatch table of all activation functions. Ids are part of the serialized format:
+    # only ever append new functions.
+    registry = FunctionRegistry("activation")
+
+    TANH = registry.register("Activations.TANH", __name__, tanh_activation)
+    SIGMOID = registry.register("Activations.SIGMOID", __name__, sigmoid_activation)
+    SIN = registry.register("Activations.SIN", __name__, sin_activation)
+    GAUSS = registry.register("Activations.GAUSS", __name__, gauss_activation)
+    RELU = registry.register("Activations.RELU", __name__, relu_activation)
+    ELU = registry.register("Activations.ELU", __name__, elu_activation)
+    SELU = registry.register("Activations.SELU", __name__, selu_activation)
+    LELU = registry.register("Activations.LELU", __name__, lelu_activation)
+    EXP = registry.register("Activations.EXP", __name__, exp_activation)
+    HAT = registry.register("Activations.HAT", __name__, hat_activation)
+    INV = registry.register("Activations.INV", __name__, inv_activation)
+    LOG = registry.register("Activations.LOG", __name__, log_activation)
+    CUBE = registry.register("Activations.CUBE", __name__, cube_activation)
+    SQUARE = registry.register("Activations.SQUARE", __name__, square_activation)
+    CLAMPED = registry.register("Activations.CLAMPED", __name__, clamped_activation)
+    ID = registry.register("Activations.ID", __name__, identity_activation)
+    SOFTPLUS = registry.register("Activations.SOFTPLUS", __name__, softplus_activation)
+    ABS = registry.register("Activations.ABS", __name__, abs_activation)
 
     @staticmethod
     def is_valid_activation(activation: Activations) -> bool:
@@ -139,7 +124,7 @@ class Activations(Enum):
         Returns:
         - bool: True if the activation function is valid, False otherwise.
         """
-        return activation in Activations.activations
+        return activation in Activations.registry
 
     @staticmethod
     def assert_activation(activation: Activations) -> None:
@@ -159,11 +144,25 @@ class Activations(Enum):
             raise ValueError(f"Provided function is not a valid activation function: {activation}.")
 
     @staticmethod
-    def get_random() -> Activations:
+    def resolve(activation: Activations) -> Function:
+        """
+        Return the registered activation function for the given function or its scalar implementation.
+
+        Raises:
+        - ValueError: If the provided function is not a valid activation function.
+        """
+        return Activations.registry.resolve(activation)
+
+    @staticmethod
+    def get_random(exclude: Function = None, rng: random.Random = random) -> Function:
         """
         Return a random activation function from the list of available activation functions.
 
+        Parameters:
+        - exclude (Function): An activation function that must not be returned.
+        - rng (random.Random): The random stream to draw from.
+
         Returns:
-            Activations: A randomly selected activation function from the list of available activation functions.
+            Function: A randomly selected activation function from the list of available activation functions.
         """
-        return random.choice(Activations.activations)
\ No newline at end of file
+        return Activations.registry.get_random(exclude, rng)
@@ -1,13 +1,15 @@
 from __future__ import annotations
+import math
 import random
-from functools import reduce
-from operator import mul
-from neat.math_util import mean, median2
+
+from .registry import Function, FunctionRegistry
 
 class Aggregations():
     #region functions
-    def product_aggregation(x: list[float]) -> float:  # note: `x` is a list or other iterable
-        return reduce(mul, x, 1.0)
+    # The scalar networks pass the weighted inputs of a node as a one-shot iterator rather than a list,
+    # so every aggregation has to accept any iterable and consume it once.
+    def product_aggregation(x: list[float]) -> float:
+        return math.prod(x, start=1.0)
 
     def sum_aggregation(x: list[float]) -> float:
         return sum(x)
@@ -26,41 +28,47 @@ class Aggregations():
 
 
     def median_aggregation(x: list[float]) -> float:
-        return median2(x)
+        # Sorting is done in C and beats any selection written in Python at every fan-in. The
+        # vectorized version selects with `np.partition` instead.
+        values = sorted(x)
+        n = len(values)
+        if n <= 2:
+            return sum(values) / n
+        i = n // 2
+        return values[i] if n % 2 else (values[i - 1] + values[i]) / 2.0
 
 
     def mean_aggregation(x: list[float]) -> float:
-        return mean(x)
+        if not isinstance(x, (list, tuple)):
+            x = list(x)
+        return sum(x) / len(x)
     #endregion
 
-    PRODUCT = product_aggregation
-    SUM = sum_aggregation
-    MAX = max_aggregation
-    MIN = min_aggregation
-    MAX_ABS = maxabs_aggregation
-    MEDIAN = median_aggregation
-    MEAN = mean_aggregation
-
-    aggregations = {
-        MAX,
-        MAX_ABS,
-        MEAN,
-        MEDIAN,
-        MIN,
-        PRODUCT,
-        MIN
-    }
+    # The dispatch table of all aggregation functions. Ids are part of the serialized format:
+    # only ever append new functions.
+    registry = FunctionRegistry("aggregation")
+
+    PRODUCT = registry.register("Aggregations.PRODUCT", __name__, product_aggregation)
+    SUM = registry.register("Aggregations.SUM", __name__, sum_aggregation)
+    MAX = registry.register("Aggregations.MAX", __name__, max_aggregation)
+    MIN = registry.register("Aggregations.MIN", __name__, min_aggregation)
+    MAX_ABS = registry.register("Aggregations.MAX_ABS", __name__, maxabs_aggregation)
+    MEDIAN = registry.register("Aggregations.MEDIAN", __name__, median_aggregation)
+    MEAN = registry.register("Aggregations.MEAN", __name__, mean_aggregation)
 
     @staticmethod
     def is_valid_aggregation(aggregation: Aggregations) -> bool:
-        return aggregation in Aggregations.aggregations
+        return aggregation in Aggregations.registry
 
     @staticmethod
     def assert_aggregation(aggregation: Aggregations) -> None:
         if not Aggregations.is_valid_aggregation(aggregation):
             raise ValueError(f"Provided function is not a valid aggregation function: {aggregation}.")
 
+    @staticmethod
+    def resolve(aggregation: Aggregations) -> Function:
+        return Aggregations.registry.resolve(aggregation)
 
     @staticmethod
-    def get_random() -> Aggregations:
-        return random.choice(Aggregations.aggregations)
\ No newline at end of file
+    def get_random(exclude: Function = None, rng: random.Random = random) -> Function:
+        return Aggregations.registry.get_random(exclude, rng)
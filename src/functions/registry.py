@@ -0,0 +1,120 @@
+from __future__ import annotations
+from typing import Callable, Iterator
+import importlib
+import random
+
+
+def _lookup(module: str, name: str) -> Function:
+    obj = importlib.import_module(module)
+    for part in name.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+class Function:
+    """
+    A registered activation or aggregation function.
+
+    Calling it runs the scalar implementation. `id` is a small integer that is stable across runs,
+    so it can be stored in arrays or written as a single byte, and `vectorized` is the NumPy
+    implementation used by the batch evaluators.
+    """
+
+    __slots__ = ("id", "name", "module", "scalar", "_vectorized")
+
+    def __init__(self, id: int, name: str, module: str, scalar: Callable) -> None:
+        self.id = id
+        self.name = name
+        self.module = module
+        self.scalar = scalar
+        self._vectorized: Callable = None
+
+    def __call__(self, *args):
+        return self.scalar(*args)
+
+    @property
+    def vectorized(self) -> Callable:
+        if self._vectorized is None:
+            # The NumPy implementations register themselves when their module is first imported.
+            from . import vectorized  # noqa: F401
+        return self._vectorized
+
+    @vectorized.setter
+    def vectorized(self, vectorized: Callable) -> None:
+        self._vectorized = vectorized
+
+    def __repr__(self) -> str:
+        return f"<{self.name} {self.id}>"
+
+    def __reduce__(self):
+        # Pickle registered functions by reference, so they stay singletons in other processes.
+        return _lookup, (self.module, self.name)
+
+
+class FunctionRegistry:
+    """
+    The dispatch table of one kind of function (activations or aggregations), indexed by id.
+    """
+
+    def __init__(self, kind: str) -> None:
+        self.kind = kind
+        self.functions: list[Function] = []
+        self._by_scalar: dict[Callable, Function] = {}
+
+    def register(self, name: str, module: str, scalar: Callable) -> Function:
+        """
+        Register a scalar function under the next free id.
+
+        Parameters:
+        - name (str): The qualified name the function can be looked up under, e.g. "Activations.TANH".
+        - module (str): The module `name` is found in.
+        - scalar (Callable): The scalar implementation.
+
+        Returns:
+        - Function: The registered function.
+        """
+        if len(self.functions) == 256:
+            raise ValueError(f"No more than 256 {self.kind} functions can be registered.")
+        function = Function(len(self.functions), name, module, scalar)
+        self.functions.append(function)
+        self._by_scalar[scalar] = function
+        return function
+
+    def resolve(self, function: Callable) -> Function:
+        """
+        Return the registered function for either a registered function or its scalar implementation.
+
+        Raises:
+        - ValueError: If the function is not registered.
+        """
+        if isinstance(function, Function) and self.functions[function.id] is function:
+            return function
+        try:
+            return self._by_scalar[function]
+        except (KeyError, TypeError):
+            raise ValueError(f"Provided function is not a valid {self.kind} function: {function}.") from None
+
+    def get_random(self, exclude: Function = None, rng: random.Random = random) -> Function:
+        """
+        Return a random registered function, other than `exclude` if given, drawn from `rng`.
+        """
+        if exclude is None:
+            return rng.choice(self.functions)
+        i = rng.randrange(len(self.functions) - 1)
+        return self.functions[i + 1 if i >= exclude.id else i]
+
+    def __getitem__(self, id: int) -> Function:
+        return self.functions[id]
+
+    def __contains__(self, function: Callable) -> bool:
+        try:
+            self.resolve(function)
+        except ValueError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[Function]:
+        return iter(self.functions)
+
+    def __len__(self) -> int:
+        return len(self.functions)
@@ -0,0 +1,180 @@
+from __future__ import annotations
+from typing import Callable
+import numpy as np
+
+from .activations import Activations
+from .aggregations import Aggregations
+
+# NumPy counterparts of the scalar functions in `Activations` and `Aggregations`, registered as their
+# `vectorized` implementation when this module is imported.
+# Activations take an array of pre-activations and are applied elementwise.
+# Aggregations take a (rows, fan_in) matrix of weighted inputs together with a boolean mask of the same
+# shape marking the entries that hold a real input (rows are padded up to the widest fan-in), and reduce
+# every row to a single value.
+
+#region activations
+def sigmoid_activation(z: np.ndarray) -> np.ndarray:
+    z = np.clip(5.0 * z, -60.0, 60.0)
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def tanh_activation(z: np.ndarray) -> np.ndarray:
+    return np.tanh(np.clip(2.5 * z, -60.0, 60.0))
+
+
+def sin_activation(z: np.ndarray) -> np.ndarray:
+    return np.sin(np.clip(5.0 * z, -60.0, 60.0))
+
+
+def gauss_activation(z: np.ndarray) -> np.ndarray:
+    z = np.clip(z, -3.4, 3.4)
+    return np.exp(-5.0 * z ** 2)
+
+
+def relu_activation(z: np.ndarray) -> np.ndarray:
+    return np.where(z > 0.0, z, 0.0)
+
+
+def elu_activation(z: np.ndarray) -> np.ndarray:
+    return np.where(z > 0.0, z, np.expm1(np.minimum(z, 0.0)))
+
+
+def lelu_activation(z: np.ndarray) -> np.ndarray:
+    return np.where(z > 0.0, z, 0.005 * z)
+
+
+def selu_activation(z: np.ndarray) -> np.ndarray:
+    lam = 1.0507009873554804934193349852946
+    alpha = 1.6732632423543772848170429916717
+    return np.where(z > 0.0, lam * z, lam * alpha * np.expm1(np.minimum(z, 0.0)))
+
+
+def softplus_activation(z: np.ndarray) -> np.ndarray:
+    z = np.clip(5.0 * z, -60.0, 60.0)
+    return 0.2 * np.log1p(np.exp(z))
+
+
+def identity_activation(z: np.ndarray) -> np.ndarray:
+    return z
+
+
+def clamped_activation(z: np.ndarray) -> np.ndarray:
+    return np.clip(z, -1.0, 1.0)
+
+
+def inv_activation(z: np.ndarray) -> np.ndarray:
+    out = np.zeros_like(z)
+    with np.errstate(over="ignore"):
+        np.divide(1.0, z, out=out, where=z != 0.0)
+    # The scalar version maps overflows to 0.0 as well.
+    out[~np.isfinite(out)] = 0.0
+    return out
+
+
+def log_activation(z: np.ndarray) -> np.ndarray:
+    return np.log(np.maximum(z, 1e-7))
+
+
+def exp_activation(z: np.ndarray) -> np.ndarray:
+    return np.exp(np.clip(z, -60.0, 60.0))
+
+
+def abs_activation(z: np.ndarray) -> np.ndarray:
+    return np.abs(z)
+
+
+def hat_activation(z: np.ndarray) -> np.ndarray:
+    return np.maximum(0.0, 1 - np.abs(z))
+
+
+def square_activation(z: np.ndarray) -> np.ndarray:
+    return z ** 2
+
+
+def cube_activation(z: np.ndarray) -> np.ndarray:
+    return z ** 3
+#endregion
+
+#region aggregations
+def product_aggregation(x: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    return np.where(mask, x, 1.0).prod(axis=1)
+
+
+def sum_aggregation(x: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    return np.where(mask, x, 0.0).sum(axis=1)
+
+
+def max_aggregation(x: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    return np.where(mask, x, -np.inf).max(axis=1)
+
+
+def min_aggregation(x: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    return np.where(mask, x, np.inf).min(axis=1)
+
+
+def maxabs_aggregation(x: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    i = np.where(mask, np.abs(x), -1.0).argmax(axis=1)
+    return np.take_along_axis(x, i[:, None], axis=1)[:, 0]
+
+
+def median_aggregation(x: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    # Padding is moved past the real inputs, then one partial sort places the middle elements of every
+    # row, for all the fan-ins present, instead of sorting whole rows.
+    counts = mask.sum(axis=1)
+    lower, upper = (counts - 1) // 2, counts // 2
+    values = np.partition(np.where(mask, x, np.inf), np.union1d(lower, upper), axis=1)
+    rows = np.arange(len(x))
+    return (values[rows, lower] + values[rows, upper]) / 2.0
+
+
+def mean_aggregation(x: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    return np.where(mask, x, 0.0).sum(axis=1) / mask.sum(axis=1)
+#endregion
+
+for _function, _vectorized in (
+        (Activations.TANH, tanh_activation),
+        (Activations.SIGMOID, sigmoid_activation),
+        (Activations.SIN, sin_activation),
+        (Activations.GAUSS, gauss_activation),
+        (Activations.RELU, relu_activation),
+        (Activations.ELU, elu_activation),
+        (Activations.SELU, selu_activation),
+        (Activations.LELU, lelu_activation),
+        (Activations.EXP, exp_activation),
+        (Activations.HAT, hat_activation),
+        (Activations.INV, inv_activation),
+        (Activations.LOG, log_activation),
+        (Activations.CUBE, cube_activation),
+        (Activations.SQUARE, square_activation),
+        (Activations.CLAMPED, clamped_activation),
+        (Activations.ID, identity_activation),
+        (Activations.SOFTPLUS, softplus_activation),
+        (Activations.ABS, abs_activation),
+        (Aggregations.PRODUCT, product_aggregation),
+        (Aggregations.SUM, sum_aggregation),
+        (Aggregations.MAX, max_aggregation),
+        (Aggregations.MIN, min_aggregation),
+        (Aggregations.MAX_ABS, maxabs_aggregation),
+        (Aggregations.MEDIAN, median_aggregation),
+        (Aggregations.MEAN, mean_aggregation)):
+    _function.vectorized = _vectorized
+
+
+def vectorize_activation(activation: Callable) -> Callable:
+    """
+    Return the NumPy counterpart of an activation function or of its scalar implementation.
+
+    Raises:
+    - ValueError: If the function is not a registered activation function.
+    """
+    return Activations.resolve(activation).vectorized
+
+
+def vectorize_aggregation(aggregation: Callable) -> Callable:
+    """
+    Return the NumPy counterpart of an aggregation function or of its scalar implementation.
+
+    Raises:
+    - ValueError: If the function is not a registered aggregation function.
+    """
+    return Aggregations.resolve(aggregation).vectorized
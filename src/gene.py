@@ -1,8 +1,10 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from random import Random
 import random
 from .functions.activations import Activations
 from .functions.aggregations import Aggregations
+from .functions.registry import Function
 
 class Gene(ABC):
     # The coefficient for each weight, bias, or response multiplier difference’s contribution to
@@ -11,13 +13,18 @@ class Gene(ABC):
     # activation functions, aggregation functions, or enabled/disabled status.
     compatibility_weight_coefficient = 1
 
+    # Genes are by far the most numerous objects, slots spare them a per-instance __dict__.
+    __slots__ = ("key",)
+
     def __init__(self, key) -> None:
         if key is None:
             raise TypeError(f"{key} is {None}.")
         self.key = key
     
+    # Every method drawing random numbers takes an `rng`, a `random.Random` such as a `RandomStream`,
+    # which defaults to the global `random` module.
     @abstractmethod
-    def mutate(self) -> None:
+    def mutate(self, rng: Random = random) -> bool:
         pass
 
     @abstractmethod
@@ -34,9 +41,16 @@ class Gene(ABC):
 
     @staticmethod
     @abstractmethod
-    def crossover(g1: Gene, g2: Gene) -> Gene:
+    def crossover(g1: Gene, g2: Gene, rng: Random = random) -> Gene:
         pass
 
+def _other_function(table: tuple[Function, ...], current: Function, rng: Random) -> Function:
+    """
+    Return a function of the id table other than `current`, like `FunctionRegistry.get_random` with `exclude`.
+    """
+    i = rng.randrange(len(table) - 1)
+    return table[i + 1 if i >= current.id else i]
+
 class NodeGeneType():
     # Sensor and input are the same
     SENSOR = 1
@@ -49,19 +63,31 @@ class NodeGene(Gene):
     ACTIVATION_FUNCTION_MUTATION_CHANCE = 0
     AGGREGATION_FUNCTION_MUTATION_CHANCE = 0
     RESPONSE_FUNCTION_MUTATION_CHANCE = 0
+    # The functions by id of the config, see `Config.activation_table`.
+    ACTIVATIONS: tuple[Function, ...] = tuple(Activations.registry)
+    AGGREGATIONS: tuple[Function, ...] = tuple(Aggregations.registry)
+
+    __slots__ = ("bias", "activation", "aggregation", "response")
 
-    def __init__(self, key: str, bias: float = 1, af: Activations = None, aggregation = None, response: float = 1) -> None:
+    # `activation` and `aggregation` hold registered functions (see `FunctionRegistry`), so they compare
+    # by their small integer id and plain scalar functions passed in are resolved to them.
+    def __init__(self, key: str, bias: float = 1, af: Activations = None, aggregation = None, response: float = 1,
+                 rng: Random = random) -> None:
         super().__init__(key)
         if not isinstance(bias, (float, int)):
             raise TypeError(f"{bias} must be of type float.")
         if af is None:
-            af = Activations.get_random()
+            af = Activations.get_random(rng=rng)
         elif not callable(af):
             raise TypeError(f"{af} is not an callable function.")
+        else:
+            af = Activations.resolve(af)
         if aggregation is None:
-            aggregation = Aggregations.get_random()
+            aggregation = Aggregations.get_random(rng=rng)
         elif not callable(aggregation):
             raise TypeError(f"{aggregation} is not a callable function.")
+        else:
+            aggregation = Aggregations.resolve(aggregation)
         if not isinstance(response, (float, int)):
             raise TypeError(f"{response} must be of type float.")
 
@@ -69,32 +95,55 @@ class NodeGene(Gene):
         self.activation = af
         self.aggregation = aggregation
         self.response = response
+
+    @classmethod
+    def unchecked(cls, key: int, bias: float, activation: Function, aggregation: Function, response: float) -> NodeGene:
+        """
+        Create a node gene from values that are known to be valid, skipping the checks of `__init__`.
+        `activation` and `aggregation` must be registered functions.
+        """
+        gene = cls.__new__(cls)
+        gene.key = key
+        gene.bias = bias
+        gene.activation = activation
+        gene.aggregation = aggregation
+        gene.response = response
+        return gene
     
-    def mutate(self) -> None:
-        super().mutate()
-        if random.random() <= NodeGene.BIAS_MUTATION_CHANCE:
-            self._mutate_bias()
-        if random.random() <= NodeGene.ACTIVATION_FUNCTION_MUTATION_CHANCE:
-            self._mutate_activation_function()
-        if random.random() <= NodeGene.AGGREGATION_FUNCTION_MUTATION_CHANCE:
-            self._mutate_aggregation_function()
-        if random.random() <= NodeGene.RESPONSE_FUNCTION_MUTATION_CHANCE:
-            self._mutate_response_function()
+    def mutate(self, rng: Random = random) -> bool:
+        """
+        Mutate every parameter with its chance, returning whether any of them was mutated.
+        """
+        super().mutate(rng)
+        mutated = False
+        if rng.random() < NodeGene.BIAS_MUTATION_CHANCE:
+            self._mutate_bias(rng)
+            mutated = True
+        if rng.random() < NodeGene.ACTIVATION_FUNCTION_MUTATION_CHANCE:
+            self._mutate_activation_function(rng)
+            mutated = True
+        if rng.random() < NodeGene.AGGREGATION_FUNCTION_MUTATION_CHANCE:
+            self._mutate_aggregation_function(rng)
+            mutated = True
+        if rng.random() < NodeGene.RESPONSE_FUNCTION_MUTATION_CHANCE:
+            self._mutate_response_function(rng)
+            mutated = True
+        return mutated
     
-    def _mutate_bias(self) -> None:
-        self.bias += random.gauss()
+    def _mutate_bias(self, rng: Random = random) -> None:
+        self.bias += rng.gauss()
     
-    def _mutate_activation_function(self) -> None:
-        self.activation = Activations.get_random()
+    def _mutate_activation_function(self, rng: Random = random) -> None:
+        self.activation = _other_function(NodeGene.ACTIVATIONS, self.activation, rng)
 
-    def _mutate_aggregation_function(self) -> None:
-        self.aggregation = Aggregations.get_random
+    def _mutate_aggregation_function(self, rng: Random = random) -> None:
+        self.aggregation = _other_function(NodeGene.AGGREGATIONS, self.aggregation, rng)
 
-    def _mutate_response_function(self) -> None:
-        self.response += random.gauss()
+    def _mutate_response_function(self, rng: Random = random) -> None:
+        self.response += rng.gauss()
 
     def copy(self) -> NodeGene:
-        return NodeGene(self.key, self.bias, self.activation, self.aggregation, self.response)
+        return NodeGene.unchecked(self.key, self.bias, self.activation, self.aggregation, self.response)
 
     def equals(self, gene: Gene) -> bool:
         raise NotImplementedError()
@@ -108,48 +157,70 @@ class NodeGene(Gene):
         return d * Gene.compatibility_weight_coefficient
 
     @staticmethod
-    def crossover(g1: NodeGene, g2: NodeGene) -> NodeGene:
+    def crossover(g1: NodeGene, g2: NodeGene, rng: Random = random) -> NodeGene:
         """ Creates a new gene randomly inheriting attributes from its parents."""
         assert g1.key == g2.key # TODO why is this needed?
 
         # Note: we use "a if random() > 0.5 else b" instead of choice((a, b))
         # here because `choice` is substantially slower.
-        bias = g1.bias if random.random() > 0.5 else g2.bias
-        activation = g1.activation if random.random() > 0.5 else g2.activation
-        aggregation = g1.aggregation if random.random() > 0.5 else g2.aggregation
-        response = g1.response if random.random() > 0.5 else g2.response
+        bias = g1.bias if rng.random() > 0.5 else g2.bias
+        activation = g1.activation if rng.random() > 0.5 else g2.activation
+        aggregation = g1.aggregation if rng.random() > 0.5 else g2.aggregation
+        response = g1.response if rng.random() > 0.5 else g2.response
 
-        return NodeGene(g1.key, bias, activation, aggregation, response)
+        return NodeGene.unchecked(g1.key, bias, activation, aggregation, response)
         
 class ConnectionGene(Gene):
     WEIGHT_MUTATION_CHANCE = 0
     ENABLED_MUTATION_CHANCE = 0
 
-    def __init__(self, _from: NodeGene, _to: NodeGene, weight = None, enabled: bool = True) -> None:
+    __slots__ = ("_from", "_to", "weight", "enabled")
+
+    def __init__(self, _from: NodeGene, _to: NodeGene, weight = None, enabled: bool = True, rng: Random = random) -> None:
         super().__init__((_from.key, _to.key))
         self._from: NodeGene = _from
         self._to: NodeGene = _to
         if weight is None:
-            weight = random.uniform()
+            weight = rng.gauss()
         self.weight = weight
         self.enabled = enabled
         #self.recurrent = False
+
+    @classmethod
+    def unchecked(cls, _from: NodeGene, _to: NodeGene, weight: float, enabled: bool) -> ConnectionGene:
+        """
+        Create a connection gene from values that are known to be valid, skipping `__init__`.
+        """
+        gene = cls.__new__(cls)
+        gene.key = (_from.key, _to.key)
+        gene._from = _from
+        gene._to = _to
+        gene.weight = weight
+        gene.enabled = enabled
+        return gene
     
-    def mutate(self) -> None:
-        super().mutate()
-        if random.random() <= ConnectionGene.WEIGHT_MUTATION_CHANCE:
-            self._mutate_weight()
-        if random.random() <= ConnectionGene.ENABLED_MUTATION_CHANCE:
+    def mutate(self, rng: Random = random) -> bool:
+        """
+        Mutate the weight and the enabled flag with their chances, returning whether either was mutated.
+        """
+        super().mutate(rng)
+        mutated = False
+        if rng.random() < ConnectionGene.WEIGHT_MUTATION_CHANCE:
+            self._mutate_weight(rng)
+            mutated = True
+        if rng.random() < ConnectionGene.ENABLED_MUTATION_CHANCE:
             self.enabled = not self.enabled
+            mutated = True
+        return mutated
 
-    def _mutate_weight(self) -> None:
-        self.weight += random.gauss()
+    def _mutate_weight(self, rng: Random = random) -> None:
+        self.weight += rng.gauss()
 
     def _mutate_enabled(self) -> None:
         self.enabled = not self.enabled
 
     def copy(self) -> ConnectionGene:
-        return ConnectionGene(self._from, self._to, self.weight, self.enabled)
+        return ConnectionGene.unchecked(self._from, self._to, self.weight, self.enabled)
 
     def equals(self, connection: ConnectionGene) -> bool:
         return self._from.equals(connection._from) and self._to.equals(connection._to)
@@ -161,13 +232,58 @@ class ConnectionGene(Gene):
         return d * Gene.compatibility_weight_coefficient
 
     @staticmethod
-    def crossover(g1: ConnectionGene, g2: ConnectionGene) -> ConnectionGene:
+    def crossover(g1: ConnectionGene, g2: ConnectionGene, rng: Random = random) -> ConnectionGene:
         """ Creates a new gene randomly inheriting attributes from its parents."""
         assert g1.key == g2.key # TODO why is this needed?
 
         # Note: we use "a if random() > 0.5 else b" instead of choice((a, b))
         # here because `choice` is substantially slower.
-        weight = g1.weight if random.random > 0.5 else g2.weight
-        enabled = g1.enabled if random.random > 0.5 else g2.enabled
+        weight = g1.weight if rng.random() > 0.5 else g2.weight
+        enabled = g1.enabled if rng.random() > 0.5 else g2.enabled
+
+        return ConnectionGene.unchecked(g1._from, g1._to, weight, enabled)
+
+def crossover_genes(nodes1: dict[int, NodeGene], connections1: dict[tuple[int, int], ConnectionGene],
+                    nodes2: dict[int, NodeGene], connections2: dict[tuple[int, int], ConnectionGene], rng: Random = random
+                    ) -> tuple[dict[int, NodeGene], dict[tuple[int, int], ConnectionGene]]:
+    """
+    Create the genes of an offspring of two parents.
+
+    Homologous genes take every attribute from a random parent, and a disjoint or excess gene is
+    inherited with probability 1/2. Nodes used by an inherited connection are always inherited, so the
+    offspring has no dangling connections. All coin flips come from a single `rng.getrandbits` call
+    and the genes are created without validation. `GeneArrays.crossover` does the same on arrays.
+
+    Returns:
+    - tuple[dict[int, NodeGene], dict[tuple[int, int], ConnectionGene]]: The node and connection genes of the offspring.
+    """
+    n = 2 * (len(connections1) + len(connections2)) + 4 * (len(nodes1) + len(nodes2)) + 1
+    flip = iter(f"{rng.getrandbits(n):0{n}b}").__next__
+
+    inherited = []
+    for key in connections1.keys() | connections2.keys():
+        cg1, cg2 = connections1.get(key), connections2.get(key)
+        if cg1 is None or cg2 is None:
+            if flip() == "1":
+                cg = cg1 or cg2
+                inherited.append((key, cg.weight, cg.enabled))
+        else:
+            inherited.append((key, cg1.weight if flip() == "1" else cg2.weight, cg1.enabled if flip() == "1" else cg2.enabled))
+    used = {node for key, _, _ in inherited for node in key}
+
+    nodes = {}
+    for key in nodes1.keys() | nodes2.keys():
+        ng1, ng2 = nodes1.get(key), nodes2.get(key)
+        if ng1 is None or ng2 is None:
+            if flip() == "1" or key in used:
+                ng = ng1 or ng2
+                nodes[key] = NodeGene.unchecked(key, ng.bias, ng.activation, ng.aggregation, ng.response)
+        else:
+            nodes[key] = NodeGene.unchecked(key, ng1.bias if flip() == "1" else ng2.bias,
+                                            ng1.activation if flip() == "1" else ng2.activation,
+                                            ng1.aggregation if flip() == "1" else ng2.aggregation,
+                                            ng1.response if flip() == "1" else ng2.response)
 
-        return ConnectionGene(g1._from, g1._to, weight, enabled)
+    connections = {key: ConnectionGene.unchecked(nodes[key[0]], nodes[key[1]], weight, enabled)
+                   for key, weight, enabled in inherited}
+    return nodes, connections
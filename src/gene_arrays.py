@@ -0,0 +1,436 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+import numpy as np
+import random
+
+from .gene import NodeGene, ConnectionGene
+
+if TYPE_CHECKING:
+    from .genome import Genome
+
+
+def connection_innovation(key: tuple[int, int]) -> int:
+    """
+    Pack the (from, to) key of a connection into a single integer, so that connection genes can be
+    sorted and matched by innovation like node genes. Node keys must fit into 32 bits.
+    """
+    return (key[0] << 32) | (key[1] & 0xFFFFFFFF)
+
+
+def connection_nodes(innovations: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Unpack an array of connection innovations into the arrays of their from and to node keys.
+    """
+    return innovations >> 32, innovations.astype(np.int32).astype(np.int64)
+
+
+class GeneArrays:
+    """
+    The genes of a genome as parallel arrays sorted by innovation key.
+
+    Node genes are stored as key, bias, response, activation and aggregation registry id, connection genes as
+    packed key (see `connection_innovation`), weight and enabled flag. Homologous genes of two genomes are
+    matched with one `np.intersect1d` per gene type instead of dict lookups and per-gene method calls.
+    """
+
+    NODE_FIELDS = ("node_keys", "node_bias", "node_response", "node_activation", "node_aggregation")
+    CONNECTION_FIELDS = ("connection_keys", "connection_weight", "connection_enabled")
+    FIELDS = NODE_FIELDS + CONNECTION_FIELDS
+
+    def __init__(self, node_keys: np.ndarray, node_bias: np.ndarray, node_response: np.ndarray,
+                 node_activation: np.ndarray, node_aggregation: np.ndarray,
+                 connection_keys: np.ndarray, connection_weight: np.ndarray, connection_enabled: np.ndarray) -> None:
+        self.node_keys = node_keys
+        self.node_bias = node_bias
+        self.node_response = node_response
+        self.node_activation = node_activation
+        self.node_aggregation = node_aggregation
+        self.connection_keys = connection_keys
+        self.connection_weight = connection_weight
+        self.connection_enabled = connection_enabled
+
+    @staticmethod
+    def create(nodes: dict[int, NodeGene], connections: dict[tuple[int, int], ConnectionGene]) -> GeneArrays:
+        """
+        Build the sorted array form of the given genes.
+
+        Parameters:
+        - nodes (dict[int, NodeGene]): The node genes of a genome.
+        - connections (dict[tuple[int, int], ConnectionGene]): The connection genes of a genome.
+
+        Returns:
+        - GeneArrays: The genes as arrays sorted by innovation key.
+        """
+        ng = [nodes[key] for key in sorted(nodes)]
+        node_keys = np.fromiter((n.key for n in ng), dtype=np.int64, count=len(ng))
+        node_bias = np.fromiter((n.bias for n in ng), dtype=np.float64, count=len(ng))
+        node_response = np.fromiter((n.response for n in ng), dtype=np.float64, count=len(ng))
+        node_activation = np.fromiter((n.activation.id for n in ng), dtype=np.uint8, count=len(ng))
+        node_aggregation = np.fromiter((n.aggregation.id for n in ng), dtype=np.uint8, count=len(ng))
+
+        cg = sorted(connections.values(), key=lambda c: connection_innovation(c.key))
+        connection_keys = np.fromiter((connection_innovation(c.key) for c in cg), dtype=np.int64, count=len(cg))
+        connection_weight = np.fromiter((c.weight for c in cg), dtype=np.float64, count=len(cg))
+        connection_enabled = np.fromiter((c.enabled for c in cg), dtype=bool, count=len(cg))
+
+        return GeneArrays(node_keys, node_bias, node_response, node_activation, node_aggregation,
+                          connection_keys, connection_weight, connection_enabled)
+
+    def genes(self) -> tuple[dict[int, NodeGene], dict[tuple[int, int], ConnectionGene]]:
+        """
+        Build the node and connection gene dicts back from the arrays.
+        """
+        activations, aggregations = NodeGene.ACTIVATIONS, NodeGene.AGGREGATIONS
+        nodes = {key: NodeGene.unchecked(key, bias, activations[activation], aggregations[aggregation], response)
+                 for key, bias, response, activation, aggregation in zip(
+                     self.node_keys.tolist(), self.node_bias.tolist(), self.node_response.tolist(),
+                     self.node_activation.tolist(), self.node_aggregation.tolist())}
+
+        connection = ConnectionGene.unchecked
+        from_keys, to_keys = connection_nodes(self.connection_keys)
+        connections = {(a, b): connection(nodes[a], nodes[b], weight, enabled)
+                       for a, b, weight, enabled in zip(from_keys.tolist(), to_keys.tolist(),
+                                                        self.connection_weight.tolist(), self.connection_enabled.tolist())}
+        return nodes, connections
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in GeneArrays.FIELDS)
+
+    @staticmethod
+    def crossover(a: GeneArrays, b: GeneArrays, rng: random.Random = random) -> GeneArrays:
+        """
+        Create the genes of an offspring of two parents.
+
+        Homologous genes take every attribute from a random parent, and a disjoint or excess gene is
+        inherited with probability 1/2. Nodes used by an inherited connection are always inherited, so
+        the offspring has no dangling connections. Both parents are merged along their sorted keys in
+        one pass per gene type, and all coin flips come from a single `rng.getrandbits` call.
+
+        Parameters:
+        - a (GeneArrays): The genes of the first parent.
+        - b (GeneArrays): The genes of the second parent.
+        - rng (random.Random): The random stream to draw from.
+
+        Returns:
+        - GeneArrays: The genes of the offspring.
+        """
+        connection_first, connection_second = _merge(a.connection_keys, b.connection_keys)
+        node_first, node_second = _merge(a.node_keys, b.node_keys)
+        num_connection_flips = len(connection_first) * len(GeneArrays.CONNECTION_FIELDS)
+        flips = _coin_flips(num_connection_flips + len(node_first) * len(GeneArrays.NODE_FIELDS), rng)
+        connection_flips = flips[:num_connection_flips].reshape(len(GeneArrays.CONNECTION_FIELDS), -1)
+        node_flips = flips[num_connection_flips:].reshape(len(GeneArrays.NODE_FIELDS), -1)
+
+        # The first row of flips decides on disjoint genes, every row picks the parent of one field.
+        connections = (connection_second >= 0) | connection_flips[0]
+        connection_fields = _inherit(a, b, GeneArrays.CONNECTION_FIELDS, connection_first, connection_second,
+                                     connection_flips, connections)
+
+        nodes = (node_second >= 0) | node_flips[0]
+        node_keys = np.concatenate([a.node_keys, b.node_keys])[node_first]
+        used = np.searchsorted(node_keys, np.concatenate(connection_nodes(connection_fields[0])))
+        nodes[used[used < len(node_keys)]] = True
+        node_fields = _inherit(a, b, GeneArrays.NODE_FIELDS, node_first, node_second, node_flips, nodes)
+        return GeneArrays(*node_fields, *connection_fields)
+
+    def mutate(self, rng: np.random.Generator) -> None:
+        """
+        Mutate the parameters of all genes in place, with the chances of `NodeGene.mutate` and
+        `ConnectionGene.mutate`, drawing every mask and perturbation in bulk (see `draw_mutations`).
+
+        Only mutate arrays that no genome caches, such as those of a `GenomeStore` or of an offspring.
+        """
+        mutations = draw_mutations(rng, len(self.node_keys), len(self.connection_keys))
+        for name, field in (("bias", self.node_bias), ("response", self.node_response), ("weight", self.connection_weight)):
+            genes, perturbation = mutations[name]
+            field[genes] += perturbation
+        for name, field in (("activation", self.node_activation), ("aggregation", self.node_aggregation)):
+            genes, draw = mutations[name]
+            field[genes] = other_function(draw, field[genes])
+        genes, _ = mutations["enabled"]
+        self.connection_enabled[genes] ^= True
+
+    def distance(self, other: GeneArrays, weight_coefficient: float, disjoint_coefficient: float) -> float:
+        """
+        Compute the genomic distance to the other genes.
+
+        Parameters:
+        - other (GeneArrays): The genes to compare with.
+        - weight_coefficient (float): The contribution of parameter differences of homologous genes.
+        - disjoint_coefficient (float): The contribution of each disjoint or excess gene.
+
+        Returns:
+        - float: The sum of the node and connection distance components.
+        """
+        node_distance = 0.0
+        max_nodes = max(len(self.node_keys), len(other.node_keys))
+        if max_nodes:
+            _, i, j = np.intersect1d(self.node_keys, other.node_keys, assume_unique=True, return_indices=True)
+            disjoint_nodes = len(self.node_keys) + len(other.node_keys) - 2 * len(i)
+            homologous = (np.abs(self.node_bias[i] - other.node_bias[j]).sum()
+                          + np.abs(self.node_response[i] - other.node_response[j]).sum()
+                          + np.count_nonzero(self.node_activation[i] != other.node_activation[j])
+                          + np.count_nonzero(self.node_aggregation[i] != other.node_aggregation[j]))
+            node_distance = (weight_coefficient * homologous + disjoint_coefficient * disjoint_nodes) / max_nodes
+
+        connection_distance = 0.0
+        max_connections = max(len(self.connection_keys), len(other.connection_keys))
+        if max_connections:
+            _, i, j = np.intersect1d(self.connection_keys, other.connection_keys, assume_unique=True, return_indices=True)
+            disjoint_connections = len(self.connection_keys) + len(other.connection_keys) - 2 * len(i)
+            homologous = (np.abs(self.connection_weight[i] - other.connection_weight[j]).sum()
+                          + np.count_nonzero(self.connection_enabled[i] != other.connection_enabled[j]))
+            connection_distance = (weight_coefficient * homologous + disjoint_coefficient * disjoint_connections) / max_connections
+
+        return float(node_distance + connection_distance)
+
+
+def draw_mutations(rng: np.random.Generator, num_nodes: int, num_connections: int) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """
+    Draw the parameter mutations of many genes at once.
+
+    Every node gene mutates its bias, activation, aggregation and response with the chances set on
+    `NodeGene`, and every connection gene its weight and enabled flag with those set on `ConnectionGene`,
+    exactly as their `mutate` methods do. The draws only depend on the generator state and the gene counts,
+    so a seeded generator reproduces them.
+
+    Parameters:
+    - rng (np.random.Generator): The generator to draw from.
+    - num_nodes (int): The number of node genes.
+    - num_connections (int): The number of connection genes.
+
+    Returns:
+    - dict[str, tuple[np.ndarray, np.ndarray]]: For every field ("bias", "activation", "aggregation",
+      "response", "weight" and "enabled"), the indices of the mutated genes and their draw: a standard
+      normal perturbation for numbers, the input of `other_function` for functions, and nothing for the flag.
+    """
+    mutations = {}
+    for name, count, chance in (("bias", num_nodes, NodeGene.BIAS_MUTATION_CHANCE),
+                                ("activation", num_nodes, NodeGene.ACTIVATION_FUNCTION_MUTATION_CHANCE),
+                                ("aggregation", num_nodes, NodeGene.AGGREGATION_FUNCTION_MUTATION_CHANCE),
+                                ("response", num_nodes, NodeGene.RESPONSE_FUNCTION_MUTATION_CHANCE),
+                                ("weight", num_connections, ConnectionGene.WEIGHT_MUTATION_CHANCE),
+                                ("enabled", num_connections, ConnectionGene.ENABLED_MUTATION_CHANCE)):
+        genes = np.flatnonzero(rng.random(count) < chance) if chance > 0 else np.zeros(0, dtype=np.intp)
+        if name == "activation":
+            draw = rng.integers(0, len(NodeGene.ACTIVATIONS) - 1, size=len(genes))
+        elif name == "aggregation":
+            draw = rng.integers(0, len(NodeGene.AGGREGATIONS) - 1, size=len(genes))
+        elif name == "enabled":
+            draw = None
+        else:
+            draw = rng.standard_normal(len(genes))
+        mutations[name] = genes, draw
+    return mutations
+
+
+def other_function(draw: np.ndarray, current: np.ndarray) -> np.ndarray:
+    """
+    Map draws uniform over [0, len(registry) - 1) to function ids uniform over all ids but `current`,
+    like `FunctionRegistry.get_random` with `exclude`.
+    """
+    return (draw + (draw >= current)).astype(current.dtype)
+
+
+def _merge(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merge two sorted arrays of unique keys. For every key of their union, in order, returns its index in
+    `np.concatenate([a, b])`, and the index of its copy from `b` if it is in both arrays or -1 otherwise.
+    """
+    keys = np.concatenate([a, b])
+    # A stable sort of two sorted runs is a single merge pass, and puts the copy from `a` first.
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    first = np.ones(len(keys), dtype=bool)
+    np.not_equal(keys[1:], keys[:-1], out=first[1:])
+    starts = np.flatnonzero(first)
+    second = np.full(len(starts), -1, dtype=np.intp)
+    homologous = np.flatnonzero(~first) - 1
+    second[np.searchsorted(starts, homologous)] = order[homologous + 1]
+    return order[starts], second
+
+
+def _coin_flips(n: int, rng: random.Random) -> np.ndarray:
+    """
+    Draw n fair coin flips with a single call to `rng`.
+    """
+    if not n:
+        return np.zeros(0, dtype=bool)
+    bits = rng.getrandbits(-(-n // 8) * 8).to_bytes(-(-n // 8), "little")
+    return np.unpackbits(np.frombuffer(bits, dtype=np.uint8), count=n).view(bool)
+
+
+def _inherit(a: GeneArrays, b: GeneArrays, names: tuple[str, ...], first: np.ndarray, second: np.ndarray,
+             flips: np.ndarray, keep: np.ndarray) -> list[np.ndarray]:
+    """
+    Gather the given fields of the kept genes along merged keys (see `_merge`). Row i of `flips` picks
+    the first copy of field i where it is set or there is no second copy, and the second copy otherwise.
+    """
+    first, second = first[keep], second[keep]
+    index = np.where(flips[:, keep] | (second < 0), first, second)
+    return [np.concatenate([getattr(a, name), getattr(b, name)])[i] for name, i in zip(names, index)]
+
+
+# Upper bound on the number of cells of the dense per-block tables built by `distance_matrix`.
+_BLOCK_CELLS = 1 << 22
+
+_NODE_FIELDS = ("node_keys", ("node_bias", "node_response"), ("node_activation", "node_aggregation"))
+_CONNECTION_FIELDS = ("connection_keys", ("connection_weight",), ("connection_enabled",))
+
+
+def _dense(genes: list[GeneArrays], vocabulary: np.ndarray, keys: str, fields: tuple[str, ...]) -> tuple[np.ndarray, list[np.ndarray]]:
+    """
+    Scatter the genes of several genomes into (genomes, vocabulary) tables.
+    """
+    present = np.zeros((len(genes), len(vocabulary)), dtype=bool)
+    tables = [np.zeros((len(genes), len(vocabulary)), dtype=getattr(genes[0], f).dtype) for f in fields]
+    for row, g in enumerate(genes):
+        columns = np.searchsorted(vocabulary, getattr(g, keys))
+        present[row, columns] = True
+        for table, f in zip(tables, fields):
+            table[row, columns] = getattr(g, f)
+    return present, tables
+
+
+def _component_matrix(rows: list[GeneArrays], columns: list[GeneArrays], keys: str, numeric: tuple[str, ...],
+                      categorical: tuple[str, ...], weight_coefficient: float, disjoint_coefficient: float) -> np.ndarray:
+    """
+    One distance component (nodes or connections) between every pair of rows and columns.
+    """
+    result = np.zeros((len(rows), len(columns)))
+    vocabulary = np.unique(np.concatenate([getattr(g, keys) for g in rows + columns]))
+    if not len(vocabulary):
+        return result
+
+    fields = numeric + categorical
+    column_present, column_tables = _dense(columns, vocabulary, keys, fields)
+    column_counts = column_present.sum(axis=1)
+    block = max(1, _BLOCK_CELLS // len(vocabulary))
+    for start in range(0, len(rows), block):
+        row_present, row_tables = _dense(rows[start:start + block], vocabulary, keys, fields)
+        row_counts = row_present.sum(axis=1)
+
+        common = row_present.astype(np.float64) @ column_present.T.astype(np.float64)
+        disjoint = row_counts[:, None] + column_counts[None, :] - 2 * common
+        homologous = np.empty_like(common)
+        for c in range(len(columns)):
+            both = row_present & column_present[c]
+            d = np.zeros(row_present.shape)
+            for table, column_table in zip(row_tables[:len(numeric)], column_tables[:len(numeric)]):
+                d += np.abs(table - column_table[c])
+            for table, column_table in zip(row_tables[len(numeric):], column_tables[len(numeric):]):
+                d += table != column_table[c]
+            homologous[:, c] = np.where(both, d, 0.0).sum(axis=1)
+
+        max_counts = np.maximum(row_counts[:, None], column_counts[None, :])
+        total = weight_coefficient * homologous + disjoint_coefficient * disjoint
+        result[start:start + block] = np.divide(total, max_counts, out=np.zeros_like(total), where=max_counts > 0)
+    return result
+
+
+def distance_matrix(rows: list[GeneArrays], columns: list[GeneArrays], weight_coefficient: float,
+                    disjoint_coefficient: float) -> np.ndarray:
+    """
+    Compute the genomic distance between every pair of genes from `rows` and `columns`.
+
+    All genomes are scattered into dense tables over the union of their innovation keys, so the
+    disjoint gene counts of all pairs come out of one matrix product and the homologous differences
+    take one vectorized pass per column. Pass the smaller list (e.g. the species representatives) as
+    `columns`.
+
+    Parameters:
+    - rows (list[GeneArrays]): The genes of the first set of genomes.
+    - columns (list[GeneArrays]): The genes of the second set of genomes.
+    - weight_coefficient (float): The contribution of parameter differences of homologous genes.
+    - disjoint_coefficient (float): The contribution of each disjoint or excess gene.
+
+    Returns:
+    - np.ndarray: The (len(rows), len(columns)) matrix of distances.
+    """
+    if not rows or not columns:
+        return np.zeros((len(rows), len(columns)))
+    return (_component_matrix(rows, columns, *_NODE_FIELDS, weight_coefficient, disjoint_coefficient)
+            + _component_matrix(rows, columns, *_CONNECTION_FIELDS, weight_coefficient, disjoint_coefficient))
+
+
+class GenomeStore:
+    """
+    Many genomes packed into one struct-of-arrays.
+
+    The `GeneArrays` fields of all genomes are concatenated, and the genes of the i-th genome are the
+    slices between `node_offsets[i]`/`node_offsets[i + 1]` and `connection_offsets[i]`/`connection_offsets[i + 1]`.
+    A stored genome costs a few bytes per gene instead of a Python object per gene. `gene_arrays(i)`
+    returns zero-copy views of one genome, and `genome(i)` materializes it back into a regular `Genome`.
+    """
+
+    def __init__(self, keys: np.ndarray, node_offsets: np.ndarray, connection_offsets: np.ndarray, genes: GeneArrays) -> None:
+        self.keys = keys
+        self.node_offsets = node_offsets
+        self.connection_offsets = connection_offsets
+        self.genes = genes
+
+    @staticmethod
+    def pack(genomes: list[Genome]) -> GenomeStore:
+        """
+        Pack the given genomes into a new store.
+
+        Parameters:
+        - genomes (list[Genome]): The genomes to pack.
+
+        Returns:
+        - GenomeStore: The store, whose i-th genome corresponds to genomes[i].
+        """
+        return GenomeStore.concatenate([g.key for g in genomes], [g.gene_arrays() for g in genomes])
+
+    @staticmethod
+    def concatenate(keys: list[int], arrays: list[GeneArrays]) -> GenomeStore:
+        """
+        Pack the given gene arrays into a new store.
+
+        Parameters:
+        - keys (list[int]): The keys of the genomes.
+        - arrays (list[GeneArrays]): The genes of the genomes, in the same order.
+
+        Returns:
+        - GenomeStore: The store, whose i-th genome has keys[i] and arrays[i].
+        """
+        keys = np.fromiter(keys, dtype=np.int64, count=len(arrays))
+        node_offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+        np.cumsum([len(a.node_keys) for a in arrays], out=node_offsets[1:])
+        connection_offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+        np.cumsum([len(a.connection_keys) for a in arrays], out=connection_offsets[1:])
+
+        empty = GeneArrays.create({}, {})
+        genes = GeneArrays(*(np.concatenate([getattr(a, name) for a in arrays] or [getattr(empty, name)])
+                             for name in GeneArrays.FIELDS))
+        return GenomeStore(keys, node_offsets, connection_offsets, genes)
+
+    def gene_arrays(self, i: int) -> GeneArrays:
+        """
+        Return views of the genes of the i-th genome.
+        """
+        nodes = slice(self.node_offsets[i], self.node_offsets[i + 1])
+        connections = slice(self.connection_offsets[i], self.connection_offsets[i + 1])
+        return GeneArrays(*(getattr(self.genes, name)[nodes] for name in GeneArrays.NODE_FIELDS),
+                          *(getattr(self.genes, name)[connections] for name in GeneArrays.CONNECTION_FIELDS))
+
+    def mutate(self, rng: np.random.Generator) -> None:
+        """
+        Mutate the parameters of every stored genome in place, with a single bulk draw for the whole store.
+        """
+        self.genes.mutate(rng)
+
+    def genome(self, i: int) -> Genome:
+        """
+        Materialize the i-th genome, see `Genome.from_gene_arrays`.
+        """
+        from .genome import Genome
+        return Genome.from_gene_arrays(self.gene_arrays(i))
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.node_offsets.nbytes + self.connection_offsets.nbytes + self.genes.nbytes
+
+    def __len__(self) -> int:
+        return len(self.keys)
@@ -1,104 +1,179 @@
 from __future__ import annotations
-from .gene import Gene, NodeGene, ConnectionGene
+from .gene import Gene, NodeGene, ConnectionGene, crossover_genes
+from .config import Config
+from .distance_cache import DistanceCache
+from .innovation import InnovationTracker
+from .gene_arrays import GeneArrays, distance_matrix, draw_mutations, other_function
+from .nn.network import FeedForwardNetwork, RecurrentNetwork, create_network
+from .nn.codegen import create_generated_network
+from .nn.plan import PlanCache
+from .rng import RandomStream
+import numpy as np
 import random
 from itertools import count
+from random import Random
 
 
 class Genome:
-    CONNECTION_ADD_PROB: float
-    CONNECTION_DEL_PROP: float
-    NODE_ADD_PROB: float
-    NODE_DEL_PROB: float
-
-    NUM_INPUTS: int
-    NUM_OUTPUTS: int
+    # The settings all genomes share, see `configure`. Hot paths read the values precomputed by the config.
+    config: Config = Config()
 
     # By convention, input pins have negative keys, and the output pins have keys 0,1,...
-    INPUT_KEYS: list[str] = [-i - 1 for i in range(NUM_INPUTS)]
-    OUTPUT_KEYS: list[str] = [i for i in range(NUM_OUTPUTS)]
+    INPUT_KEYS: list[int] = config.input_keys.tolist()
+    OUTPUT_KEYS: list[int] = config.output_keys.tolist()
     
-    compatibility_disjoint_coefficient = 1 # The coefficient for the disjoint and excess gene counts’ contribution to the genomic distance.
+    # Parents with at least this many connections together are crossed over as sorted arrays, below
+    # that the fixed cost of the NumPy calls outweighs walking the gene dicts.
+    ARRAY_CROSSOVER_MIN_CONNECTIONS = 400
 
-    def __init__(self, nodes: dict[str, NodeGene] = None, connections: dict[str, ConnectionGene] = None) -> None:
+    compatibility_disjoint_coefficient = 1 # The coefficient for the disjoint and excess gene counts’ contribution to the genomic distance.
+    compatibility_threshold = 3.0 # Genomes closer than this distance are compatible, see `SpeciesSet` and `RealTimePopulation`.
+
+    # Set to a DistanceCache to memoize `distance` between genomes that did not change in the meantime.
+    distance_cache: DistanceCache = None
+    # Shared by all genomes, so that the same split gets the same node key in every genome.
+    innovations = InnovationTracker()
+    # Set to a PlanCache to build the networks of genomes with an already seen structure from its cached plan.
+    plan_cache: PlanCache = None
+    # Set to True, e.g. on a long-lived champion, to activate the genome through code generated for its
+    # network (see `GeneratedNetwork`) instead of the generic evaluator.
+    generate_network = False
+
+    _keys = count()
+
+    def __init__(self, nodes: dict[str, NodeGene] = None, connections: dict[str, ConnectionGene] = None,
+                 rng: Random = random) -> None:
+        # Unique for the lifetime of the process, unlike id() which is reused once a genome is collected.
+        self.key = next(Genome._keys)
         if not nodes:
             nodes = {}
             for key in Genome.INPUT_KEYS:
-                nodes[key] = NodeGene(self.get_new_node_key(nodes))
+                nodes[key] = NodeGene(key, rng=rng)
             for key in Genome.OUTPUT_KEYS:
-                nodes[key] = NodeGene(self.get_new_node_key(nodes))
+                nodes[key] = NodeGene(key, rng=rng)
+            Genome.innovations.reserve(max(Genome.OUTPUT_KEYS, default=-1))
         self.nodes = nodes
 
         if not connections:
             connections = {}
         self.connections = connections
 
-    def activate(self, inputs):
-        if len(self.input_nodes) != len(inputs):
-            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(len(self.input_nodes), len(inputs)))
+        # `version` is bumped by every mutation, and `dirty_nodes` collects the nodes that changed or whose
+        # incoming connections changed since the network was last synced. The network is compiled lazily on the
+        # first activation and patched on the next activation after a change.
+        # Changes made to `nodes` or `connections` directly are not tracked.
+        self.version = 0
+        self.dirty_nodes: set[int] = set()
+        self.network: FeedForwardNetwork | RecurrentNetwork = None
+        self.network_version = -1
+        self._gene_arrays: GeneArrays = None
+        self._gene_arrays_version = -1
 
-        for k, v in zip(self.input_nodes, inputs):
-            self.values[k] = v
-
-        for node, act_func, agg_func, bias, response, links in self.node_evals:
-            node_inputs = []
-            for i, w in links:
-                node_inputs.append(self.values[i] * w)
-            s = agg_func(node_inputs)
-            self.values[node] = act_func(bias + response * s)
-
-        return [self.values[i] for i in self.output_nodes]
+    @classmethod
+    def configure(cls, config: Config) -> None:
+        """
+        Apply the config to all genomes and genes. Genes already created keep their structure.
+        """
+        Genome.config = config
+        Genome.INPUT_KEYS = config.input_keys.tolist()
+        Genome.OUTPUT_KEYS = config.output_keys.tolist()
+        Genome.compatibility_disjoint_coefficient = config.compatibility_disjoint_coefficient
+        Genome.compatibility_threshold = config.compatibility_threshold
+        Gene.compatibility_weight_coefficient = config.compatibility_weight_coefficient
+        NodeGene.BIAS_MUTATION_CHANCE = config.bias_mutation_chance
+        NodeGene.ACTIVATION_FUNCTION_MUTATION_CHANCE = config.activation_mutation_chance
+        NodeGene.AGGREGATION_FUNCTION_MUTATION_CHANCE = config.aggregation_mutation_chance
+        NodeGene.RESPONSE_FUNCTION_MUTATION_CHANCE = config.response_mutation_chance
+        NodeGene.ACTIVATIONS = config.activation_table
+        NodeGene.AGGREGATIONS = config.aggregation_table
+        ConnectionGene.WEIGHT_MUTATION_CHANCE = config.weight_mutation_chance
+        ConnectionGene.ENABLED_MUTATION_CHANCE = config.enabled_mutation_chance
+
+    def activate(self, inputs: list[float]) -> list[float]:
+        if self.network_version != self.version:
+            self._sync_network()
+        return self.network.activate(inputs)
+
+    def _sync_network(self) -> None:
+        if self.network is not None:
+            try:
+                self.network.update(self, self.dirty_nodes)
+            except ValueError:
+                # The changes could not be patched in (a new cycle, or a structural change to a recurrent network).
+                self.network = None
+        if self.network is None:
+            if Genome.plan_cache is not None:
+                self.network = Genome.plan_cache.create_network(self, self.generate_network)
+            elif self.generate_network:
+                self.network = create_generated_network(self)
+            else:
+                self.network = create_network(self)
+        self.dirty_nodes.clear()
+        self.network_version = self.version
 
     def distance(self, other: Genome) -> float:
         """
         Returns the genetic distance between this genome and the other. This distance value
         is used to compute genome compatibility for speciation.
         """
-
-        # Compute node gene distance component.
-        node_distance = 0.0
-        if self.nodes or other.nodes:
-            disjoint_nodes = 0
-            for k2 in other.nodes:
-                if k2 not in self.nodes:
-                    disjoint_nodes += 1
-
-            for k1, n1 in self.nodes.items():
-                n2 = other.nodes.get(k1)
-                if n2 is None:
-                    disjoint_nodes += 1
-                else:
-                    # Homologous genes compute their own distance value.
-                    node_distance += n1.distance(n2)
-
-            max_nodes = max(len(self.nodes), len(other.nodes))
-            node_distance += (node_distance +
-                             (Genome.compatibility_disjoint_coefficient *
-                              disjoint_nodes)) / max_nodes
-
-        # Compute connection gene differences.
-        connection_distance = 0.0
-        if self.connections or other.connections:
-            disjoint_connections = 0
-            for k2 in other.connections:
-                if k2 not in self.connections:
-                    disjoint_connections += 1
-
-            for k1, c1 in self.connections.items():
-                c2 = other.connections.get(k1)
-                if c2 is None:
-                    disjoint_connections += 1
-                else:
-                    # Homologous genes compute their own distance value.
-                    connection_distance += c1.distance(c2)
-
-            max_conn = max(len(self.connections), len(other.connections))
-            connection_distance = (connection_distance +
-                                   (Genome.compatibility_disjoint_coefficient *
-                                    disjoint_connections)) / max_conn
-
-        distance = node_distance + connection_distance
+        cache = Genome.distance_cache
+        if cache is None:
+            return self._distance(other)
+
+        key = DistanceCache.key(self, other)
+        distance = cache.get(key)
+        if distance is None:
+            distance = self._distance(other)
+            cache.put(key, distance)
         return distance
 
+    def _distance(self, other: Genome) -> float:
+        return self.gene_arrays().distance(other.gene_arrays(), Gene.compatibility_weight_coefficient,
+                                           Genome.compatibility_disjoint_coefficient)
+
+    @staticmethod
+    def distance_matrix(genomes: list[Genome], others: list[Genome]) -> np.ndarray:
+        """
+        Returns the (len(genomes), len(others)) matrix of genetic distances between every pair
+        of genomes, computed in one vectorized call. Pass the smaller list as `others`.
+        """
+        return distance_matrix([g.gene_arrays() for g in genomes], [g.gene_arrays() for g in others],
+                               Gene.compatibility_weight_coefficient, Genome.compatibility_disjoint_coefficient)
+
+    def gene_arrays(self) -> GeneArrays:
+        """
+        Returns the genes as arrays sorted by innovation key, rebuilt only after the genome changed.
+        """
+        if self._gene_arrays_version != self.version:
+            self._gene_arrays = GeneArrays.create(self.nodes, self.connections)
+            self._gene_arrays_version = self.version
+        return self._gene_arrays
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the genes of this genome into the compact binary format, see `pack_genes`.
+        """
+        from .serialization import pack_genes
+        return pack_genes(self.gene_arrays())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Genome:
+        """
+        Create a genome from the genes serialized by `to_bytes`, see `from_gene_arrays`.
+        """
+        from .serialization import unpack_genes
+        return cls.from_gene_arrays(unpack_genes(data))
+
+    @classmethod
+    def from_gene_arrays(cls, arrays: GeneArrays) -> Genome:
+        """
+        Create a genome from loaded genes. Their node keys are reserved in `Genome.innovations`, so that
+        splits after a restart never hand out a key the loaded genomes already use.
+        """
+        if len(arrays.node_keys):
+            Genome.innovations.reserve(int(arrays.node_keys.max()))
+        return cls(*arrays.genes())
+
     def size(self) -> tuple[int, int]:
         """
         Returns genome 'complexity', taken to be
@@ -107,44 +182,110 @@ class Genome:
         num_enabled_connections = sum([1 for cg in self.connections.values() if cg.enabled])
         return len(self.nodes), num_enabled_connections
 
-    def mutate(self) -> None:
-        if random.random() < Genome.CONNECTION_ADD_PROB:
-            self.mutate_add_connection()
-        if random.random() < Genome.CONNECTION_DEL_PROP:
-            self.mutate_delete_connection()
-        if random.random() < Genome.NODE_ADD_PROB:
-            self.mutate_add_node()
-        if random.random() < Genome.NODE_DEL_PROB:
-            self.mutate_delete_node()
+    def mutate(self, rng: Random = random) -> None:
+        """
+        Mutates the structure and then every gene, drawing from `rng`, a `random.Random` such as a
+        `RandomStream`, which defaults to the global `random` module.
+        """
+        config = Genome.config
+        if rng.random() < config.connection_add_prob:
+            self.mutate_add_connection(rng)
+        if rng.random() < config.connection_delete_prob:
+            self.mutate_delete_connection(rng)
+        if rng.random() < config.node_add_prob:
+            self.mutate_add_node(rng)
+        if rng.random() < config.node_delete_prob:
+            self.mutate_delete_node(rng)
+        dirty = self.dirty_nodes
         for cg in self.connections.values():
-            cg.mutate()
+            if cg.mutate(rng):
+                dirty.add(cg.key[1])
         for ng in self.nodes.values():
-            ng.mutate()
+            if ng.mutate(rng):
+                dirty.add(ng.key)
+        self.version += 1
 
-    def mutate_add_connection(self) -> None:
+    @staticmethod
+    def mutate_population(genomes: list[Genome], rng: RandomStream) -> None:
+        """
+        Mutate every genome like `mutate`, drawing all masks and perturbations in bulk from `rng.numpy`.
+
+        The structural mutations are decided with one draw per kind for the whole population, then the
+        parameters of all genes of all genomes are mutated from one `draw_mutations` call. Only the
+        mutated genes are touched from Python. The structural mutations themselves pick their nodes and
+        connections from `rng`.
+        """
+        structural = rng.numpy.random((4, len(genomes))) < Genome.config.structural_chances
+        for mutation, mask in zip((Genome.mutate_add_connection, Genome.mutate_delete_connection,
+                                   Genome.mutate_add_node, Genome.mutate_delete_node), structural):
+            for i in np.flatnonzero(mask).tolist():
+                mutation(genomes[i], rng)
+
+        node_offsets = np.cumsum([0] + [len(g.nodes) for g in genomes])
+        connection_offsets = np.cumsum([0] + [len(g.connections) for g in genomes])
+        mutations = draw_mutations(rng.numpy, int(node_offsets[-1]), int(connection_offsets[-1]))
+        # Gene lists of the genomes hit by a mutation, indexed like `node_offsets` and `connection_offsets`.
+        node_lists: dict[int, list[NodeGene]] = {}
+        connection_lists: dict[int, list[ConnectionGene]] = {}
+
+        def genes(indices: np.ndarray, offsets: np.ndarray, lists: dict, attribute: str) -> list:
+            # Also marks the node of every gene, or the target node of every connection, dirty.
+            owners = np.searchsorted(offsets, indices, side="right") - 1
+            result = []
+            for owner, index in zip(owners.tolist(), (indices - offsets[owners]).tolist()):
+                if owner not in lists:
+                    lists[owner] = list(getattr(genomes[owner], attribute).values())
+                gene = lists[owner][index]
+                genomes[owner].dirty_nodes.add(gene.key if attribute == "nodes" else gene.key[1])
+                result.append(gene)
+            return result
+
+        for name in ("bias", "response"):
+            indices, perturbation = mutations[name]
+            for ng, delta in zip(genes(indices, node_offsets, node_lists, "nodes"), perturbation.tolist()):
+                setattr(ng, name, getattr(ng, name) + delta)
+        for name, table in (("activation", NodeGene.ACTIVATIONS), ("aggregation", NodeGene.AGGREGATIONS)):
+            indices, draw = mutations[name]
+            nodes = genes(indices, node_offsets, node_lists, "nodes")
+            current = np.fromiter((getattr(ng, name).id for ng in nodes), dtype=np.int64, count=len(nodes))
+            for ng, id in zip(nodes, other_function(draw, current).tolist()):
+                setattr(ng, name, table[id])
+        indices, perturbation = mutations["weight"]
+        for cg, delta in zip(genes(indices, connection_offsets, connection_lists, "connections"), perturbation.tolist()):
+            cg.weight += delta
+        indices, _ = mutations["enabled"]
+        for cg in genes(indices, connection_offsets, connection_lists, "connections"):
+            cg.enabled = not cg.enabled
+
+        for genome in genomes:
+            genome.version += 1
+
+    def mutate_add_connection(self, rng: Random = random) -> None:
         if not self.nodes:
             raise ValueError("No nodes exists yet.")
-        possible_outputs = list(self.nodes.values())
-        to_node = self.nodes[random.choice(possible_outputs)]
+        possible_outputs = list(self.nodes)
+        to_node = self.nodes[rng.choice(possible_outputs)]
 
         possible_inputs = possible_outputs + Genome.INPUT_KEYS
-        from_node = self.nodes[random.choice(possible_inputs)]
+        from_node = self.nodes[rng.choice(possible_inputs)]
 
-        self._add_connection(from_node, to_node)
+        self._add_connection(from_node, to_node, rng=rng)
 
-    def mutate_add_node(self) -> None:
-        if not self.connections:
-            raise ValueError("No Connections exists yet.")
-        # Randomly choose a connection
-        connection = random.choice(list[self.connections.values()])
-        self._add_node(connection)
+    def mutate_add_node(self, rng: Random = random) -> None:
+        # Randomly choose an enabled connection to split, like `mutate_delete_node` do nothing without one.
+        available_connections = [cg for cg in self.connections.values() if cg.enabled]
+        if not available_connections:
+            return
+        self._add_node(rng.choice(available_connections), rng)
 
-    def mutate_delete_node(self) -> None:
-        avaiable_nodes = [k for k in self.nodes if k not in Genome.OUTPUT_KEYS]
+    def mutate_delete_node(self, rng: Random = random) -> None:
+        # Input and output pins are never deleted.
+        config = Genome.config
+        avaiable_nodes = [k for k in self.nodes if k not in config.output_key_set and k not in config.input_key_set]
         if not avaiable_nodes:
             return
 
-        del_key = random.choice(avaiable_nodes)
+        del_key = rng.choice(avaiable_nodes)
         connections_to_delete = set()
         for k, v in self.connections.items():
             if del_key in v.key:
@@ -152,27 +293,36 @@ class Genome:
 
         for key in connections_to_delete:
             del self.connections[key]
+            self.dirty_nodes.add(key[1])
 
         del self.nodes[del_key]
+        self.dirty_nodes.add(del_key)
+        self.version += 1
 
-    def mutate_delete_connection(self) -> None:
+    def mutate_delete_connection(self, rng: Random = random) -> None:
         if self.connections:
-            key = random.choice(list[self.connections.keys()])
+            key = rng.choice(list(self.connections))
             del self.connections[key]
+            self.dirty_nodes.add(key[1])
+            self.version += 1
 
-    def _add_connection(self, _from: NodeGene, _to: NodeGene, weight: float = None, enabled: bool = True) -> None:
+    def _add_connection(self, _from: NodeGene, _to: NodeGene, weight: float = None, enabled: bool = True,
+                        rng: Random = random) -> None:
         # Check that connection does not exist already
-        if _from.key in Genome.OUTPUT_KEYS and _to.key in Genome.OUTPUT_KEYS:
+        output_keys = Genome.config.output_key_set
+        if _from.key in output_keys and _to.key in output_keys:
             return
 
         key = (_from.key, _to.key)
         if key in self.connections:
             self.connections[key].enabled = True # If the connection exists but is disabled then enable it
         else:
-            new_connection = ConnectionGene(_from, _to, weight, enabled)
+            new_connection = ConnectionGene(_from, _to, weight, enabled, rng)
             self.connections[new_connection.key] = new_connection
+        self.dirty_nodes.add(_to.key)
+        self.version += 1
 
-    def _add_node(self, old_connection: ConnectionGene) -> None:
+    def _add_node(self, old_connection: ConnectionGene, rng: Random = random) -> None:
         if not self.connections:
             raise ValueError("No Connections exists yet.")
         if not old_connection.enabled:
@@ -180,62 +330,30 @@ class Genome:
 
         # disable old connection
         old_connection.enabled = False
+        self.dirty_nodes.add(old_connection._to.key)
         # add new node
-        new_node = NodeGene(self.get_new_node_key(self.nodes))
+        new_node = NodeGene(self.get_new_node_key(old_connection), rng=rng)
         self.nodes[new_node.key] = new_node
         # add connections
-        self._add_connection(old_connection._from, new_node, weight=1) # The new connection leading into the new node receives a weight of 1
-        self._add_connection(new_node, old_connection._to, weight=old_connection.weight) # the new connection leading out receives the same weight as the old connection
+        self._add_connection(old_connection._from, new_node, weight=1, rng=rng) # The new connection leading into the new node receives a weight of 1
+        self._add_connection(new_node, old_connection._to, weight=old_connection.weight, rng=rng) # the new connection leading out receives the same weight as the old connection
 
-    def get_new_node_key(self, node_dict) -> int:
-        if self.node_indexer is None:
-            if node_dict:
-                self.node_indexer = count(max(list(node_dict)) + 1)
-            else:
-                self.node_indexer = count(max(list(node_dict)) + 1)
-
-        new_id = next(self.node_indexer)
-
-        assert new_id not in node_dict
-
-        return new_id
+    def get_new_node_key(self, connection: ConnectionGene) -> int:
+        """
+        Returns the key of the node splitting the given connection, shared with every other genome
+        splitting the same connection.
+        """
+        key = Genome.innovations.node_key(connection.key)
+        if key in self.nodes:
+            # This genome split the same connection before, so the new node is not homologous to that one.
+            key = Genome.innovations.new_node_key()
+        return key
 
     @classmethod
-    def crossover(cls, nn1: Genome, nn2: Genome) -> Genome:
-        # Inherit connection genes
-        connections = {}
-        all_keys = set(nn1.connections.keys()) | set(nn2.connections.keys())
-        for key in all_keys:
-            cg1 = nn1.connections.get(key)
-            cg2 = nn2.connections.get(key)
-            if cg1 is None:
-                # Excess or disjoint gene: random chance to inherit.
-                if bool(random.getrandbits(1)):
-                    connections[key] = cg2.copy()
-            elif cg2 is None:
-                # Excess or disjoint gene: random chance to inherit.
-                if bool(random.getrandbits(1)):
-                    connections[key] = cg1.copy()
-            else:
-                # Homologous gene: combine genes from both parents.
-                connections[key] = ConnectionGene.crossover(cg1, cg2)
-
-        # Inherit node genes
-        nodes = {}
-        all_keys = set(nn1.nodes.keys()) | set(nn2.nodes.keys())
-        for key in all_keys:
-            ng1 = nn1.nodes.get(key)
-            ng2 = nn2.nodes.get(key)
-            if ng1 is None:
-                # Excess or disjoint gene: random chance to inherit.
-                if bool(random.getrandbits(1)):
-                    nodes[key] = ng2.copy()
-            elif ng2 is None:
-                # Excess or disjoint gene: random chance to inherit.
-                if bool(random.getrandbits(1)):
-                    nodes[key] = ng1.copy()
-            else:
-                # Homologous gene: combine genes from both parents.
-                nodes[key] = NodeGene.crossover(ng1, ng2)
-
-        return Genome(nodes, connections)
+    def crossover(cls, nn1: Genome, nn2: Genome, rng: Random = random) -> Genome:
+        """
+        Returns an offspring of the two genomes drawn from `rng`, see `crossover_genes`.
+        """
+        if len(nn1.connections) + len(nn2.connections) < Genome.ARRAY_CROSSOVER_MIN_CONNECTIONS:
+            return cls(*crossover_genes(nn1.nodes, nn1.connections, nn2.nodes, nn2.connections, rng))
+        return cls(*GeneArrays.crossover(nn1.gene_arrays(), nn2.gene_arrays(), rng).genes())
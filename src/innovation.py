@@ -0,0 +1,88 @@
+from __future__ import annotations
+from collections import OrderedDict
+
+
+class InnovationTracker:
+    """
+    Population-wide registry of structural innovations.
+
+    Splitting the connection (a, b) yields the same new node key in every genome that does it while the
+    split is remembered, so the genes it creates line up in `crossover` and `distance`. Connection keys
+    are the (from, to) node keys and need no registry.
+
+    A split is forgotten once it was not seen for `window` ticks of the tracker's clock, which the
+    simulation moves with `advance`, so the table stays bounded during unbounded runs. A forgotten split
+    that happens again gets a fresh key. With `window` None splits are never forgotten.
+    """
+
+    def __init__(self, window: int = None, next_key: int = 0) -> None:
+        if window is not None and window < 0:
+            raise ValueError(f"{window} must not be negative.")
+        self.window = window
+        self.next_key = next_key
+        self.now = 0
+        # Split connection -> (node key, tick it was last seen), ordered from least to most recently seen.
+        self.splits: OrderedDict[tuple[int, int], tuple[int, int]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.splits)
+
+    def node_key(self, connection: tuple[int, int]) -> int:
+        """
+        Return the key of the node created by splitting the given connection.
+
+        Parameters:
+        - connection (tuple[int, int]): The (from, to) key of the split connection.
+
+        Returns:
+        - int: The node key registered for the split, or a new one if the split is not known.
+        """
+        entry = self.splits.get(connection)
+        if entry is None:
+            self.misses += 1
+            key = self.new_node_key()
+        else:
+            self.hits += 1
+            key = entry[0]
+            self.splits.move_to_end(connection)
+        self.splits[connection] = key, self.now
+        return key
+
+    def new_node_key(self) -> int:
+        """
+        Return a node key that was never handed out before, without registering it.
+        """
+        key = self.next_key
+        self.next_key += 1
+        return key
+
+    def reserve(self, key: int) -> None:
+        """
+        Make sure that the given node key and all keys below it are never handed out.
+        """
+        self.next_key = max(self.next_key, key + 1)
+
+    def advance(self, ticks: int = 1) -> None:
+        """
+        Move the clock forward and forget the splits that were not seen within the window.
+        """
+        self.now += ticks
+        if self.window is None:
+            return
+        horizon = self.now - self.window
+        splits = self.splits
+        while splits and next(iter(splits.values()))[1] < horizon:
+            splits.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Forget all splits and reset the counters. Node keys keep increasing.
+        """
+        self.splits.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
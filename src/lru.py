@@ -0,0 +1,73 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Hashable
+
+
+class LRUCache:
+    """
+    A bounded mapping with least recently used eviction, counting its hits, misses and evictions.
+
+    The caches of the library (`DistanceCache`, `PlanCache` and the code cache of `GeneratedNetwork`)
+    are built on it. Values must not be None, which `get` returns for a missing key.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize < 1:
+            raise ValueError(f"{maxsize} must be at least 1.")
+        self.maxsize = maxsize
+        self.entries: OrderedDict[Hashable, object] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable):
+        """
+        Return the cached value for the key and mark it as recently used, or None if it is not cached.
+        """
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value) -> None:
+        """
+        Cache a value, evicting the least recently used entries while the cache holds more than `maxsize`.
+        """
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Drop all entries and reset the counters.
+        """
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, float]:
+        """
+        Return the size of the cache and its hit, miss and eviction counters.
+        """
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+    def __len__(self) -> int:
+        return len(self.entries)
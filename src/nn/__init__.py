@@ -1 +1 @@
-__all__ = ["feed_forward"]
\ No newline at end of file
+__all__ = ["network", "batch", "codegen", "parallel", "plan"]
\ No newline at end of file
@@ -0,0 +1,381 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable
+import numpy as np
+
+from ..functions.activations import Activations
+from ..functions.aggregations import Aggregations
+from ..functions.registry import FunctionRegistry
+from .network import FeedForwardNetwork, RecurrentNetwork
+
+if TYPE_CHECKING:
+    from ..genome import Genome
+
+
+def node_depths(network: FeedForwardNetwork) -> list[int]:
+    """
+    Compute the depth of every slot of a compiled network.
+
+    Inputs have depth 0 and every other node lies one layer after the deepest node feeding it,
+    so all nodes of the same depth can be evaluated at once.
+
+    Parameters:
+    - network (FeedForwardNetwork): The compiled network.
+
+    Returns:
+    - list[int]: The depth of each slot of `network.values`.
+    """
+    depths = [0] * len(network.values)
+    for slot, _, _, _, _, sources, _ in network.node_evals:
+        depths[slot] = 1 + max((depths[i] for i in sources), default=0)
+    return depths
+
+
+# Function id of the nodes that are not aggregated.
+_NO_FUNCTION = -1
+
+
+def _group(ids: np.ndarray, registry: FunctionRegistry) -> list[tuple[Callable, np.ndarray | slice]]:
+    """
+    Group row indices by function id, mapping each id to the vectorized function it stands for.
+    Rows with `_NO_FUNCTION` are left out, and a group covering every row is indexed with a
+    slice to avoid copying.
+    """
+    unique = np.unique(ids)
+    unique = unique[unique != _NO_FUNCTION].tolist()
+    if len(unique) == 1 and np.all(ids == unique[0]):
+        return [(registry[unique[0]].vectorized, slice(None))]
+    return [(registry[i].vectorized, np.flatnonzero(ids == i)) for i in unique]
+
+
+class _Layer:
+    """
+    All nodes of one depth across every network of a batch, with their inputs padded to the widest fan-in.
+    """
+
+    # The arrays defining a layer and their types. The (rows, fan-in) matrices are listed in `MATRICES`.
+    FIELDS = {"agents": np.intp, "slots": np.intp, "sources": np.intp, "weights": np.float64, "mask": np.bool_,
+              "bias": np.float64, "response": np.float64, "activation_ids": np.int16, "aggregation_ids": np.int16}
+    MATRICES = ("sources", "weights", "mask")
+
+    def __init__(self, rows: list[tuple]) -> None:
+        width = max(1, max(len(row[2]) for row in rows))
+        count = len(rows)
+
+        self.agents = np.empty(count, dtype=np.intp)
+        self.slots = np.empty(count, dtype=np.intp)
+        self.sources = np.zeros((count, width), dtype=np.intp)
+        self.weights = np.zeros((count, width))
+        self.mask = np.zeros((count, width), dtype=bool)
+        self.bias = np.empty(count)
+        self.response = np.empty(count)
+        self.activation_ids = np.empty(count, dtype=np.int16)
+        self.aggregation_ids = np.empty(count, dtype=np.int16)
+
+        for i, (agent, slot, sources, weights, act_func, agg_func, bias, response) in enumerate(rows):
+            self.agents[i] = agent
+            self.slots[i] = slot
+            self.sources[i, :len(sources)] = sources
+            self.weights[i, :len(weights)] = weights
+            self.mask[i, :len(sources)] = True
+            self.bias[i] = bias
+            self.response[i] = response
+            self.activation_ids[i] = Activations.resolve(act_func).id
+            # Nodes without inputs are not aggregated, their aggregate stays 0.
+            self.aggregation_ids[i] = Aggregations.resolve(agg_func).id if sources else _NO_FUNCTION
+        self._prepare()
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> _Layer:
+        """
+        Rebuild a layer around the given `FIELDS` arrays, without copying them.
+        """
+        layer = cls.__new__(cls)
+        for name in cls.FIELDS:
+            setattr(layer, name, arrays[name])
+        layer._prepare()
+        return layer
+
+    @classmethod
+    def concatenate(cls, layers: list[_Layer]) -> _Layer | None:
+        """
+        Join the rows of the given layers into one layer, padding their inputs to the widest fan-in.
+        """
+        if len(layers) <= 1:
+            return layers[0] if layers else None
+        width = max(layer.sources.shape[1] for layer in layers)
+        arrays = {}
+        for name in cls.FIELDS:
+            parts = [getattr(layer, name) for layer in layers]
+            if name in cls.MATRICES:
+                parts = [np.pad(part, ((0, 0), (0, width - part.shape[1]))) for part in parts]
+            arrays[name] = np.concatenate(parts)
+        return cls.from_arrays(arrays)
+
+    def _prepare(self) -> None:
+        self.activations = _group(self.activation_ids, Activations.registry)
+        self.aggregations = _group(self.aggregation_ids, Aggregations.registry)
+        # Broadcast agent index used to gather the inputs of every node in a single fancy-indexing pass.
+        self.agent_column = self.agents[:, None]
+        self.aggregated = np.zeros(len(self.agents))
+
+    def evaluate(self, values: np.ndarray) -> np.ndarray:
+        """
+        Compute the new value of every node of the layer, reading its inputs from `values`.
+        """
+        x = values[self.agent_column, self.sources] * self.weights
+        s = self.aggregated
+        for agg_func, rows in self.aggregations:
+            s[rows] = agg_func(x[rows], self.mask[rows])
+
+        z = self.bias + self.response * s
+        for act_func, rows in self.activations:
+            z[rows] = act_func(z[rows])
+        return z
+
+
+def _check_networks(networks: list) -> tuple[int, int]:
+    """
+    Check that the networks can be batched together and return their number of inputs and outputs.
+    """
+    if not networks:
+        raise ValueError("A batch needs at least one network.")
+    num_inputs = networks[0].num_inputs
+    num_outputs = len(networks[0].output_slots)
+    for net in networks:
+        if net.num_inputs != num_inputs or len(net.output_slots) != num_outputs:
+            raise ValueError("All networks of a batch must have the same number of inputs and outputs.")
+    return num_inputs, num_outputs
+
+
+class BatchNetwork:
+    """
+    Many compiled feed-forward networks evaluated together.
+
+    The node values of all networks live in one (n_agents, max_slots) matrix, laid out exactly like
+    `FeedForwardNetwork.values`. Nodes are grouped by depth across all networks, so activating the batch
+    costs one gather, one aggregation and one activation pass per layer (per distinct function used in it)
+    instead of a Python loop per node per agent.
+    """
+
+    def __init__(self, networks: list[FeedForwardNetwork]) -> None:
+        self.num_inputs, self.num_outputs = _check_networks(networks)
+        self.num_agents = len(networks)
+        self.values = np.zeros((self.num_agents, max(len(net.values) for net in networks)))
+        self.output_slots = np.array([net.output_slots for net in networks], dtype=np.intp)
+        self.agent_index = np.arange(self.num_agents)[:, None]
+
+        layers: dict[int, list[tuple]] = {}
+        for agent, net in enumerate(networks):
+            depths = node_depths(net)
+            for slot, act_func, agg_func, bias, response, sources, weights in net.node_evals:
+                layers.setdefault(depths[slot], []).append(
+                    (agent, slot, sources, weights, act_func, agg_func, bias, response))
+        self.layers = [_Layer(layers[depth]) for depth in sorted(layers)]
+
+    def activate(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Activate every network of the batch.
+
+        Parameters:
+        - inputs (np.ndarray): The inputs of all agents, of shape (n_agents, num_inputs).
+
+        Raises:
+        - RuntimeError: If the inputs do not have the expected shape.
+
+        Returns:
+        - np.ndarray: The outputs of all agents, of shape (n_agents, num_outputs).
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        if inputs.shape != (self.num_agents, self.num_inputs):
+            raise RuntimeError("Expected inputs of shape {0}, got {1}".format((self.num_agents, self.num_inputs), inputs.shape))
+
+        values = self.values
+        values[:, :self.num_inputs] = inputs
+        for layer in self.layers:
+            values[layer.agents, layer.slots] = layer.evaluate(values)
+
+        return values[self.agent_index, self.output_slots]
+
+    def reset(self) -> None:
+        """
+        Clear all node values.
+        """
+        self.values.fill(0.0)
+
+    def pack(self) -> dict[str, np.ndarray]:
+        """
+        Flatten the batch into a few named arrays, from which `unpack` rebuilds it.
+
+        The layers are concatenated field by field, so the number of arrays does not depend on the
+        size of the batch. The arrays can be written to a file or to shared memory as they are.
+        """
+        arrays = {"shape": np.array([self.num_inputs, self.num_outputs, self.num_agents, self.values.shape[1]], dtype=np.int64),
+                  "output_slots": self.output_slots,
+                  "layer_rows": np.array([len(layer.agents) for layer in self.layers], dtype=np.int64),
+                  "layer_widths": np.array([layer.sources.shape[1] for layer in self.layers], dtype=np.int64)}
+        for name, dtype in _Layer.FIELDS.items():
+            arrays[name] = np.concatenate([getattr(layer, name).ravel() for layer in self.layers] or [np.zeros(0, dtype=dtype)])
+        return arrays
+
+    @classmethod
+    def unpack(cls, arrays: dict[str, np.ndarray]) -> BatchNetwork:
+        """
+        Rebuild a batch from the arrays returned by `pack`.
+
+        The layers are views of the given arrays, only the node values are allocated.
+        """
+        batch = cls.__new__(cls)
+        batch.num_inputs, batch.num_outputs, batch.num_agents, width = arrays["shape"].tolist()
+        batch.values = np.zeros((batch.num_agents, width))
+        batch.output_slots = arrays["output_slots"]
+        batch.agent_index = np.arange(batch.num_agents)[:, None]
+
+        batch.layers = []
+        row = cell = 0
+        for rows, width in zip(arrays["layer_rows"].tolist(), arrays["layer_widths"].tolist()):
+            fields = {name: arrays[name][row:row + rows] for name in _Layer.FIELDS}
+            for name in _Layer.MATRICES:
+                fields[name] = arrays[name][cell:cell + rows * width].reshape(rows, width)
+            batch.layers.append(_Layer.from_arrays(fields))
+            row += rows
+            cell += rows * width
+        return batch
+
+    @staticmethod
+    def create(genomes: list[Genome]) -> BatchNetwork:
+        """
+        Compile the given genomes and pack them into a single batch.
+
+        Parameters:
+        - genomes (list[Genome]): The genomes to compile, one per agent.
+
+        Returns:
+        - BatchNetwork: The batch, whose i-th row corresponds to the i-th genome.
+        """
+        return BatchNetwork([FeedForwardNetwork.create(genome) for genome in genomes])
+
+
+class RecurrentBatchNetwork:
+    """
+    Many compiled recurrent networks stepped together.
+
+    Every node reads the previous tick, so all nodes of all networks form a single layer and a tick
+    costs one gather, aggregation and activation pass. The values live in two preallocated
+    (n_agents, max_slots) buffers that swap roles on every step, like `RecurrentNetwork.values`.
+
+    A network of None leaves its row of the batch empty, e.g. for a free slot of a population, and its
+    outputs are meaningless. `update` replaces the networks of some rows in place, so that a batch whose
+    rows are the slots of a population follows births and deaths without being rebuilt.
+    """
+
+    def __init__(self, networks: list[RecurrentNetwork | None]) -> None:
+        self.num_inputs, self.num_outputs = _check_networks([net for net in networks if net is not None])
+        self.num_agents = len(networks)
+        width = max(len(net.values[0]) for net in networks if net is not None)
+        self.values = np.zeros((2, self.num_agents, width))
+        self.active = 0
+        self.output_slots = np.zeros((self.num_agents, self.num_outputs), dtype=np.intp)
+        self.agent_index = np.arange(self.num_agents)[:, None]
+        self.layer = self._layer(range(self.num_agents), networks)
+
+    def _layer(self, agents, networks: list[RecurrentNetwork | None]) -> _Layer | None:
+        """
+        Build the layer of the given networks and set their output slots.
+        """
+        rows = []
+        for agent, net in zip(agents, networks):
+            if net is None:
+                continue
+            self.output_slots[agent] = net.output_slots
+            for slot, act_func, agg_func, bias, response, sources, weights in net.node_evals:
+                rows.append((agent, slot, sources, weights, act_func, agg_func, bias, response))
+        return _Layer(rows) if rows else None
+
+    def update(self, agents: list[int], networks: list[RecurrentNetwork | None]) -> None:
+        """
+        Replace the networks of the given rows, growing the batch if a row lies past its end.
+
+        The nodes of the other rows keep their values, the values of the replaced rows are cleared.
+        Building the layer of the new networks is the only per-node Python work, the rest of the layer
+        is copied over as arrays.
+
+        Parameters:
+        - agents (list[int]): The rows to replace.
+        - networks (list[RecurrentNetwork | None]): The new network of each row, or None to empty it.
+
+        Raises:
+        - ValueError: If a network does not have the number of inputs and outputs of the batch.
+        """
+        new = [net for net in networks if net is not None]
+        if new and _check_networks(new) != (self.num_inputs, self.num_outputs):
+            raise ValueError("All networks of a batch must have the same number of inputs and outputs.")
+
+        num_agents = max([self.num_agents] + [agent + 1 for agent in agents])
+        width = max([self.values.shape[2]] + [len(net.values[0]) for net in new])
+        if (num_agents, width) != self.values.shape[1:]:
+            values = np.zeros((2, num_agents, width))
+            values[:, :self.num_agents, :self.values.shape[2]] = self.values
+            self.values = values
+            self.output_slots = np.concatenate([self.output_slots, np.zeros((num_agents - self.num_agents, self.num_outputs), dtype=np.intp)])
+            self.num_agents = num_agents
+            self.agent_index = np.arange(num_agents)[:, None]
+
+        agents_array = np.array(agents, dtype=np.intp)
+        self.values[:, agents_array] = 0.0
+        self.output_slots[agents_array] = 0
+        layers = [self.layer] if self.layer is not None else []
+        if layers:
+            keep = ~np.isin(self.layer.agents, agents_array)
+            if not keep.all():
+                layers[0] = _Layer.from_arrays({name: getattr(self.layer, name)[keep] for name in _Layer.FIELDS})
+        layer = self._layer(agents, networks)
+        if layer is not None:
+            layers.append(layer)
+        self.layer = _Layer.concatenate(layers)
+
+    def step_many(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Advance every network of the population by one tick.
+
+        Parameters:
+        - inputs (np.ndarray): The inputs of all agents, of shape (n_agents, num_inputs).
+
+        Raises:
+        - RuntimeError: If the inputs do not have the expected shape.
+
+        Returns:
+        - np.ndarray: The outputs of all agents after this tick, of shape (n_agents, num_outputs).
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        if inputs.shape != (self.num_agents, self.num_inputs):
+            raise RuntimeError("Expected inputs of shape {0}, got {1}".format((self.num_agents, self.num_inputs), inputs.shape))
+
+        ivalues = self.values[self.active]
+        self.active = 1 - self.active
+        ovalues = self.values[self.active]
+        ivalues[:, :self.num_inputs] = inputs
+        ovalues[:, :self.num_inputs] = inputs
+        if self.layer is not None:
+            ovalues[self.layer.agents, self.layer.slots] = self.layer.evaluate(ivalues)
+
+        return ovalues[self.agent_index, self.output_slots]
+
+    def reset(self) -> None:
+        """
+        Clear all node values and forget the state carried over between ticks.
+        """
+        self.values.fill(0.0)
+        self.active = 0
+
+    @staticmethod
+    def create(genomes: list[Genome]) -> RecurrentBatchNetwork:
+        """
+        Compile the given genomes and pack them into a single recurrent batch.
+
+        Parameters:
+        - genomes (list[Genome]): The genomes to compile, one per agent.
+
+        Returns:
+        - RecurrentBatchNetwork: The batch, whose i-th row corresponds to the i-th genome.
+        """
+        return RecurrentBatchNetwork([RecurrentNetwork.create(genome) for genome in genomes])
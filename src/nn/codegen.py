@@ -0,0 +1,191 @@
+from __future__ import annotations
+from types import CodeType, FunctionType
+from typing import TYPE_CHECKING, Callable
+import math
+
+from ..functions.activations import Activations
+from ..lru import LRUCache
+from ..functions.aggregations import Aggregations
+from .network import FeedForwardNetwork, RecurrentNetwork
+
+if TYPE_CHECKING:
+    from ..genome import Genome
+
+# Expressions computing an activation of the local `z`, exactly like the scalar implementation.
+# Activations without an entry are called.
+_INLINE_ACTIVATIONS = {
+    Activations.TANH: "tanh(max(-60.0, min(60.0, 2.5 * z)))",
+    Activations.SIGMOID: "1.0 / (1.0 + exp(-max(-60.0, min(60.0, 5.0 * z))))",
+    Activations.SIN: "sin(max(-60.0, min(60.0, 5.0 * z)))",
+    Activations.GAUSS: "exp(-5.0 * max(-3.4, min(3.4, z)) ** 2)",
+    Activations.RELU: "z if z > 0.0 else 0.0",
+    Activations.LELU: "z if z > 0.0 else 0.005 * z",
+    Activations.EXP: "exp(max(-60.0, min(60.0, z)))",
+    Activations.CUBE: "z ** 3",
+    Activations.SQUARE: "z ** 2",
+    Activations.CLAMPED: "max(-1.0, min(1.0, z))",
+    Activations.ID: "z",
+    Activations.ABS: "abs(z)",
+}
+
+# Names the generated code can use besides the parameters and the called functions.
+_GLOBALS = {"tanh": math.tanh, "exp": math.exp, "sin": math.sin}
+
+
+# Nodes with more sources than this call their product instead of chaining it inline, as the compiler
+# recurses into every operator of a chain like `a * b * c` and fails on long ones.
+_MAX_INLINE_TERMS = 32
+
+
+def _aggregate(aggregation, terms: list[str]) -> str:
+    """
+    Return an expression aggregating the given terms exactly like the scalar implementation.
+
+    Sums go through `sum` like the scalar implementation, whose floating-point result differs from a
+    chain of additions on Python 3.12 and later, and all other aggregations but short products take
+    their terms as a flat argument list.
+    """
+    if aggregation is Aggregations.SUM:
+        return f"sum(({', '.join(terms)},))"
+    if aggregation is Aggregations.MEAN:
+        return f"sum(({', '.join(terms)},)) / {len(terms)}"
+    if aggregation is Aggregations.PRODUCT and len(terms) <= _MAX_INLINE_TERMS:
+        return " * ".join(f"({term})" for term in terms)
+    if aggregation in (Aggregations.MAX, Aggregations.MIN) and len(terms) == 1:
+        return terms[0]
+    if aggregation is Aggregations.MAX:
+        return f"max({', '.join(terms)})"
+    if aggregation is Aggregations.MIN:
+        return f"min({', '.join(terms)})"
+    return f"g{aggregation.id}([{', '.join(terms)}])"
+
+
+def generate_source(network: FeedForwardNetwork) -> str:
+    """
+    Generate the source of a function activating the given network without any loop or lookup.
+
+    Every node becomes one or two lines of straight-line code over local variables, `v<slot>` holding
+    the value of a slot. Common activations and aggregations are written out inline, the others are
+    called as `a<id>` and `g<id>`. The weights, biases and responses are the keyword-only parameters
+    `w<i>`, `b<i>` and `r<i>` in `node_evals` order, so the source only depends on the structure of the
+    network and one compiled function serves every network of that structure (see `GeneratedNetwork`).
+    """
+    lines = [
+        "def activate(inputs, *, " + ", ".join(_parameter_names(network)) + "):" if network.node_evals else "def activate(inputs):",
+        f"    if len(inputs) != {network.num_inputs}:",
+        f"        raise RuntimeError('Expected {network.num_inputs:n} inputs, got {{0:n}}'.format(len(inputs)))",
+    ]
+    if network.num_inputs:
+        lines.append("    " + "".join(f"v{i}, " for i in range(network.num_inputs)) + "= inputs")
+    w = 0
+    for i, (slot, act_func, agg_func, bias, response, sources, weights) in enumerate(network.node_evals):
+        activation, aggregation = Activations.resolve(act_func), Aggregations.resolve(agg_func)
+        if sources:
+            terms = [f"v{source} * w{w + j}" for j, source in enumerate(sources)]
+            w += len(sources)
+            lines.append(f"    z = b{i} + r{i} * ({_aggregate(aggregation, terms)})")
+        else:
+            lines.append(f"    z = b{i}")
+        expression = _INLINE_ACTIVATIONS.get(activation, f"a{activation.id}(z)")
+        lines.append(f"    v{slot} = {expression}")
+    lines.append("    return [" + ", ".join(f"v{slot}" for slot in network.output_slots) + "]")
+    return "\n".join(lines) + "\n"
+
+
+def _parameter_names(network: FeedForwardNetwork) -> list[str]:
+    num_weights = sum(len(entry[6]) for entry in network.node_evals)
+    return ([f"w{i}" for i in range(num_weights)] + [f"b{i}" for i in range(len(network.node_evals))]
+            + [f"r{i}" for i in range(len(network.node_evals))])
+
+
+def _parameters(network: FeedForwardNetwork) -> dict[str, float]:
+    values = [w for entry in network.node_evals for w in entry[6]]
+    values += [entry[3] for entry in network.node_evals] + [entry[4] for entry in network.node_evals]
+    return dict(zip(_parameter_names(network), values))
+
+
+def structure_key(network: FeedForwardNetwork) -> tuple:
+    """
+    Return a hashable key that is equal for two networks exactly if `generate_source` generates the same
+    source for them.
+    """
+    return (network.num_inputs, network.output_slots,
+            tuple((slot, Activations.resolve(act_func).id, Aggregations.resolve(agg_func).id, sources)
+                  for slot, act_func, agg_func, _, _, sources, _ in network.node_evals))
+
+
+class GeneratedNetwork(FeedForwardNetwork):
+    """
+    A feed-forward network activated through Python code generated for its structure.
+
+    `activate` is a function compiled from `generate_source` and bound to the parameters of this
+    network, so an activation runs straight-line code over local variables instead of the loop of
+    `FeedForwardNetwork.activate`. Compiling is expensive compared to one activation, so use it for
+    genomes that are activated many times, such as long-lived champions. The compiled code objects are
+    shared by all networks of the same structure in `code_cache`, and the least recently used of them are
+    dropped once more than `CODE_CACHE_SIZE` structures were compiled.
+
+    Node values are not kept between activations, `reset` has nothing to clear.
+    """
+
+    CODE_CACHE_SIZE = 1024 # Compiled structures kept, least recently used ones are dropped first.
+
+    # Structure key -> (code object, namespace), see `structure_key`.
+    code_cache = LRUCache(CODE_CACHE_SIZE)
+
+    def __init__(self, input_nodes: list[int], output_nodes: list[int], node_keys: list[int], node_evals: list[tuple]) -> None:
+        super().__init__(input_nodes, output_nodes, node_keys, node_evals)
+        self._generate()
+
+    def _generate(self) -> None:
+        key = structure_key(self)
+        cache = GeneratedNetwork.code_cache
+        entry = cache.get(key)
+        if entry is None:
+            namespace = dict(_GLOBALS)
+            for _, act_func, agg_func, _, _, _, _ in self.node_evals:
+                activation, aggregation = Activations.resolve(act_func), Aggregations.resolve(agg_func)
+                namespace[f"a{activation.id}"] = activation.scalar
+                namespace[f"g{aggregation.id}"] = aggregation.scalar
+            module = compile(generate_source(self), "<generated network>", "exec")
+            # The code object of `activate` is the only constant of the module that is code.
+            code = next(c for c in module.co_consts if isinstance(c, CodeType))
+            entry = code, namespace
+            cache.put(key, entry)
+        code, namespace = entry
+        activate: Callable[[list[float]], list[float]] = FunctionType(code, namespace, "activate")
+        activate.__kwdefaults__ = _parameters(self)
+        self.activate = activate
+
+    def reset(self) -> None:
+        pass
+
+    def update(self, genome: Genome, dirty: set[int]) -> None:
+        """
+        Patch the network like `FeedForwardNetwork.update`, then bind the new parameters and, if the
+        structure changed, the code of the new structure.
+        """
+        super().update(genome, dirty)
+        self._generate()
+
+    @staticmethod
+    def create(genome: Genome) -> GeneratedNetwork:
+        """
+        Compile the given genome into a generated network, see `FeedForwardNetwork.create`.
+
+        Raises:
+        - ValueError: If the enabled connections of the genome contain a cycle.
+        """
+        network = FeedForwardNetwork.create(genome)
+        return GeneratedNetwork(network.input_nodes, network.output_nodes, network.node_keys, network.node_evals)
+
+
+def create_generated_network(genome: Genome) -> GeneratedNetwork | RecurrentNetwork:
+    """
+    Compile the given genome into a generated network, or into a generic recurrent network if its
+    enabled connections contain a cycle.
+    """
+    try:
+        return GeneratedNetwork.create(genome)
+    except ValueError:
+        return RecurrentNetwork.create(genome)
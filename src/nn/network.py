@@ -0,0 +1,436 @@
+from __future__ import annotations
+from collections import deque
+from operator import mul
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..genome import Genome
+
+
+def required_for_output(inputs: list[int], outputs: list[int], connections: list[tuple[int, int]]) -> set[int]:
+    """
+    Collect the nodes whose state is required to compute the final network output(s).
+
+    Parameters:
+    - inputs (list[int]): The input node keys.
+    - outputs (list[int]): The output node keys.
+    - connections (list[tuple[int, int]]): The (from, to) keys of the enabled connections.
+
+    Returns:
+    - set[int]: The keys of all non-input nodes that feed an output, including the outputs themselves.
+    """
+    inputs = set(inputs)
+    incoming: dict[int, list[int]] = {}
+    for a, b in connections:
+        incoming.setdefault(b, []).append(a)
+
+    required = set(outputs)
+    stack = list(outputs)
+    while stack:
+        node = stack.pop()
+        for a in incoming.get(node, ()):
+            if a not in required and a not in inputs:
+                required.add(a)
+                stack.append(a)
+    return required
+
+
+def topological_order(required: set[int], connections: list[tuple[int, int]]) -> list[int]:
+    """
+    Sort the required nodes so that every node comes after all of the nodes feeding it.
+
+    Connections coming from nodes outside of `required` (the inputs) are ignored.
+
+    Parameters:
+    - required (set[int]): The nodes to sort, as returned by `required_for_output`.
+    - connections (list[tuple[int, int]]): The (from, to) keys of the enabled connections.
+
+    Raises:
+    - ValueError: If the required nodes contain a cycle.
+
+    Returns:
+    - list[int]: The required node keys in evaluation order.
+    """
+    indegree = {key: 0 for key in required}
+    outgoing: dict[int, list[int]] = {}
+    for a, b in connections:
+        if b in required and a in required:
+            indegree[b] += 1
+            outgoing.setdefault(a, []).append(b)
+
+    ready = deque(sorted(key for key, d in indegree.items() if d == 0))
+    order = []
+    while ready:
+        node = ready.popleft()
+        order.append(node)
+        for b in outgoing.get(node, ()):
+            indegree[b] -= 1
+            if indegree[b] == 0:
+                ready.append(b)
+
+    if len(order) != len(required):
+        raise ValueError("Genome contains a cycle, it cannot be evaluated as a feed-forward network.")
+    return order
+
+
+def compile_node_evals(genome: Genome, order: list[int], slots: dict[int, int]) -> list[tuple]:
+    """
+    Build the evaluation entry of each evaluated node.
+
+    Parameters:
+    - genome (Genome): The genome to compile.
+    - order (list[int]): The keys of the nodes to evaluate, in evaluation order.
+    - slots (dict[int, int]): The value slot of every input and evaluated node.
+
+    Returns:
+    - list[tuple]: One (slot, activation, aggregation, bias, response, source slots, weights) entry per evaluated node.
+    """
+    links: dict[int, list[tuple[int, float]]] = {key: [] for key in order}
+    for cg in genome.connections.values():
+        if not cg.enabled:
+            continue
+        a, b = cg.key
+        if b in links and a in slots:
+            links[b].append((slots[a], cg.weight))
+
+    node_evals = []
+    for key in order:
+        ng = genome.nodes[key]
+        sources = tuple(i for i, _ in links[key])
+        weights = tuple(w for _, w in links[key])
+        # Store the scalar implementations to skip the dispatch through `Function.__call__`.
+        node_evals.append((slots[key], ng.activation.scalar, ng.aggregation.scalar, ng.bias, ng.response, sources, weights))
+    return node_evals
+
+
+def _patch_node_evals(network: FeedForwardNetwork | RecurrentNetwork, genome: Genome, dirty: set[int]) -> bool:
+    """
+    Rebuild only the evaluation entries of the dirty nodes, if the structure of the network did not change.
+
+    Returns:
+    - bool: Whether the entries were patched. The network is left untouched if an evaluated dirty node was
+      deleted or its enabled sources changed.
+    """
+    position = {key: i for i, key in enumerate(network.order)}
+    keys = [key for key in dirty if key in position]
+    if not keys:
+        return True
+    if any(key not in genome.nodes for key in keys):
+        return False
+    slots = network.slots
+    sources: dict[int, set] = {key: set() for key in keys}
+    for cg in genome.connections.values():
+        if cg.enabled and cg.key[1] in sources:
+            # A source without a slot is a node the network does not evaluate yet.
+            sources[cg.key[1]].add(slots.get(cg.key[0]))
+    node_evals = network.node_evals
+    if any(sources[key] != set(node_evals[position[key]][5]) for key in keys):
+        return False
+    for key, entry in zip(keys, compile_node_evals(genome, keys, slots)):
+        node_evals[position[key]] = entry
+    return True
+
+
+def _add_ordered_edge(order: list[int], position: dict[int, int], outgoing: dict[int, set[int]],
+                      incoming: dict[int, set[int]], a: int, b: int) -> None:
+    """
+    Add the edge a -> b to a topologically ordered graph, locally reordering the nodes between b and a
+    if the edge goes backwards (Pearce & Kelly, 2006).
+
+    Raises:
+    - ValueError: If the edge closes a cycle.
+    """
+    if position[a] < position[b]:
+        outgoing.setdefault(a, set()).add(b)
+        incoming.setdefault(b, set()).add(a)
+        return
+
+    lower, upper = position[b], position[a]
+    forward = set()
+    stack = [b]
+    while stack:
+        node = stack.pop()
+        if node == a:
+            raise ValueError("Genome contains a cycle, it cannot be evaluated as a feed-forward network.")
+        if node not in forward:
+            forward.add(node)
+            stack.extend(n for n in outgoing.get(node, ()) if position[n] <= upper)
+    backward = set()
+    stack = [a]
+    while stack:
+        node = stack.pop()
+        if node not in backward:
+            backward.add(node)
+            stack.extend(n for n in incoming.get(node, ()) if position[n] >= lower)
+
+    # Everything that leads to `a` moves in front of everything reachable from `b`, keeping the
+    # positions the affected nodes occupied and their relative order within each group.
+    moved = sorted(backward, key=position.__getitem__) + sorted(forward, key=position.__getitem__)
+    for i, node in zip(sorted(position[n] for n in moved), moved):
+        order[i] = node
+        position[node] = i
+    outgoing.setdefault(a, set()).add(b)
+    incoming.setdefault(b, set()).add(a)
+
+
+def create_network(genome: Genome) -> FeedForwardNetwork | RecurrentNetwork:
+    """
+    Compile the given genome into a feed-forward network, or into a recurrent one if its
+    enabled connections contain a cycle.
+    """
+    try:
+        return FeedForwardNetwork.create(genome)
+    except ValueError:
+        return RecurrentNetwork.create(genome)
+
+
+class FeedForwardNetwork:
+    """
+    A genome compiled into a flat evaluation plan.
+
+    Every node is assigned a slot in `values`: the inputs occupy the first slots, followed by the
+    evaluated nodes in topological order. Each entry of `node_evals` only holds slot indices, so
+    activating the network never touches the genome or does a dict lookup.
+    """
+
+    def __init__(self, input_nodes: list[int], output_nodes: list[int], node_keys: list[int], node_evals: list[tuple]) -> None:
+        self.input_nodes = input_nodes
+        self.output_nodes = output_nodes
+        self.node_keys = node_keys
+        self.node_evals = node_evals
+
+        self.slots = {key: i for i, key in enumerate(node_keys)}
+        self.order = [node_keys[entry[0]] for entry in node_evals]
+        self.free_slots: list[int] = []
+        self.num_inputs = len(input_nodes)
+        self.output_slots = tuple(self.slots[key] for key in output_nodes)
+        self.values = [0.0] * len(node_keys)
+
+    def activate(self, inputs: list[float]) -> list[float]:
+        if self.num_inputs != len(inputs):
+            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(self.num_inputs, len(inputs)))
+
+        values = self.values
+        values[:self.num_inputs] = inputs
+        get = values.__getitem__
+        for slot, act_func, agg_func, bias, response, sources, weights in self.node_evals:
+            if sources:
+                values[slot] = act_func(bias + response * agg_func(map(mul, map(get, sources), weights)))
+            else:
+                values[slot] = act_func(bias)
+
+        return list(map(get, self.output_slots))
+
+    def reset(self) -> None:
+        """
+        Clear all node values.
+        """
+        self.values[:] = [0.0] * len(self.values)
+
+    @staticmethod
+    def create(genome: Genome) -> FeedForwardNetwork:
+        """
+        Compile the given genome into a feed-forward network.
+
+        Only enabled connections are considered, and nodes that do not feed an output are pruned.
+
+        Parameters:
+        - genome (Genome): The genome to compile.
+
+        Raises:
+        - ValueError: If the enabled connections of the genome contain a cycle.
+
+        Returns:
+        - FeedForwardNetwork: The compiled network.
+        """
+        input_nodes = list(genome.INPUT_KEYS)
+        output_nodes = list(genome.OUTPUT_KEYS)
+        connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+
+        required = required_for_output(input_nodes, output_nodes, connections)
+        order = topological_order(required, connections)
+
+        node_keys = input_nodes + order
+        node_evals = compile_node_evals(genome, order, {key: i for i, key in enumerate(node_keys)})
+        return FeedForwardNetwork(input_nodes, output_nodes, node_keys, node_evals)
+
+    def update(self, genome: Genome, dirty: set[int]) -> None:
+        """
+        Patch the network after the genome it was compiled from changed.
+
+        Only the nodes in `dirty` may have changed parameters, gained or lost incoming connections or had
+        their weights changed, or have been added to or removed from the genome. If the sources of every
+        dirty node stayed the same, only their entries of `node_evals` are rebuilt. Otherwise, instead of
+        pruning and sorting the genome again, nodes that newly feed an evaluated node are added and the
+        evaluation order is locally repaired around the changed connections, then all entries are rebuilt.
+        Nodes that stopped feeding an output are kept, which does not change the outputs.
+
+        Parameters:
+        - genome (Genome): The genome this network was compiled from.
+        - dirty (set[int]): The keys of the nodes that changed or whose incoming connections changed.
+
+        Raises:
+        - ValueError: If the changes introduced a cycle, the network must then be compiled from scratch.
+        """
+        if not dirty or _patch_node_evals(self, genome, dirty):
+            return
+        self._patch_order(genome, dirty)
+        self.node_evals[:] = compile_node_evals(genome, self.order, self.slots)
+
+    def _patch_order(self, genome: Genome, dirty: set[int]) -> None:
+        inputs = set(self.input_nodes)
+        incoming: dict[int, list[int]] = {}
+        for cg in genome.connections.values():
+            if cg.enabled:
+                incoming.setdefault(cg.key[1], []).append(cg.key[0])
+
+        # Drop deleted nodes and recycle their slots.
+        for key in dirty:
+            if key in self.slots and key not in inputs and key not in genome.nodes:
+                slot = self.slots.pop(key)
+                self.node_keys[slot] = None
+                self.free_slots.append(slot)
+        order = [key for key in self.order if key in self.slots]
+
+        # Nodes that now feed an evaluated node have to be evaluated as well, as do their own sources.
+        added = []
+        stack = [key for key in dirty if key in self.slots and key not in inputs]
+        while stack:
+            for a in incoming.get(stack.pop(), ()):
+                if a not in self.slots and a in genome.nodes:
+                    slot = self.free_slots.pop() if self.free_slots else len(self.values)
+                    if slot == len(self.values):
+                        self.values.append(0.0)
+                        self.node_keys.append(a)
+                    else:
+                        self.node_keys[slot] = a
+                    self.slots[a] = slot
+                    order.append(a)
+                    added.append(a)
+                    stack.append(a)
+
+        # Every connection between evaluated nodes that does not end in a changed or added node kept
+        # its place in the order, the others are added back one by one.
+        changed = dirty.union(added)
+        position = {key: i for i, key in enumerate(order)}
+        outgoing: dict[int, set[int]] = {}
+        ordered_incoming: dict[int, set[int]] = {}
+        pending = []
+        for b, sources in incoming.items():
+            if b not in position:
+                continue
+            for a in sources:
+                if a not in position:
+                    continue
+                if b in changed:
+                    pending.append((a, b))
+                else:
+                    outgoing.setdefault(a, set()).add(b)
+                    ordered_incoming.setdefault(b, set()).add(a)
+        for a, b in pending:
+            _add_ordered_edge(order, position, outgoing, ordered_incoming, a, b)
+        self.order = order
+
+
+class RecurrentNetwork:
+    """
+    A genome compiled for stateful, tick by tick evaluation.
+
+    Every node reads the values its sources had on the previous tick, so cycles are allowed and
+    the network keeps its state between ticks. The values live in two preallocated buffers laid
+    out like `FeedForwardNetwork.values`, which swap roles on every step.
+    """
+
+    def __init__(self, input_nodes: list[int], output_nodes: list[int], node_keys: list[int], node_evals: list[tuple]) -> None:
+        self.input_nodes = input_nodes
+        self.output_nodes = output_nodes
+        self.node_keys = node_keys
+        self.node_evals = node_evals
+
+        self.slots = {key: i for i, key in enumerate(node_keys)}
+        self.order = [node_keys[entry[0]] for entry in node_evals]
+        self.num_inputs = len(input_nodes)
+        self.output_slots = tuple(self.slots[key] for key in output_nodes)
+        self.values = [[0.0] * len(node_keys), [0.0] * len(node_keys)]
+        self.active = 0
+
+    def step(self, inputs: list[float]) -> list[float]:
+        """
+        Advance the network by one tick.
+
+        Parameters:
+        - inputs (list[float]): The values of the input nodes for this tick.
+
+        Raises:
+        - RuntimeError: If the number of inputs does not match the number of input nodes.
+
+        Returns:
+        - list[float]: The values of the output nodes after this tick.
+        """
+        if self.num_inputs != len(inputs):
+            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(self.num_inputs, len(inputs)))
+
+        ivalues = self.values[self.active]
+        self.active = 1 - self.active
+        ovalues = self.values[self.active]
+        ivalues[:self.num_inputs] = inputs
+        ovalues[:self.num_inputs] = inputs
+
+        get = ivalues.__getitem__
+        for slot, act_func, agg_func, bias, response, sources, weights in self.node_evals:
+            if sources:
+                ovalues[slot] = act_func(bias + response * agg_func(map(mul, map(get, sources), weights)))
+            else:
+                ovalues[slot] = act_func(bias)
+
+        return list(map(ovalues.__getitem__, self.output_slots))
+
+    # Lets a recurrent network stand in wherever a FeedForwardNetwork is activated.
+    activate = step
+
+    def reset(self) -> None:
+        """
+        Clear all node values and forget the state carried over between ticks.
+        """
+        for values in self.values:
+            values[:] = [0.0] * len(values)
+        self.active = 0
+
+    @staticmethod
+    def create(genome: Genome) -> RecurrentNetwork:
+        """
+        Compile the given genome into a recurrent network.
+
+        Only enabled connections are considered, and nodes that do not feed an output are pruned.
+
+        Parameters:
+        - genome (Genome): The genome to compile.
+
+        Returns:
+        - RecurrentNetwork: The compiled network.
+        """
+        input_nodes = list(genome.INPUT_KEYS)
+        output_nodes = list(genome.OUTPUT_KEYS)
+        connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+
+        required = required_for_output(input_nodes, output_nodes, connections)
+        # Each node only reads the previous tick, so the evaluation order does not matter.
+        order = sorted(required)
+
+        node_keys = input_nodes + order
+        node_evals = compile_node_evals(genome, order, {key: i for i, key in enumerate(node_keys)})
+        return RecurrentNetwork(input_nodes, output_nodes, node_keys, node_evals)
+
+    def update(self, genome: Genome, dirty: set[int]) -> None:
+        """
+        Rebuild the entries of the dirty nodes in place after the parameters of the genome it was compiled from changed.
+
+        Parameters:
+        - genome (Genome): The genome this network was compiled from.
+        - dirty (set[int]): The keys of the nodes that changed or whose incoming connections changed.
+
+        Raises:
+        - ValueError: If the structure of the genome changed, the network must then be compiled from scratch.
+        """
+        if dirty and not _patch_node_evals(self, genome, dirty):
+            raise ValueError("Structural changes cannot be patched into a recurrent network.")
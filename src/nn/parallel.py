@@ -0,0 +1,257 @@
+from __future__ import annotations
+from multiprocessing import get_context, resource_tracker
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING
+import numpy as np
+
+from .batch import BatchNetwork, _check_networks
+from .network import FeedForwardNetwork
+
+if TYPE_CHECKING:
+    from ..genome import Genome
+
+# (name, dtype, shape, byte offset) of every array stored in a shared block.
+Layout = list[tuple[str, str, tuple[int, ...], int]]
+
+
+def _views(shm: SharedMemory, layout: Layout) -> dict[str, np.ndarray]:
+    """
+    Map the arrays of a shared block, without copying them.
+    """
+    return {name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset) for name, dtype, shape, offset in layout}
+
+
+class _SharedBlock:
+    """
+    A shared memory block holding named arrays, reused as long as the arrays fit into it.
+    """
+
+    def __init__(self) -> None:
+        self.shm: SharedMemory = None
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, arrays: dict[str, np.ndarray]) -> Layout:
+        """
+        Copy the arrays into the block, growing it if needed, and return their layout.
+        """
+        layout = []
+        size = 0
+        for name, array in arrays.items():
+            layout.append((name, array.dtype.str, array.shape, size))
+            # Keep every array 8 byte aligned.
+            size += -(-array.nbytes // 8) * 8
+        self.reserve(size)
+        for (name, dtype, shape, offset), array in zip(layout, arrays.values()):
+            np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)[...] = array
+        return layout
+
+    def reserve(self, size: int) -> None:
+        """
+        Make the block at least `size` bytes large. A new block is at least twice as large as the old one,
+        so that a slowly growing population rarely reallocates.
+        """
+        if self.shm is not None and self.shm.size >= size:
+            return
+        capacity = max(size, 2 * self.shm.size if self.shm is not None else 0, 4096)
+        self.close()
+        self.shm = SharedMemory(create=True, size=capacity)
+
+    def close(self) -> None:
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+def _worker(connection: Connection) -> None:
+    """
+    Evaluate one shard of a `ParallelBatchNetwork` whenever the parent asks for it.
+
+    Messages are ("load", parameters, io) with the (block name, layout) of the shard parameters and of
+    the shared inputs/outputs and the (start, stop) rows of the shard, ("activate",), ("reset",), or None
+    to exit. Every message is answered, with None or with the exception it raised.
+    """
+    blocks: dict[str, SharedMemory] = {}
+    batch = io = inputs = outputs = None
+    while (message := connection.recv()) is not None:
+        try:
+            if message[0] == "activate":
+                if batch is not None:
+                    outputs[...] = batch.activate(inputs)
+            elif message[0] == "reset":
+                if batch is not None:
+                    batch.reset()
+            elif message[0] == "load":
+                _, parameters, (io_name, io_layout, start, stop) = message
+                # Drop the views before closing the blocks they map.
+                batch = io = inputs = outputs = None
+                names = {io_name} if parameters is None else {io_name, parameters[0]}
+                for name in set(blocks) - names:
+                    blocks.pop(name).close()
+                for name in names - set(blocks):
+                    blocks[name] = SharedMemory(name=name)
+                if parameters is not None:
+                    batch = BatchNetwork.unpack(_views(blocks[parameters[0]], parameters[1]))
+                    io = _views(blocks[io_name], io_layout)
+                    inputs, outputs = io["inputs"][start:stop], io["outputs"][start:stop]
+            connection.send(None)
+        except Exception as e:
+            connection.send(e)
+    batch = io = inputs = outputs = None
+    for shm in blocks.values():
+        shm.close()
+
+
+def _cost(network: FeedForwardNetwork) -> int:
+    """
+    Rough cost of activating a network: one per node and one per connection.
+    """
+    return sum(1 + len(sources) for _, _, _, _, _, sources, _ in network.node_evals)
+
+
+class ParallelBatchNetwork:
+    """
+    Many compiled feed-forward networks evaluated by a pool of worker processes.
+
+    The networks are split into one contiguous shard per worker, balanced by their number of nodes and
+    connections. Each shard is packed with `BatchNetwork.pack` into a shared memory block that its worker
+    maps without copying, so genomes and networks are never pickled. The inputs and outputs of all agents
+    live in another shared block: `activate` writes the inputs, wakes the workers with a short message,
+    and every worker writes the outputs of its own rows.
+
+    `update` replaces the networks and reuses the existing blocks whenever the new ones fit, so the
+    workers and their memory survive births and deaths. Call `close` to stop the workers and free the
+    shared memory.
+    """
+
+    def __init__(self, networks: list[FeedForwardNetwork], num_workers: int) -> None:
+        if num_workers < 1:
+            raise ValueError("A parallel batch needs at least one worker.")
+        # Share the resource tracker of this process with the workers. A worker starting its own would
+        # unlink the blocks it attached to as soon as it exits.
+        resource_tracker.ensure_running()
+        context = get_context()
+        self.connections: list[Connection] = []
+        self.workers = []
+        for _ in range(num_workers):
+            parent, child = context.Pipe()
+            worker = context.Process(target=_worker, args=(child,), daemon=True)
+            worker.start()
+            child.close()
+            self.connections.append(parent)
+            self.workers.append(worker)
+        self.blocks = [_SharedBlock() for _ in range(num_workers)]
+        self.io = _SharedBlock()
+        self.inputs: np.ndarray = None
+        self.outputs: np.ndarray = None
+        self.update(networks)
+
+    def update(self, networks: list[FeedForwardNetwork]) -> None:
+        """
+        Replace the evaluated networks, e.g. after agents were born or died. Node values are reset.
+
+        Parameters:
+        - networks (list[FeedForwardNetwork]): The compiled networks, one per agent.
+        """
+        self.num_inputs, self.num_outputs = _check_networks(networks)
+        self.num_agents = len(networks)
+        costs = np.cumsum([_cost(net) for net in networks])
+        targets = costs[-1] * np.arange(1, len(self.workers)) / len(self.workers)
+        self.bounds = [0, *np.searchsorted(costs, targets, side="right").tolist(), self.num_agents]
+
+        self.inputs = self.outputs = None
+        io_layout = self.io.write({"inputs": np.zeros((self.num_agents, self.num_inputs)),
+                                   "outputs": np.zeros((self.num_agents, self.num_outputs))})
+        io = _views(self.io.shm, io_layout)
+        self.inputs, self.outputs = io["inputs"], io["outputs"]
+
+        # Pack the shards before sending anything, so that no worker maps a block that is still growing.
+        messages = []
+        for block, start, stop in zip(self.blocks, self.bounds, self.bounds[1:]):
+            parameters = None
+            if start < stop:
+                layout = block.write(BatchNetwork(networks[start:stop]).pack())
+                parameters = block.name, layout
+            messages.append(("load", parameters, (self.io.name, io_layout, start, stop)))
+        for connection, message in zip(self.connections, messages):
+            connection.send(message)
+        self._wait()
+
+    def activate(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Activate every network of the batch.
+
+        Parameters:
+        - inputs (np.ndarray): The inputs of all agents, of shape (n_agents, num_inputs).
+
+        Raises:
+        - RuntimeError: If the inputs do not have the expected shape.
+
+        Returns:
+        - np.ndarray: The outputs of all agents, of shape (n_agents, num_outputs).
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        if inputs.shape != (self.num_agents, self.num_inputs):
+            raise RuntimeError("Expected inputs of shape {0}, got {1}".format((self.num_agents, self.num_inputs), inputs.shape))
+        self.inputs[...] = inputs
+        self._broadcast(("activate",))
+        return self.outputs.copy()
+
+    def reset(self) -> None:
+        """
+        Clear all node values.
+        """
+        self._broadcast(("reset",))
+
+    def close(self) -> None:
+        """
+        Stop the workers and free the shared memory.
+        """
+        for connection, worker in zip(self.connections, self.workers):
+            connection.send(None)
+            worker.join()
+            connection.close()
+        self.connections.clear()
+        self.workers.clear()
+        self.inputs = self.outputs = None
+        for block in self.blocks:
+            block.close()
+        self.io.close()
+
+    def __enter__(self) -> ParallelBatchNetwork:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _broadcast(self, message: tuple) -> None:
+        for connection in self.connections:
+            connection.send(message)
+        self._wait()
+
+    def _wait(self) -> None:
+        """
+        Wait for every worker to answer, and raise the first error a worker reported.
+        """
+        errors = [connection.recv() for connection in self.connections]
+        for error in errors:
+            if error is not None:
+                raise error
+
+    @staticmethod
+    def create(genomes: list[Genome], num_workers: int) -> ParallelBatchNetwork:
+        """
+        Compile the given genomes and distribute them over `num_workers` worker processes.
+
+        Parameters:
+        - genomes (list[Genome]): The genomes to compile, one per agent.
+        - num_workers (int): The number of worker processes.
+
+        Returns:
+        - ParallelBatchNetwork: The batch, whose i-th row corresponds to the i-th genome.
+        """
+        return ParallelBatchNetwork([FeedForwardNetwork.create(genome) for genome in genomes], num_workers)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+from hashlib import blake2b
+from typing import TYPE_CHECKING
+import numpy as np
+
+from ..lru import LRUCache
+from .codegen import GeneratedNetwork
+from .network import FeedForwardNetwork, RecurrentNetwork, required_for_output, topological_order
+
+if TYPE_CHECKING:
+    from ..genome import Genome
+
+
+def structure_hash(genome: Genome) -> bytes:
+    """
+    Return a canonical hash of the structure of a genome: its input and output keys, the keys and function
+    ids of its nodes and the keys of its enabled connections.
+
+    Genomes that only differ in weights, biases, responses or disabled connections have the same hash. The
+    hash is computed from the sorted `gene_arrays` of the genome, so it does not depend on the order of
+    the gene dicts, and it is a 128 bit digest, so that different structures do not collide in practice.
+    """
+    ga = genome.gene_arrays()
+    digest = blake2b(digest_size=16)
+    connection_keys = ga.connection_keys[ga.connection_enabled]
+    digest.update(np.array([len(genome.INPUT_KEYS), len(genome.OUTPUT_KEYS), len(ga.node_keys), len(connection_keys)],
+                           dtype=np.int64).tobytes())
+    digest.update(np.array(list(genome.INPUT_KEYS) + list(genome.OUTPUT_KEYS), dtype=np.int64).tobytes())
+    for array in (ga.node_keys, ga.node_activation, ga.node_aggregation, connection_keys):
+        digest.update(array.tobytes())
+    return digest.digest()
+
+
+class EvaluationPlan:
+    """
+    The structure of a compiled network without its parameters.
+
+    A plan holds everything `FeedForwardNetwork.create` and `RecurrentNetwork.create` derive from the
+    structure of a genome: the pruned nodes in evaluation order, their slots and functions and the source
+    slots of their incoming connections. A network for another genome of the same structure (see
+    `structure_hash`) is then built by filling in its parameters, without pruning or sorting again.
+
+    The parameters are one flat vector, the weights of the incoming connections of every node in
+    evaluation order, followed by the biases and the responses of the nodes. This is the order of the
+    keyword-only parameters of `generate_source`.
+
+    Incoming connections are aggregated in the order of the genome the plan was created from, so a
+    network built for a genome with differently ordered gene dicts may differ from the network
+    `create_network` compiles for it in the last bits of a sum.
+    """
+
+    def __init__(self, input_nodes: list[int], output_nodes: list[int], node_keys: list[int], recurrent: bool,
+                 entries: list[tuple], connection_keys: list[tuple[int, int]]) -> None:
+        self.input_nodes = input_nodes
+        self.output_nodes = output_nodes
+        self.node_keys = node_keys
+        self.recurrent = recurrent
+        # One (slot, activation, aggregation, source slots) entry per evaluated node.
+        self.entries = entries
+        # The keys of the weighted connections, grouped by the node they feed.
+        self.connection_keys = connection_keys
+        self.order = [node_keys[entry[0]] for entry in entries]
+
+    @staticmethod
+    def create(genome: Genome) -> EvaluationPlan:
+        """
+        Plan the evaluation of the given genome, as a feed-forward network or, if its enabled connections
+        contain a cycle, as a recurrent one.
+
+        Parameters:
+        - genome (Genome): The genome to plan.
+
+        Returns:
+        - EvaluationPlan: The plan of every genome with the structure of the given one.
+        """
+        input_nodes = list(genome.INPUT_KEYS)
+        output_nodes = list(genome.OUTPUT_KEYS)
+        connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+
+        required = required_for_output(input_nodes, output_nodes, connections)
+        try:
+            order, recurrent = topological_order(required, connections), False
+        except ValueError:
+            # Each node only reads the previous tick, so the evaluation order does not matter.
+            order, recurrent = sorted(required), True
+
+        node_keys = input_nodes + order
+        slots = {key: i for i, key in enumerate(node_keys)}
+        incoming: dict[int, list[tuple[int, int]]] = {key: [] for key in order}
+        for a, b in connections:
+            if b in incoming and a in slots:
+                incoming[b].append((a, b))
+
+        entries, connection_keys = [], []
+        for key in order:
+            ng = genome.nodes[key]
+            entries.append((slots[key], ng.activation.scalar, ng.aggregation.scalar,
+                            tuple(slots[a] for a, _ in incoming[key])))
+            connection_keys.extend(incoming[key])
+        return EvaluationPlan(input_nodes, output_nodes, node_keys, recurrent, entries, connection_keys)
+
+    def parameters(self, genome: Genome) -> list[float]:
+        """
+        Return the parameter vector of a genome with the structure of this plan.
+        """
+        nodes, connections = genome.nodes, genome.connections
+        parameters = [connections[key].weight for key in self.connection_keys]
+        parameters += [nodes[key].bias for key in self.order]
+        parameters += [nodes[key].response for key in self.order]
+        return parameters
+
+    def node_evals(self, parameters: list[float]) -> list[tuple]:
+        """
+        Return the `node_evals` of a network of this plan with the given parameter vector.
+        """
+        num_weights, num_nodes = len(self.connection_keys), len(self.entries)
+        biases = parameters[num_weights:num_weights + num_nodes]
+        responses = parameters[num_weights + num_nodes:]
+        node_evals = []
+        start = 0
+        for (slot, act_func, agg_func, sources), bias, response in zip(self.entries, biases, responses):
+            end = start + len(sources)
+            node_evals.append((slot, act_func, agg_func, bias, response, sources, tuple(parameters[start:end])))
+            start = end
+        return node_evals
+
+    def network(self, genome: Genome, generate: bool = False) -> FeedForwardNetwork | RecurrentNetwork:
+        """
+        Build the network of a genome with the structure of this plan.
+
+        Parameters:
+        - genome (Genome): The genome to build the network of.
+        - generate (bool): Whether a feed-forward network is activated through generated code (see `GeneratedNetwork`).
+
+        Returns:
+        - FeedForwardNetwork | RecurrentNetwork: A fresh network, as `create_network` would compile it.
+        """
+        if self.recurrent:
+            cls = RecurrentNetwork
+        else:
+            cls = GeneratedNetwork if generate else FeedForwardNetwork
+        return cls(self.input_nodes, self.output_nodes, list(self.node_keys), self.node_evals(self.parameters(genome)))
+
+
+class PlanCache(LRUCache):
+    """
+    A bounded cache of evaluation plans keyed by `structure_hash`, with least recently used eviction,
+    see `LRUCache`.
+
+    Offspring often have the exact structure of a parent and only differ in their parameters, so their
+    networks are built from the plan of the parent instead of being pruned and sorted again.
+    """
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        super().__init__(maxsize)
+
+    def plan(self, genome: Genome) -> EvaluationPlan:
+        """
+        Return the plan of the given genome, planning and caching it if its structure is not cached.
+        """
+        key = structure_hash(genome)
+        plan = self.get(key)
+        if plan is None:
+            plan = EvaluationPlan.create(genome)
+            self.put(key, plan)
+        return plan
+
+    def create_network(self, genome: Genome, generate: bool = False) -> FeedForwardNetwork | RecurrentNetwork:
+        """
+        Compile the given genome like `create_network`, reusing the cached plan of its structure.
+        """
+        return self.plan(genome).network(genome, generate)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+from random import Random
+from typing import TYPE_CHECKING
+import random
+import numpy as np
+
+from .genome import Genome
+
+if TYPE_CHECKING:
+    from .innovation import InnovationTracker
+    from .speciation import SpeciesSet
+
+
+class RealTimePopulation:
+    """
+    A steady-state population driven by energy instead of generations or lifetime timers.
+
+    Every agent lives in a slot of the population. Its genome is `genomes[slot]` and its energy is
+    `energy[slot]`, a NumPy array the simulation can update in bulk. `update` lets every agent that
+    reached `REPRODUCTION_THRESHOLD` reproduce and removes every agent whose energy ran out.
+
+    Each birth or death costs O(1) on top of the genetics themselves. Slots are recycled through a
+    free list, and the living agents are kept in a dense list with swap-removal. Mates are drawn
+    from that list by rejection sampling proportional to energy. Compatibility is checked with at
+    most `MATE_ATTEMPTS` distance computations.
+
+    If a `SpeciesSet` is given, agents are assigned to a species as they are added and leave it as
+    they are removed. With `defer_speciation` set, added agents are only queued in `unassigned` and
+    assigned by `assign_species`, e.g. once a tick has time left. If an `InnovationTracker` is given,
+    every `update` advances its clock by one tick. Mates, crossover and mutation draw from `rng`, e.g.
+    a seeded `RandomStream`, and from the global `random` module if none is given.
+
+    The initial `genomes` all start with `energy`, by default the share of `REPRODUCTION_THRESHOLD` an
+    offspring starts with. The per-slot arrays are reallocated as the population grows, always access
+    them through the population.
+    """
+
+    REPRODUCTION_THRESHOLD = 10.0 # Energy at which an agent reproduces.
+    OFFSPRING_ENERGY_SHARE = 0.5 # Share of the parent's energy handed to its offspring.
+    MATE_ATTEMPTS = 8 # Candidate mates drawn before falling back to asexual reproduction.
+
+    def __init__(self, genomes: list[Genome] = None, energy: float = None, species: SpeciesSet = None,
+                 innovations: InnovationTracker = None, rng: Random = None) -> None:
+        if energy is None:
+            energy = self.REPRODUCTION_THRESHOLD * self.OFFSPRING_ENERGY_SHARE
+        elif genomes and energy <= 0:
+            raise ValueError(f"The initial energy must be positive, got {energy}.")
+        self.species = species
+        self.innovations = innovations
+        self.rng = random if rng is None else rng
+        self.genomes: list[Genome] = []
+        self.energy = np.zeros(0)
+        self.alive_mask = np.zeros(0, dtype=bool)
+        self.free_slots: list[int] = []
+        self.alive: list[int] = []
+        self.alive_position = np.zeros(0, dtype=np.intp)
+        self.births = 0
+        self.deaths = 0
+        self.defer_speciation = False
+        # The genomes waiting for `assign_species`, by key.
+        self.unassigned: dict[int, Genome] = {}
+        for genome in genomes or ():
+            self.add(genome, energy)
+
+    def __len__(self) -> int:
+        return len(self.alive)
+
+    def _grow(self) -> None:
+        """
+        Double the capacity of the per-slot arrays, so that adding agents is amortized O(1).
+        """
+        old = len(self.energy)
+        new = max(16, 2 * old)
+        self.energy = np.concatenate([self.energy, np.zeros(new - old)])
+        self.alive_mask = np.concatenate([self.alive_mask, np.zeros(new - old, dtype=bool)])
+        self.alive_position = np.concatenate([self.alive_position, np.zeros(new - old, dtype=np.intp)])
+        self.genomes.extend([None] * (new - old))
+        self.free_slots.extend(range(new - 1, old - 1, -1))
+
+    def add(self, genome: Genome, energy: float) -> int:
+        """
+        Add an agent to the population.
+
+        Parameters:
+        - genome (Genome): The genome of the agent.
+        - energy (float): The starting energy of the agent.
+
+        Returns:
+        - int: The slot of the new agent.
+        """
+        if not self.free_slots:
+            self._grow()
+        slot = self.free_slots.pop()
+        self.genomes[slot] = genome
+        self.energy[slot] = energy
+        self.alive_mask[slot] = True
+        self.alive_position[slot] = len(self.alive)
+        self.alive.append(slot)
+        if self.species is not None:
+            if self.defer_speciation:
+                self.unassigned[genome.key] = genome
+            else:
+                self.species.assign(genome)
+        return slot
+
+    def remove(self, slot: int) -> Genome:
+        """
+        Remove an agent from the population and return its genome.
+        """
+        if not self.alive_mask[slot]:
+            raise ValueError(f"Slot {slot} holds no living agent.")
+        # Move the last living agent into the hole.
+        position = self.alive_position[slot]
+        last = self.alive.pop()
+        if last != slot:
+            self.alive[position] = last
+            self.alive_position[last] = position
+
+        genome = self.genomes[slot]
+        if self.species is not None and self.unassigned.pop(genome.key, None) is None:
+            self.species.remove(genome)
+        self.genomes[slot] = None
+        self.energy[slot] = 0.0
+        self.alive_mask[slot] = False
+        self.free_slots.append(slot)
+        return genome
+
+    def assign_species(self, limit: int = None) -> int:
+        """
+        Assign the genomes queued while `defer_speciation` was set to their species, oldest first.
+
+        Parameters:
+        - limit (int): The most genomes to assign, or None to assign all of them.
+
+        Returns:
+        - int: The number of genomes assigned.
+        """
+        count = len(self.unassigned) if limit is None else min(limit, len(self.unassigned))
+        for _ in range(count):
+            key = next(iter(self.unassigned))
+            self.species.assign(self.unassigned.pop(key))
+        return count
+
+    def select_mate(self, slot: int) -> int | None:
+        """
+        Select a compatible mate for the agent in the given slot.
+
+        Up to `MATE_ATTEMPTS` candidates are drawn uniformly. Each is accepted with a probability
+        proportional to its energy, and then checked for compatibility, see `Genome.compatibility_threshold`.
+
+        Returns:
+        - int | None: The slot of the mate, or None if no compatible mate was found.
+        """
+        if len(self.alive) < 2:
+            return None
+        genome = self.genomes[slot]
+        for _ in range(self.MATE_ATTEMPTS):
+            candidate = self.alive[self.rng.randrange(len(self.alive))]
+            if candidate == slot or self.rng.random() * self.REPRODUCTION_THRESHOLD >= self.energy[candidate]:
+                continue
+            if genome.distance(self.genomes[candidate]) < Genome.compatibility_threshold:
+                return candidate
+        return None
+
+    def reproduce(self, slot: int) -> int:
+        """
+        Let the agent in the given slot reproduce, with a compatible mate if one is found and asexually
+        otherwise. The offspring receives `OFFSPRING_ENERGY_SHARE` of the parent's energy.
+
+        Returns:
+        - int: The slot of the offspring.
+        """
+        parent = self.genomes[slot]
+        mate = self.select_mate(slot)
+        child = type(parent).crossover(parent, parent if mate is None else self.genomes[mate], self.rng)
+        child.mutate(self.rng)
+
+        energy = self.energy[slot] * self.OFFSPRING_ENERGY_SHARE
+        self.energy[slot] -= energy
+        self.births += 1
+        return self.add(child, energy)
+
+    def update(self) -> tuple[list[int], list[int]]:
+        """
+        Process the reproduction and death events caused by the latest energy changes.
+
+        Agents at or above `REPRODUCTION_THRESHOLD` reproduce once, then agents without energy die.
+
+        Returns:
+        - tuple[list[int], list[int]]: The slots of the offspring, and the slots freed by dead agents.
+        """
+        births = [self.reproduce(slot) for slot in np.flatnonzero(self.alive_mask & (self.energy >= self.REPRODUCTION_THRESHOLD)).tolist()]
+        deaths = np.flatnonzero(self.alive_mask & (self.energy <= 0.0)).tolist()
+        for slot in deaths:
+            self.remove(slot)
+        self.deaths += len(deaths)
+        if self.innovations is not None:
+            self.innovations.advance()
+        return births, deaths
@@ -0,0 +1,303 @@
+from __future__ import annotations
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable
+import inspect
+import json
+import os
+import time
+
+from .genome import Genome
+from .nn.codegen import GeneratedNetwork
+from .nn.network import FeedForwardNetwork, RecurrentNetwork
+from .nn.plan import EvaluationPlan
+
+# The instrumented operations, by name: (class, attribute). Staticmethods and classmethods receive the genome
+# as their first argument after the class, methods are called on it.
+OPERATIONS: dict[str, tuple[type, str]] = {
+    "activate": (Genome, "activate"),
+    "distance": (Genome, "distance"),
+    "crossover": (Genome, "crossover"),
+    "mutate": (Genome, "mutate"),
+    "mutate_add_connection": (Genome, "mutate_add_connection"),
+    "mutate_add_node": (Genome, "mutate_add_node"),
+    "mutate_delete_node": (Genome, "mutate_delete_node"),
+    "mutate_delete_connection": (Genome, "mutate_delete_connection"),
+    "sync_network": (Genome, "_sync_network"),
+    "create_feed_forward": (FeedForwardNetwork, "create"),
+    "create_recurrent": (RecurrentNetwork, "create"),
+    "create_generated": (GeneratedNetwork, "create"),
+    "create_plan": (EvaluationPlan, "create"),
+}
+
+
+def size_bucket(connections: int) -> int:
+    """
+    Return the bucket of a genome with the given number of enabled connections: 0 for none, and k for
+    2^(k-1) to 2^k - 1 connections.
+    """
+    return connections.bit_length()
+
+
+def size_bucket_label(bucket: int) -> str:
+    """
+    Return the range of enabled connections of a size bucket, e.g. "4-7".
+    """
+    if bucket < 2:
+        return str(bucket)
+    return f"{1 << (bucket - 1)}-{(1 << bucket) - 1}"
+
+
+class Histogram:
+    """
+    The call counter, cumulative time and duration histogram of one operation, and its sampled time per
+    genome size bucket.
+    """
+
+    # Upper bounds of the duration buckets in seconds, 1-2.5-5 steps from 1 µs to 1 s. Longer calls
+    # only count towards the +Inf bucket.
+    BOUNDS = tuple(m * 10.0 ** e for e in range(-6, 0) for m in (1.0, 2.5, 5.0)) + (1.0,)
+
+    __slots__ = ("count", "total", "buckets", "sampled")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        # Calls per duration bucket, not cumulative, the last one for calls longer than every bound.
+        self.buckets = [0] * (len(self.BOUNDS) + 1)
+        # Size bucket: [sampled calls, sampled seconds].
+        self.sampled: dict[int, list] = {}
+
+    def reset(self) -> None:
+        """
+        Zero the counters in place, the wrappers of `Profiler` holding on to `buckets`.
+        """
+        self.count = 0
+        self.total = 0.0
+        self.buckets[:] = [0] * len(self.buckets)
+        self.sampled.clear()
+
+    def record(self, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        self.buckets[bisect_left(self.BOUNDS, elapsed)] += 1
+
+    def record_sample(self, elapsed: float, bucket: int) -> None:
+        sample = self.sampled.get(bucket)
+        if sample is None:
+            self.sampled[bucket] = [1, elapsed]
+        else:
+            sample[0] += 1
+            sample[1] += elapsed
+
+    def cumulative(self) -> list[int]:
+        """
+        Return the number of calls up to every bound of `BOUNDS`, followed by the number of all calls.
+        """
+        counts, running = [], 0
+        for count in self.buckets:
+            running += count
+            counts.append(running)
+        return counts
+
+    def to_dict(self) -> dict:
+        """
+        Return the counters as plain values, with the histogram as cumulative counts keyed by upper bound.
+        """
+        labels = [f"{bound:g}" for bound in self.BOUNDS] + ["+Inf"]
+        return {
+            "count": self.count,
+            "seconds": self.total,
+            "mean_seconds": self.total / self.count if self.count else 0.0,
+            "histogram": dict(zip(labels, self.cumulative())),
+            "sampled": {size_bucket_label(bucket): {"count": count, "seconds": seconds, "mean_seconds": seconds / count}
+                        for bucket, (count, seconds) in sorted(self.sampled.items())},
+        }
+
+
+class Profiler:
+    """
+    Counts and times the hot operations of `OPERATIONS`: activation, distance, crossover, mutation, the
+    structural mutations and network compilation.
+
+    The operations are only instrumented between `enable` and `disable`, or within a `with` block, by
+    replacing them on their classes with timing wrappers and restoring the originals afterwards. A
+    disabled profiler thus costs nothing, not even a flag check. At most one profiler is enabled at a
+    time, and it is meant for a single thread: the workers of `ParallelBatchNetwork` are not profiled.
+
+    Timings are inclusive, e.g. `mutate` includes the structural mutations it makes and `activate` the
+    network compilation it triggers. With `sample_every`, every n-th call of an operation is also
+    attributed to the `size_bucket` of its genome's enabled connections (see `Genome.size`), whose cost
+    is why only a sample of the calls is measured. For `crossover`, that is the first parent.
+
+    The counters are returned by `stats`, and written by `dump` as JSON or in the Prometheus text format.
+    """
+
+    active: Profiler = None # The enabled profiler, if any.
+    PREFIX = "neat_operation" # Prefix of the Prometheus metric names.
+
+    def __init__(self, sample_every: int = None) -> None:
+        if sample_every is not None and sample_every < 1:
+            raise ValueError(f"sample_every must be at least 1, got {sample_every}.")
+        self.sample_every = sample_every
+        self.histograms = {name: Histogram() for name in OPERATIONS}
+        self._originals: dict[str, object] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return Profiler.active is self
+
+    def enable(self) -> None:
+        """
+        Instrument the operations. Does nothing if this profiler is already enabled.
+
+        Raises:
+        - ValueError: If another profiler is enabled.
+        """
+        if self.enabled:
+            return
+        if Profiler.active is not None:
+            raise ValueError("Another profiler is already enabled.")
+        for name, (owner, attribute) in OPERATIONS.items():
+            original = owner.__dict__[attribute]
+            self._originals[name] = original
+            if isinstance(original, (staticmethod, classmethod)):
+                wrapper = type(original)(self._wrap(name, original.__func__, isinstance(original, classmethod)))
+            else:
+                wrapper = self._wrap(name, original, False)
+            setattr(owner, attribute, wrapper)
+        Profiler.active = self
+
+    def disable(self) -> None:
+        """
+        Restore the original operations. Does nothing if this profiler is not enabled.
+        """
+        if not self.enabled:
+            return
+        for name, (owner, attribute) in OPERATIONS.items():
+            setattr(owner, attribute, self._originals.pop(name))
+        Profiler.active = None
+
+    def __enter__(self) -> Profiler:
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.disable()
+
+    def _wrap(self, name: str, function: Callable, classmethod_: bool) -> Callable:
+        """
+        Return a wrapper of the given function recording the duration of every call into the histogram of
+        the named operation, and with sampling, the size of every n-th genome it is called with.
+        """
+        histogram = self.histograms[name]
+        buckets, bounds = histogram.buckets, Histogram.BOUNDS
+        perf_counter = time.perf_counter
+        if self.sample_every is None:
+            # `Histogram.record`, inlined to keep the overhead per call low.
+            @wraps(function)
+            def timed(*args, **kwargs):
+                start = perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    elapsed = perf_counter() - start
+                    histogram.count += 1
+                    histogram.total += elapsed
+                    buckets[bisect_left(bounds, elapsed)] += 1
+            return timed
+
+        # The genome is the first parameter after the class, passed by position or by name.
+        genome_index = 1 if classmethod_ else 0
+        genome_name = list(inspect.signature(function).parameters)[genome_index]
+        sample_every = self.sample_every
+        record = histogram.record
+        record_sample = histogram.record_sample
+
+        @wraps(function)
+        def sampled(*args, **kwargs):
+            genome = args[genome_index] if len(args) > genome_index else kwargs.get(genome_name)
+            if genome is None or (histogram.count + 1) % sample_every:
+                start = perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    elapsed = perf_counter() - start
+                    histogram.count += 1
+                    histogram.total += elapsed
+                    buckets[bisect_left(bounds, elapsed)] += 1
+            # Measured before the call, which may change the genome.
+            bucket = size_bucket(genome.size()[1])
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                record(elapsed)
+                record_sample(elapsed, bucket)
+        return sampled
+
+    def reset(self) -> None:
+        """
+        Zero all counters, also while enabled.
+        """
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+    def stats(self) -> dict[str, dict]:
+        """
+        Return the counters of every operation that was called, see `Histogram.to_dict`.
+        """
+        return {name: histogram.to_dict() for name, histogram in self.histograms.items() if histogram.count}
+
+    def to_json(self) -> str:
+        return json.dumps({"sample_every": self.sample_every, "operations": self.stats()}, indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        Return the counters in the Prometheus text exposition format: a histogram of the call durations
+        labelled by operation, and with sampling, the sampled calls and seconds labelled by operation and
+        by the range of enabled connections.
+        """
+        prefix = self.PREFIX
+        called = [(name, histogram) for name, histogram in self.histograms.items() if histogram.count]
+        lines = [f"# HELP {prefix}_seconds Duration of the instrumented genome operations.",
+                 f"# TYPE {prefix}_seconds histogram"]
+        for name, histogram in called:
+            labels = [f"{bound:g}" for bound in Histogram.BOUNDS] + ["+Inf"]
+            for label, count in zip(labels, histogram.cumulative()):
+                lines.append(f'{prefix}_seconds_bucket{{operation="{name}",le="{label}"}} {count}')
+            lines.append(f'{prefix}_seconds_sum{{operation="{name}"}} {histogram.total!r}')
+            lines.append(f'{prefix}_seconds_count{{operation="{name}"}} {histogram.count}')
+        if self.sample_every is not None:
+            lines += [f"# HELP {prefix}_sampled_calls_total Sampled calls by enabled connections of the genome.",
+                      f"# TYPE {prefix}_sampled_calls_total counter"]
+            lines += [f'{prefix}_sampled_calls_total{{operation="{name}",connections="{size_bucket_label(bucket)}"}} {count}'
+                      for name, histogram in called for bucket, (count, _) in sorted(histogram.sampled.items())]
+            lines += [f"# HELP {prefix}_sampled_seconds_total Sampled seconds by enabled connections of the genome.",
+                      f"# TYPE {prefix}_sampled_seconds_total counter"]
+            lines += [f'{prefix}_sampled_seconds_total{{operation="{name}",connections="{size_bucket_label(bucket)}"}} {seconds!r}'
+                      for name, histogram in called for bucket, (_, seconds) in sorted(histogram.sampled.items())]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str | os.PathLike, format: str = "json") -> None:
+        """
+        Write the counters to a file, replacing it once complete so that a scraper never reads a partial dump.
+
+        Parameters:
+        - path (str | os.PathLike): The file to write.
+        - format (str): "json" for `to_json`, or "prometheus" for `to_prometheus`.
+
+        Raises:
+        - ValueError: If the format is unknown.
+        """
+        if format == "json":
+            text = self.to_json()
+        elif format == "prometheus":
+            text = self.to_prometheus()
+        else:
+            raise ValueError(f"Unknown format {format!r}, expected 'json' or 'prometheus'.")
+        temporary = f"{os.fspath(path)}.tmp"
+        with open(temporary, "w") as f:
+            f.write(text)
+        os.replace(temporary, path)
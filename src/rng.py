@@ -0,0 +1,44 @@
+from __future__ import annotations
+from random import Random
+import numpy as np
+
+
+class RandomStream(Random):
+    """
+    A seedable stream of random numbers, passed explicitly wherever genes and genomes draw randomness.
+
+    It is a `random.Random`, so it stands in for the `random` module, which every `rng` argument defaults
+    to. `numpy` is a NumPy `Generator` on a separate substream for bulk draws. Both are derived from one
+    `np.random.SeedSequence`, and `spawn` derives independent child streams from it. Giving every worker or
+    shard its own child stream makes a parallel run draw exactly the same numbers as a serial run over the
+    same shards, whatever order the shards are processed in.
+    """
+
+    def __init__(self, seed: int | np.random.SeedSequence = None) -> None:
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        # Children 0 and 1 seed the two generators, `spawn` hands out the following ones.
+        python, numpy = self.seed_sequence.spawn(2)
+        super().__init__(int.from_bytes(python.generate_state(8, np.uint32).tobytes(), "little"))
+        self.numpy = np.random.Generator(np.random.PCG64(numpy))
+
+    def spawn(self, n: int) -> list[RandomStream]:
+        """
+        Return n new streams, independent of this stream and of each other.
+
+        The streams only depend on the seed and on how many streams were spawned before, not on how many
+        numbers were drawn.
+        """
+        return [RandomStream(child) for child in self.seed_sequence.spawn(n)]
+
+    def __reduce__(self):
+        # `Random` pickles by state only, which would lose the seed sequence and the NumPy generator.
+        return _restore, (self.seed_sequence, self.getstate(), self.numpy.bit_generator.state)
+
+
+def _restore(seed_sequence: np.random.SeedSequence, state: tuple, numpy_state: dict) -> RandomStream:
+    rng = RandomStream.__new__(RandomStream)
+    rng.seed_sequence = seed_sequence
+    rng.setstate(state)
+    rng.numpy = np.random.Generator(np.random.PCG64())
+    rng.numpy.bit_generator.state = numpy_state
+    return rng
@@ -0,0 +1,145 @@
+from __future__ import annotations
+from collections import deque
+from typing import TYPE_CHECKING
+import asyncio
+import numpy as np
+
+if TYPE_CHECKING:
+    from .checkpoint import Checkpointer
+    from .world import World
+
+
+class RealTimeRunner:
+    """
+    Runs a world at a fixed tick rate on an asyncio event loop, next to other coroutines such as viewers.
+
+    Every tick first runs the phases of `World.phases`, the critical work, and yields to the event loop
+    between them so that other coroutines stay responsive. The remaining time of the tick's budget, one
+    period of `tick_rate`, goes to the deferrable work:
+
+    - speciation: newborns are queued by the population (see `RealTimePopulation.defer_speciation`) and
+      assigned to their species in slices of `SPECIATION_SLICE` genomes while there is time left,
+    - checkpointing: every `checkpoint_every` ticks, the population is handed to a `Checkpointer`, whose
+      capture is the only part that blocks the tick.
+
+    A tick that runs long defers this work to the next ticks, but for at most `MAX_DEFERRAL` ticks in a
+    row. The overdue work then runs anyway, past the deadline: the pending checkpoint is taken, and all
+    queued genomes are assigned at once rather than one slice, so that the queue cannot grow without bound
+    even if no tick has time left. A tick that ends after the start of the next one is an overrun, and the
+    schedule restarts from the end of that tick instead of running late ticks back to back.
+
+    The time the work of every tick took, from its start to the end of its deferrable work, is kept for
+    the last `WINDOW` ticks, see `percentiles`.
+    """
+
+    TICK_RATE = 30.0 # Ticks per second.
+    SPECIATION_SLICE = 4 # Genomes assigned to a species per slice, the deadline is checked between slices.
+    MAX_DEFERRAL = 30 # Ticks a piece of deferrable work may be skipped in a row.
+    WINDOW = 1000 # Ticks the tick times are kept for.
+
+    def __init__(self, world: World, tick_rate: float = None, checkpointer: Checkpointer = None,
+                 checkpoint_every: int = None) -> None:
+        self.world = world
+        self.population = world.population
+        self.tick_rate = self.TICK_RATE if tick_rate is None else tick_rate
+        if self.tick_rate <= 0:
+            raise ValueError(f"{self.tick_rate} must be positive.")
+        self.period = 1.0 / self.tick_rate
+        self.checkpointer = checkpointer
+        self.checkpoint_every = checkpoint_every
+        if checkpointer is not None and (checkpoint_every is None or checkpoint_every < 1):
+            raise ValueError(f"checkpoint_every must be at least 1, got {checkpoint_every}.")
+
+        self.tick_times: deque[float] = deque(maxlen=self.WINDOW)
+        self.ticks = 0
+        self.overruns = 0
+        self.deferrals = {"speciation": 0, "checkpoint": 0}
+        self._deferred = {"speciation": 0, "checkpoint": 0}
+        self._checkpoint_due = False
+        self._running = False
+
+    async def run(self, ticks: int = None) -> None:
+        """
+        Run the world until `stop` is called, or for the given number of ticks. Queued genomes are assigned
+        to their species before returning.
+        """
+        loop = asyncio.get_running_loop()
+        deferred = self.population.defer_speciation
+        self.population.defer_speciation = self.population.species is not None
+        self._running = True
+        try:
+            next_tick = loop.time()
+            end = None if ticks is None else self.ticks + ticks
+            while self._running and (end is None or self.ticks < end):
+                start = loop.time()
+                deadline = start + self.period
+                for _ in self.world.phases():
+                    await asyncio.sleep(0)
+                self.ticks += 1
+                self._deferrable(loop, deadline)
+                now = loop.time()
+                self.tick_times.append(now - start)
+
+                next_tick += self.period
+                if now > next_tick:
+                    self.overruns += 1
+                    next_tick = now
+                await asyncio.sleep(next_tick - now)
+        finally:
+            self._running = False
+            if self.population.species is not None:
+                self.population.assign_species()
+            self.population.defer_speciation = deferred
+
+    def stop(self) -> None:
+        """
+        Stop `run` after the current tick.
+        """
+        self._running = False
+
+    def _deferrable(self, loop: asyncio.AbstractEventLoop, deadline: float) -> None:
+        """
+        Run the deferrable work of a tick until its deadline.
+        """
+        if self.checkpointer is not None and self.ticks % self.checkpoint_every == 0:
+            self._checkpoint_due = True
+        if self._checkpoint_due and self._allowed("checkpoint", loop.time(), deadline):
+            self.checkpointer.checkpoint(self.population)
+            self._checkpoint_due = False
+
+        population = self.population
+        while population.unassigned:
+            now = loop.time()
+            if not self._allowed("speciation", now, deadline):
+                break
+            # Overdue work drains the queue: a slice every `MAX_DEFERRAL` ticks falls behind the births.
+            population.assign_species(self.SPECIATION_SLICE if now < deadline else None)
+
+    def _allowed(self, work: str, now: float, deadline: float) -> bool:
+        """
+        Decide whether a slice of the given work runs now, counting it as deferred if it does not.
+        """
+        if now < deadline or self._deferred[work] >= self.MAX_DEFERRAL:
+            self._deferred[work] = 0
+            return True
+        self._deferred[work] += 1
+        self.deferrals[work] += 1
+        return False
+
+    def percentiles(self, q: tuple[float, ...] = (50, 90, 99)) -> dict[float, float]:
+        """
+        Return the given percentiles of the tick times of the last `WINDOW` ticks, in seconds.
+        """
+        if not self.tick_times:
+            return {p: 0.0 for p in q}
+        return dict(zip(q, np.percentile(np.fromiter(self.tick_times, dtype=np.float64), q).tolist()))
+
+    def stats(self) -> dict[str, float]:
+        """
+        Return the tick counters, the deferral counters, the queued genomes and the tick time percentiles.
+        """
+        stats = {"ticks": self.ticks, "overruns": self.overruns, "unassigned": len(self.population.unassigned),
+                 "speciation_deferrals": self.deferrals["speciation"], "checkpoint_deferrals": self.deferrals["checkpoint"]}
+        for p, value in self.percentiles().items():
+            stats[f"tick_p{p:g}"] = value
+        return stats
@@ -0,0 +1,240 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Iterator
+import json
+import os
+import struct
+import numpy as np
+
+from .gene_arrays import GeneArrays, GenomeStore, connection_innovation, connection_nodes
+from .functions.activations import Activations
+from .functions.aggregations import Aggregations
+
+if TYPE_CHECKING:
+    from .genome import Genome
+
+# Fixed-width little-endian records, packed without padding. Node keys must fit into 32 bits (see
+# `connection_innovation`), activations and aggregations are stored by their registry id.
+NODE_RECORD = np.dtype([("key", "<i4"), ("bias", "<f8"), ("response", "<f8"), ("activation", "u1"), ("aggregation", "u1")])
+CONNECTION_RECORD = np.dtype([("from", "<i4"), ("to", "<i4"), ("weight", "<f8"), ("enabled", "?")])
+
+_INT32 = np.iinfo(np.int32)
+
+FORMAT_VERSION = 1
+
+# Magic, format version, number of nodes, number of connections.
+_GENES_HEADER = struct.Struct("<4sHII")
+_GENES_MAGIC = b"BRTG"
+# Magic, format version, length of the function table, number of genomes, nodes and connections.
+_SNAPSHOT_HEADER = struct.Struct("<8sHIqqq")
+_SNAPSHOT_MAGIC = b"BRTSNAP\x00"
+
+
+def _node_records(arrays: GeneArrays) -> np.ndarray:
+    if len(arrays.node_keys) and not _INT32.min <= arrays.node_keys.min() <= arrays.node_keys.max() <= _INT32.max:
+        raise ValueError("Node keys must fit into 32 bits.")
+    records = np.empty(len(arrays.node_keys), dtype=NODE_RECORD)
+    records["key"] = arrays.node_keys
+    records["bias"] = arrays.node_bias
+    records["response"] = arrays.node_response
+    records["activation"] = arrays.node_activation
+    records["aggregation"] = arrays.node_aggregation
+    return records
+
+
+def _connection_records(arrays: GeneArrays) -> np.ndarray:
+    records = np.empty(len(arrays.connection_keys), dtype=CONNECTION_RECORD)
+    records["from"], records["to"] = connection_nodes(arrays.connection_keys)
+    records["weight"] = arrays.connection_weight
+    records["enabled"] = arrays.connection_enabled
+    return records
+
+
+def _gene_arrays(nodes: np.ndarray, connections: np.ndarray) -> GeneArrays:
+    """
+    Convert node and connection records back into sorted gene arrays, copying them.
+    """
+    connection_keys = connection_innovation((connections["from"].astype(np.int64), connections["to"].astype(np.int64)))
+    return GeneArrays(nodes["key"].astype(np.int64), nodes["bias"].astype(np.float64), nodes["response"].astype(np.float64),
+                      nodes["activation"].astype(np.uint8), nodes["aggregation"].astype(np.uint8),
+                      connection_keys, connections["weight"].astype(np.float64), connections["enabled"].astype(bool))
+
+
+def pack_genes(arrays: GeneArrays) -> bytes:
+    """
+    Serialize the genes of one genome into the compact binary format.
+
+    The format is a short header followed by one `NODE_RECORD` per node gene and one `CONNECTION_RECORD`
+    per connection gene, in innovation order.
+
+    Parameters:
+    - arrays (GeneArrays): The genes to serialize.
+
+    Returns:
+    - bytes: The serialized genes.
+    """
+    nodes, connections = _node_records(arrays), _connection_records(arrays)
+    header = _GENES_HEADER.pack(_GENES_MAGIC, FORMAT_VERSION, len(nodes), len(connections))
+    return header + nodes.tobytes() + connections.tobytes()
+
+
+def unpack_genes(data: bytes) -> GeneArrays:
+    """
+    Read genes written by `pack_genes`.
+
+    Raises:
+    - ValueError: If the data is not in the expected format.
+    """
+    if len(data) < _GENES_HEADER.size:
+        raise ValueError("Data is too short to hold serialized genes.")
+    magic, version, num_nodes, num_connections = _GENES_HEADER.unpack_from(data)
+    if magic != _GENES_MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported gene format {magic!r} version {version}.")
+    if len(data) != _GENES_HEADER.size + num_nodes * NODE_RECORD.itemsize + num_connections * CONNECTION_RECORD.itemsize:
+        raise ValueError("Data length does not match the number of genes in its header.")
+    nodes = np.frombuffer(data, dtype=NODE_RECORD, count=num_nodes, offset=_GENES_HEADER.size)
+    connections = np.frombuffer(data, dtype=CONNECTION_RECORD, count=num_connections,
+                                offset=_GENES_HEADER.size + nodes.nbytes)
+    return _gene_arrays(nodes, connections)
+
+
+def _function_table() -> dict[str, list[str]]:
+    return {"activations": [f.name for f in Activations.registry],
+            "aggregations": [f.name for f in Aggregations.registry]}
+
+
+def _padding(size: int) -> int:
+    """
+    The number of bytes that align a section of `size` bytes to 8 bytes.
+    """
+    return -size % 8
+
+
+def write_snapshot(path: str | os.PathLike, store: GenomeStore) -> int:
+    """
+    Write a population snapshot that `Snapshot` can map lazily.
+
+    The file holds a header, the names of the registered functions, the genome keys, the node and
+    connection offsets of every genome, then all node records and all connection records, each section
+    aligned to 8 bytes. It is written to a temporary file that replaces `path` once complete, so a crash
+    never leaves a truncated snapshot behind.
+
+    Parameters:
+    - path (str | os.PathLike): The file to write.
+    - store (GenomeStore): The genomes to write, e.g. `GenomeStore.pack(genomes)`.
+
+    Returns:
+    - int: The size of the snapshot in bytes.
+    """
+    table = json.dumps(_function_table()).encode()
+    sections = [
+        _SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, FORMAT_VERSION, len(table), len(store),
+                              int(store.node_offsets[-1]), int(store.connection_offsets[-1])),
+        table,
+        store.keys.astype("<i8"),
+        store.node_offsets.astype("<i8"),
+        store.connection_offsets.astype("<i8"),
+        _node_records(store.genes),
+        _connection_records(store.genes),
+    ]
+    temporary = f"{os.fspath(path)}.tmp"
+    size = 0
+    with open(temporary, "wb") as f:
+        for section in sections:
+            data = memoryview(section).cast("B")
+            f.write(data)
+            f.write(bytes(_padding(len(data))))
+            size += len(data) + _padding(len(data))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    return size
+
+
+class Snapshot:
+    """
+    A population snapshot written by `write_snapshot`, memory-mapped instead of read.
+
+    Opening a snapshot only reads its header. The genes of a genome are read from the mapping when
+    `gene_arrays(i)` or `genome(i)` asks for them, so restarting or analyzing a run touches only the
+    pages of the genomes it looks at. Close the snapshot, or use it as a context manager, to release the
+    mapping. Materialized genomes and gene arrays are copies and stay valid after closing.
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+        if len(data) < _SNAPSHOT_HEADER.size:
+            raise ValueError(f"{path} is too short to be a snapshot.")
+        magic, version, table_size, num_genomes, num_nodes, num_connections = _SNAPSHOT_HEADER.unpack(data[:_SNAPSHOT_HEADER.size])
+        if magic != _SNAPSHOT_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format {magic!r} version {version}.")
+
+        offset = _SNAPSHOT_HEADER.size + _padding(_SNAPSHOT_HEADER.size)
+        table = json.loads(bytes(data[offset:offset + table_size]))
+        # Function ids are stable across runs, as long as the stored ones still name the same functions.
+        for kind, names in _function_table().items():
+            if table[kind] != names[:len(table[kind])]:
+                raise ValueError(f"The {kind} of {path} do not match the registered ones.")
+        offset += table_size + _padding(table_size)
+        sizes = [8 * num_genomes, 8 * (num_genomes + 1), 8 * (num_genomes + 1),
+                 NODE_RECORD.itemsize * num_nodes, CONNECTION_RECORD.itemsize * num_connections]
+        if offset + sum(size + _padding(size) for size in sizes) != len(data):
+            raise ValueError(f"The size of {path} does not match its header.")
+
+        def section(dtype: np.dtype, count: int) -> np.ndarray:
+            nonlocal offset
+            array = data[offset:offset + count * np.dtype(dtype).itemsize].view(dtype)
+            offset += array.nbytes + _padding(array.nbytes)
+            return array
+
+        self.keys = section(np.dtype("<i8"), num_genomes)
+        self.node_offsets = section(np.dtype("<i8"), num_genomes + 1)
+        self.connection_offsets = section(np.dtype("<i8"), num_genomes + 1)
+        self.nodes = section(NODE_RECORD, num_nodes)
+        self.connections = section(CONNECTION_RECORD, num_connections)
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def gene_arrays(self, i: int) -> GeneArrays:
+        """
+        Read the genes of the i-th genome.
+        """
+        nodes = slice(self.node_offsets[i], self.node_offsets[i + 1])
+        connections = slice(self.connection_offsets[i], self.connection_offsets[i + 1])
+        return _gene_arrays(self.nodes[nodes], self.connections[connections])
+
+    def genome(self, i: int) -> Genome:
+        """
+        Materialize the i-th genome, see `Genome.from_gene_arrays`.
+        """
+        from .genome import Genome
+        return Genome.from_gene_arrays(self.gene_arrays(i))
+
+    def __getitem__(self, i: int) -> Genome:
+        if not -len(self) <= i < len(self):
+            raise IndexError(f"Snapshot index {i} out of range.")
+        return self.genome(i % len(self))
+
+    def __iter__(self) -> Iterator[Genome]:
+        return (self.genome(i) for i in range(len(self)))
+
+    def store(self) -> GenomeStore:
+        """
+        Read the whole population into a `GenomeStore`.
+        """
+        return GenomeStore(self.keys.astype(np.int64), self.node_offsets.astype(np.int64),
+                           self.connection_offsets.astype(np.int64), _gene_arrays(self.nodes, self.connections))
+
+    def close(self) -> None:
+        """
+        Release the mapping. The file is unmapped once no array read from it without copying is left.
+        """
+        self.keys = self.node_offsets = self.connection_offsets = self.nodes = self.connections = None
+        self._data = None
+
+    def __enter__(self) -> Snapshot:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,149 @@
+from __future__ import annotations
+from itertools import count
+import numpy as np
+
+from .genome import Genome
+
+
+class Species:
+    """
+    A group of compatible genomes, represented by one of its members.
+    """
+
+    def __init__(self, key: int, representative: Genome) -> None:
+        self.key = key
+        self.representative = representative
+        self.members: dict[int, Genome] = {representative.key: representative}
+        self.index = -1 # Position of the species in the index of its `SpeciesSet`.
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+
+class SpeciesSet:
+    """
+    Incremental speciation: genomes are assigned to a species one at a time as they are born.
+
+    A newborn joins the first species whose representative is closer than `Genome.compatibility_threshold`,
+    and founds a new species otherwise. Instead of computing the distance to every representative,
+    the set keeps the gene counts of all representatives in an index. The distance is at least
+    `Genome.compatibility_disjoint_coefficient * (|n1 - n2| / max(n1, n2) + |c1 - c2| / max(c1, c2))` for
+    node counts n and connection counts c, as the surplus genes of the larger genome are disjoint. Species whose bound
+    already exceeds the threshold are rejected without a full distance evaluation, and the remaining
+    ones are tried in order of increasing bound.
+
+    Representatives are refreshed lazily: when one is removed, the oldest living member of its
+    species takes over on the next assignment, and empty species are dropped then.
+    Members must not be mutated while they are speciated, or the indexed gene counts go stale.
+    """
+
+    def __init__(self) -> None:
+        self.species: dict[int, Species] = {}
+        self.genome_to_species: dict[int, Species] = {}
+        self.stale: list[Species] = []
+        self._keys = count()
+        # Dense list of the indexed species, and the node and connection counts of their representatives.
+        self._indexed: list[Species] = []
+        self._counts = np.zeros((0, 2))
+        self.assignments = 0
+        self.evaluations = 0
+
+    def __len__(self) -> int:
+        return len(self.species)
+
+    def assign(self, genome: Genome) -> tuple[Species, int]:
+        """
+        Assign a genome to a species, founding a new one if no species is compatible.
+
+        Parameters:
+        - genome (Genome): The genome to assign, which must not be assigned already.
+
+        Returns:
+        - tuple[Species, int]: The species of the genome, and the number of full distance evaluations it took.
+        """
+        if genome.key in self.genome_to_species:
+            raise ValueError(f"Genome {genome.key} is already assigned to a species.")
+        self._refresh()
+
+        threshold = Genome.compatibility_threshold
+        counts = self._gene_counts(genome)
+        bounds = self.lower_bounds(counts)
+        candidates = np.flatnonzero(bounds < threshold)
+        evaluations = 0
+        species = None
+        for i in candidates[np.argsort(bounds[candidates], kind="stable")].tolist():
+            evaluations += 1
+            if genome.distance(self._indexed[i].representative) < threshold:
+                species = self._indexed[i]
+                break
+
+        if species is None:
+            species = Species(next(self._keys), genome)
+            self.species[species.key] = species
+            self._index(species, counts)
+        else:
+            species.members[genome.key] = genome
+        self.genome_to_species[genome.key] = species
+        self.assignments += 1
+        self.evaluations += evaluations
+        return species, evaluations
+
+    def remove(self, genome: Genome) -> Species:
+        """
+        Remove a genome from its species and return the species.
+        """
+        species = self.genome_to_species.pop(genome.key, None)
+        if species is None:
+            raise ValueError(f"Genome {genome.key} is not assigned to a species.")
+        del species.members[genome.key]
+        if species.representative is genome:
+            self.stale.append(species)
+        return species
+
+    def lower_bounds(self, counts: tuple[int, int]) -> np.ndarray:
+        """
+        Return a lower bound on the distance between a genome with the given (node, connection)
+        counts and the representative of every indexed species.
+        """
+        indexed = self._counts[:len(self._indexed)]
+        maxima = np.maximum(indexed, counts)
+        surplus = np.divide(np.abs(indexed - counts), maxima, out=np.zeros_like(indexed), where=maxima > 0)
+        return Genome.compatibility_disjoint_coefficient * surplus.sum(axis=1)
+
+    @property
+    def mean_evaluations(self) -> float:
+        return self.evaluations / self.assignments if self.assignments else 0.0
+
+    def _refresh(self) -> None:
+        """
+        Replace the removed representatives, and drop the species without members.
+        """
+        for species in self.stale:
+            if species.members:
+                species.representative = next(iter(species.members.values()))
+                self._counts[species.index] = self._gene_counts(species.representative)
+            else:
+                self._unindex(species)
+                del self.species[species.key]
+        self.stale.clear()
+
+    @staticmethod
+    def _gene_counts(genome: Genome) -> tuple[int, int]:
+        arrays = genome.gene_arrays()
+        return len(arrays.node_keys), len(arrays.connection_keys)
+
+    def _index(self, species: Species, counts: tuple[int, int]) -> None:
+        if len(self._indexed) == len(self._counts):
+            self._counts = np.concatenate([self._counts, np.zeros((max(16, len(self._counts)), 2))])
+        species.index = len(self._indexed)
+        self._indexed.append(species)
+        self._counts[species.index] = counts
+
+    def _unindex(self, species: Species) -> None:
+        # Move the last indexed species into the hole.
+        last = self._indexed.pop()
+        if last is not species:
+            self._indexed[species.index] = last
+            self._counts[species.index] = self._counts[last.index]
+            last.index = species.index
+        species.index = -1
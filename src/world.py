@@ -0,0 +1,232 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Generator
+import numpy as np
+
+from .environment import SpatialGrid
+from .nn.batch import RecurrentBatchNetwork
+from .nn.network import RecurrentNetwork
+from .rng import RandomStream
+
+if TYPE_CHECKING:
+    from .population import RealTimePopulation
+
+
+class World:
+    """
+    A reference world for the energy-driven loop: agents move around a rectangle and collect food.
+
+    The position and velocity of every agent live in (capacity, 2) arrays indexed by population slot,
+    next to `population.energy`, and the food in arrays indexed by food id. A `step` is a fixed sequence
+    of array operations over all agents at once:
+
+    1. sense: the `FOOD_NEIGHBORS` nearest food sources and `AGENT_NEIGHBORS` nearest agents, three inputs each
+       (see `SpatialGrid.sense`), followed by the agent's energy relative to the reproduction threshold and its
+       velocity relative to `MAX_SPEED`, `NUM_INPUTS` inputs in total,
+    2. activate the networks of all agents as one batch,
+    3. apply the `NUM_OUTPUTS` outputs as an acceleration and move,
+    4. drain `BASE_DRAIN` plus `MOVE_COST` times the squared speed and collect the food within `EAT_RADIUS`,
+       eaten food regrowing at a random place,
+    5. let the population reproduce and remove the dead agents, offspring starting next to their parent.
+
+    The networks are stepped as one `RecurrentBatchNetwork` whose rows are the slots of the population,
+    which accepts every genome and carries the node values of an agent over from one tick to the next.
+    Births and deaths only compile the networks of the offspring and replace their rows (see
+    `RecurrentBatchNetwork.update`), so no step makes a Python call per living agent. The genomes must
+    have `NUM_INPUTS` inputs and `NUM_OUTPUTS` outputs.
+
+    The agents living when the world is created are placed at random. Afterwards agents are only added and
+    removed by `step`, not through the population directly, which would leave the spatial index behind.
+    """
+
+    FOOD_NEIGHBORS = 2 # Food sources sensed by every agent.
+    AGENT_NEIGHBORS = 2 # Other agents sensed by every agent.
+    NUM_INPUTS = 3 * (FOOD_NEIGHBORS + AGENT_NEIGHBORS) + 3
+    NUM_OUTPUTS = 2
+
+    SENSE_RADIUS = 10.0 # Distance up to which food and agents are sensed.
+    EAT_RADIUS = 1.0 # Distance up to which an agent eats a food source.
+    FOOD_ENERGY = 2.0 # Energy of a food source.
+    MAX_ACCELERATION = 0.5 # Acceleration of an output of 1.
+    MAX_SPEED = 1.0 # Distance an agent moves at most per tick.
+    DRAG = 0.9 # Share of its velocity an agent keeps from one tick to the next.
+    BASE_DRAIN = 0.01 # Energy every agent loses per tick.
+    MOVE_COST = 0.02 # Energy lost per tick at a speed of 1.
+    OFFSPRING_SPREAD = 1.0 # Standard deviation of the distance between an offspring and its parent.
+
+    def __init__(self, population: RealTimePopulation, width: float, height: float, num_food: int,
+                 rng: RandomStream = None) -> None:
+        self.population = population
+        self.width = width
+        self.height = height
+        self.rng = RandomStream() if rng is None else rng
+        self.size = np.array([width, height])
+
+        self.agents = SpatialGrid(width, height, self.SENSE_RADIUS)
+        self.positions = np.zeros((0, 2))
+        self.velocities = np.zeros((0, 2))
+        self._grow()
+        slots = np.array(population.alive, dtype=np.intp)
+        self.positions[slots] = self.rng.numpy.random((len(slots), 2)) * self.size
+        self.agents.insert(slots, self.positions[slots])
+
+        self.food = SpatialGrid(width, height, self.SENSE_RADIUS)
+        self.food_positions = self.rng.numpy.random((num_food, 2)) * self.size
+        self.food.insert(np.arange(num_food), self.food_positions)
+
+        self.batch: RecurrentBatchNetwork = None
+        # The slots whose row of the batch is out of date.
+        self.changed: set[int] = set()
+        self.rows = np.zeros(0, dtype=np.intp)
+        self.inputs = np.zeros((0, self.NUM_INPUTS))
+        self.batch_inputs = np.zeros((0, self.NUM_INPUTS))
+        self.ticks = 0
+        self.food_eaten = 0
+
+    def _grow(self) -> None:
+        """
+        Extend the per-slot arrays to the capacity of the population.
+        """
+        old, new = len(self.positions), len(self.population.energy)
+        if new > old:
+            self.positions = np.concatenate([self.positions, np.zeros((new - old, 2))])
+            self.velocities = np.concatenate([self.velocities, np.zeros((new - old, 2))])
+
+    def _sync_batch(self) -> None:
+        """
+        Compile the networks of the agents born since the last tick into their rows of the batch, and
+        empty the rows of the agents that died. The first call compiles every living agent.
+        """
+        population = self.population
+        if self.batch is None:
+            networks = [None if genome is None else RecurrentNetwork.create(genome) for genome in population.genomes]
+            self.batch = RecurrentBatchNetwork(networks)
+            if self.batch.num_inputs != self.NUM_INPUTS or self.batch.num_outputs != self.NUM_OUTPUTS:
+                raise ValueError(f"The genomes must have {self.NUM_INPUTS} inputs and {self.NUM_OUTPUTS} outputs, "
+                                 f"got {self.batch.num_inputs} and {self.batch.num_outputs}.")
+        elif self.changed:
+            slots = sorted(self.changed)
+            genomes = [population.genomes[slot] for slot in slots]
+            self.batch.update(slots, [None if genome is None else RecurrentNetwork.create(genome) for genome in genomes])
+        self.changed.clear()
+        self.rows = np.flatnonzero(population.alive_mask)
+        if len(self.batch_inputs) != self.batch.num_agents:
+            self.batch_inputs = np.zeros((self.batch.num_agents, self.NUM_INPUTS))
+        if len(self.inputs) != len(self.rows):
+            self.inputs = np.zeros((len(self.rows), self.NUM_INPUTS))
+
+    def sense(self) -> np.ndarray:
+        """
+        Write the inputs of every living agent, in the order of `rows`, into `inputs` and return it.
+        """
+        rows, inputs = self.rows, self.inputs
+        positions = self.positions[rows]
+        food_columns = 3 * self.FOOD_NEIGHBORS
+        agent_columns = food_columns + 3 * self.AGENT_NEIGHBORS
+        self.food.sense(positions, self.FOOD_NEIGHBORS, self.SENSE_RADIUS, inputs[:, :food_columns])
+        self.agents.sense(positions, self.AGENT_NEIGHBORS, self.SENSE_RADIUS, inputs[:, food_columns:agent_columns], exclude=rows)
+        inputs[:, agent_columns] = self.population.energy[rows] / self.population.REPRODUCTION_THRESHOLD
+        inputs[:, agent_columns + 1:] = self.velocities[rows] / self.MAX_SPEED
+        return inputs
+
+    def move(self, outputs: np.ndarray) -> np.ndarray:
+        """
+        Accelerate every living agent by its outputs and move it, stopping it at the border of the world.
+
+        Returns:
+        - np.ndarray: The speed of every living agent.
+        """
+        rows = self.rows
+        velocities = (self.velocities[rows] + np.clip(outputs, -1.0, 1.0) * self.MAX_ACCELERATION) * self.DRAG
+        speed = np.sqrt(np.einsum("ij,ij->i", velocities, velocities))
+        too_fast = speed > self.MAX_SPEED
+        velocities[too_fast] *= (self.MAX_SPEED / speed[too_fast])[:, None]
+        speed[too_fast] = self.MAX_SPEED
+
+        positions = self.positions[rows] + velocities
+        outside = (positions < 0.0) | (positions > self.size)
+        np.clip(positions, 0.0, self.size, out=positions)
+        velocities[outside] = 0.0
+        self.positions[rows] = positions
+        self.velocities[rows] = velocities
+        self.agents.move(rows, positions)
+        return speed
+
+    def feed(self, speed: np.ndarray) -> None:
+        """
+        Drain the energy of every living agent and let it eat the nearest food within `EAT_RADIUS`. Food
+        wanted by several agents goes to the first of them, and eaten food regrows at a random place.
+        """
+        rows = self.rows
+        energy = self.population.energy
+        energy[rows] -= self.BASE_DRAIN + self.MOVE_COST * speed ** 2
+
+        nearest, _ = self.food.nearest(self.positions[rows], 1, self.EAT_RADIUS)
+        eating = np.flatnonzero(nearest[:, 0] >= 0)
+        eaten, first = np.unique(nearest[eating, 0], return_index=True)
+        energy[rows[eating[first]]] += self.FOOD_ENERGY
+        self.food_positions[eaten] = self.rng.numpy.random((len(eaten), 2)) * self.size
+        self.food.move(eaten, self.food_positions[eaten])
+        self.food_eaten += len(eaten)
+
+    def reproduce(self) -> tuple[list[int], list[int]]:
+        """
+        Let the population reproduce and die, and place the offspring next to their parents.
+
+        Returns:
+        - tuple[list[int], list[int]]: The slots of the offspring, and the slots freed by dead agents.
+        """
+        population = self.population
+        parents = np.flatnonzero(population.alive_mask & (population.energy >= population.REPRODUCTION_THRESHOLD))
+        births, deaths = population.update()
+        if deaths:
+            self.agents.remove(deaths)
+        if births:
+            self._grow()
+            births_array = np.array(births, dtype=np.intp)
+            spread = self.rng.numpy.normal(0.0, self.OFFSPRING_SPREAD, (len(births), 2))
+            self.positions[births_array] = np.clip(self.positions[parents] + spread, 0.0, self.size)
+            self.velocities[births_array] = 0.0
+            self.agents.insert(births_array, self.positions[births_array])
+        self.changed.update(births)
+        self.changed.update(deaths)
+        return births, deaths
+
+    def phases(self) -> Generator[str, None, tuple[list[int], list[int]]]:
+        """
+        Advance the world by one tick, yielding the name of every phase, "sense", "activate", "move" and
+        "reproduce", once it is done, so that a scheduler can interleave other work between the phases.
+
+        Raises:
+        - ValueError: If the genomes do not have `NUM_INPUTS` inputs and `NUM_OUTPUTS` outputs.
+
+        Returns:
+        - tuple[list[int], list[int]]: The slots of the agents born and of the agents that died in this tick.
+        """
+        if not len(self.population):
+            return [], []
+        self._sync_batch()
+        inputs = self.batch_inputs
+        inputs[self.rows] = self.sense()
+        yield "sense"
+        outputs = self.batch.step_many(inputs)[self.rows]
+        yield "activate"
+        self.feed(self.move(outputs))
+        self.ticks += 1
+        yield "move"
+        births, deaths = self.reproduce()
+        yield "reproduce"
+        return births, deaths
+
+    def step(self) -> tuple[list[int], list[int]]:
+        """
+        Advance the world by one tick, see `phases`.
+
+        Returns:
+        - tuple[list[int], list[int]]: The slots of the agents born and of the agents that died in this tick.
+        """
+        phases = self.phases()
+        while True:
+            try:
+                next(phases)
+            except StopIteration as stop:
+                return stop.value
@@ -1,4 +1,8 @@
 from src.functions.aggregations import Aggregations
+import math
+import numpy as np
+import random
+import statistics
 import unittest
 
 class TestGetRandomActivation(unittest.TestCase):
@@ -6,3 +10,36 @@ class TestGetRandomActivation(unittest.TestCase):
         f = Aggregations.get_random()
         self.assertIsNotNone(f)
         self.assertTrue(callable(f))
+
+class TestAggregationKernels(unittest.TestCase):
+    def test_scalar_kernels(self):
+        rng = random.Random(0)
+        for n in range(1, 12):
+            x = [rng.gauss(0, 1) for _ in range(n)]
+            self.assertAlmostEqual(Aggregations.MEDIAN(x), statistics.median(x))
+            self.assertAlmostEqual(Aggregations.MEAN(x), statistics.fmean(x))
+            self.assertAlmostEqual(Aggregations.PRODUCT(x), math.prod(x))
+        self.assertEqual(Aggregations.MEAN(iter([1.0, 2.0])), 1.5)
+        self.assertEqual(Aggregations.PRODUCT([]), 1.0)
+
+    def test_scalar_kernels_accept_iterators(self):
+        """
+        The networks pass the weighted inputs as an iterator, which gives the same result as a list
+        """
+        rng = random.Random(2)
+        for n in range(1, 6):
+            x = [rng.gauss(0, 1) for _ in range(n)]
+            for f in Aggregations.registry:
+                self.assertEqual(f(iter(x)), f(x), f.name)
+
+    def test_vectorized_kernels_match_scalar(self):
+        """
+        Every vectorized aggregation reduces the unmasked entries of a row like the scalar one
+        """
+        generator = np.random.default_rng(1)
+        x = generator.standard_normal((50, 9))
+        counts = generator.integers(1, 10, size=50)
+        mask = np.arange(9) < counts[:, None]
+        for f in Aggregations.registry:
+            expected = [f(row[:count].tolist()) for row, count in zip(x, counts)]
+            np.testing.assert_allclose(f.vectorized(x, mask), expected, err_msg=f.name)
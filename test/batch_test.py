@@ -0,0 +1,102 @@
+from src.functions.activations import Activations
+from src.functions.aggregations import Aggregations
+from src.nn.network import FeedForwardNetwork, RecurrentNetwork
+from src.nn.batch import BatchNetwork, RecurrentBatchNetwork
+from util import configure, wired_genome
+import numpy as np
+import random
+import unittest
+
+class TestBatchNetwork(unittest.TestCase):
+    def setUp(self) -> None:
+        configure(self, num_inputs=3, num_outputs=2)
+        rng = random.Random(42)
+        self.genomes = [wired_genome(rng, rng.randint(0, 6)) for _ in range(50)]
+        self.inputs = np.random.default_rng(42).normal(size=(len(self.genomes), 3))
+
+    def test_matches_scalar_path(self):
+        """
+        Batched activation matches activating every genome on its own
+        """
+        batch = BatchNetwork.create(self.genomes)
+        outputs = batch.activate(self.inputs)
+        self.assertEqual(outputs.shape, (len(self.genomes), 2))
+        for i, genome in enumerate(self.genomes):
+            expected = FeedForwardNetwork.create(genome).activate(list(self.inputs[i]))
+            np.testing.assert_allclose(outputs[i], expected, rtol=1e-9, atol=1e-9)
+
+    def test_repeated_activation_is_stable(self):
+        batch = BatchNetwork.create(self.genomes)
+        np.testing.assert_array_equal(batch.activate(self.inputs), batch.activate(self.inputs))
+
+    def test_wrong_input_shape_raises(self):
+        batch = BatchNetwork.create(self.genomes)
+        self.assertRaises(RuntimeError, batch.activate, self.inputs[:, :2])
+
+    def test_unpacked_batch_matches(self):
+        """
+        A batch rebuilt from its packed arrays activates like the original
+        """
+        batch = BatchNetwork.create(self.genomes)
+        unpacked = BatchNetwork.unpack(batch.pack())
+        np.testing.assert_array_equal(unpacked.activate(self.inputs), batch.activate(self.inputs))
+
+    def test_recurrent_matches_scalar_path(self):
+        """
+        Stepping a recurrent batch matches stepping every genome on its own, tick after tick
+        """
+        rng = random.Random(7)
+        genomes = [wired_genome(rng, rng.randint(0, 4), recurrent=True) for _ in range(20)]
+        batch = RecurrentBatchNetwork.create(genomes)
+        networks = [RecurrentNetwork.create(genome) for genome in genomes]
+        inputs = np.random.default_rng(7).normal(size=(5, len(genomes), 3))
+        for tick in inputs:
+            outputs = batch.step_many(tick)
+            for i, net in enumerate(networks):
+                np.testing.assert_allclose(outputs[i], net.step(list(tick[i])), rtol=1e-9, atol=1e-9)
+
+    def test_recurrent_update_replaces_rows(self):
+        """
+        Replacing, emptying and appending rows of a recurrent batch matches a batch built from scratch
+        """
+        rng = random.Random(8)
+        genomes = [wired_genome(rng, rng.randint(0, 4), recurrent=True) for _ in range(10)]
+        batch = RecurrentBatchNetwork([RecurrentNetwork.create(genome) for genome in genomes])
+        batch.step_many(np.ones((10, 3)))
+        genomes[2] = wired_genome(rng, 6, recurrent=True)
+        genomes.append(wired_genome(rng, 2, recurrent=True))
+        batch.update([2, 5, 10], [RecurrentNetwork.create(genomes[2]), None, RecurrentNetwork.create(genomes[10])])
+        self.assertEqual(batch.num_agents, 11)
+
+        networks = [RecurrentNetwork.create(genome) for genome in genomes]
+        expected = RecurrentBatchNetwork([None if i == 5 else net for i, net in enumerate(networks)])
+        # The kept rows carry their state over, so step those networks once to catch up.
+        for i in set(range(10)) - {2, 5}:
+            networks[i].step([1.0, 1.0, 1.0])
+        inputs = np.random.default_rng(8).normal(size=(3, 11, 3))
+        for tick in inputs:
+            outputs = batch.step_many(tick)
+            expected_outputs = expected.step_many(tick)
+            for i, net in enumerate(networks):
+                if i != 5:
+                    np.testing.assert_allclose(outputs[i], net.step(list(tick[i])), rtol=1e-9, atol=1e-9)
+            np.testing.assert_allclose(outputs[[2, 10]], expected_outputs[[2, 10]], rtol=1e-9, atol=1e-9)
+
+    def test_vectorized_activations_match_scalar(self):
+        """
+        Every vectorized activation matches its scalar counterpart
+        """
+        z = np.linspace(-5, 5, 101)
+        for f in Activations.registry:
+            np.testing.assert_allclose(f.vectorized(z), [f(float(v)) for v in z], rtol=1e-9, atol=1e-12, err_msg=f.name)
+
+    def test_vectorized_aggregations_match_scalar(self):
+        """
+        Every vectorized aggregation matches its scalar counterpart on padded rows
+        """
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=(20, 6))
+        mask = np.arange(6) < rng.integers(1, 7, size=20)[:, None]
+        for f in Aggregations.registry:
+            expected = [f(list(row[m])) for row, m in zip(x, mask)]
+            np.testing.assert_allclose(f.vectorized(x, mask), expected, rtol=1e-9, err_msg=f.name)
@@ -0,0 +1,123 @@
+from src.checkpoint import Checkpointer, _indices, replay
+from src.gene import NodeGene
+from src.functions.activations import Activations
+from src.functions.aggregations import Aggregations
+from src.gene_arrays import GeneArrays
+from src.population import RealTimePopulation
+from util import wired_genome
+import numpy as np
+import os
+import random
+import tempfile
+import threading
+import unittest
+
+class TestCheckpointer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rng = random.Random(4)
+        self.population = RealTimePopulation([wired_genome(self.rng, 2) for _ in range(20)], energy=1.0)
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def step(self) -> None:
+        """
+        Kill, add and mutate a few agents and change the energy of all.
+        """
+        population = self.population
+        for slot in self.rng.sample(population.alive, 3):
+            population.remove(slot)
+        for _ in range(4):
+            population.add(wired_genome(self.rng, 2), self.rng.random())
+        for slot in self.rng.sample(population.alive, 2):
+            population.genomes[slot].mutate(self.rng)
+        population.energy[population.alive] += 0.5
+
+    def assert_restored(self) -> None:
+        keys, arrays, energy = replay(self.directory.name)
+        population = self.population
+        self.assertEqual(keys, [population.genomes[slot].key for slot in population.alive])
+        np.testing.assert_array_equal(energy, population.energy[population.alive])
+        for slot, genes in zip(population.alive, arrays):
+            expected = population.genomes[slot].gene_arrays()
+            for name in GeneArrays.FIELDS:
+                np.testing.assert_array_equal(getattr(genes, name), getattr(expected, name))
+
+    def test_deltas_hold_only_changes(self):
+        with Checkpointer(self.directory.name, full_every=5) as checkpointer:
+            checkpointer.checkpoint(self.population)
+            self.step()
+            checkpointer.checkpoint(self.population)
+            checkpointer.wait()
+        state = np.load(os.path.join(self.directory.name, "00000001.state.npz"))
+        # 4 births and 2 mutations, minus mutated agents that were born in the same step.
+        self.assertLessEqual(len(state["slots"]), 6)
+        self.assertGreaterEqual(len(state["slots"]), 4)
+        self.assertFalse(state["full"])
+        self.assert_restored()
+
+    def test_replay_applies_deltas_in_order(self):
+        with Checkpointer(self.directory.name, full_every=3) as checkpointer:
+            for _ in range(7):
+                checkpointer.checkpoint(self.population)
+                self.step()
+            checkpointer.checkpoint(self.population)
+        # Checkpoints before the latest full one (6) were deleted.
+        self.assertEqual(sorted(os.listdir(self.directory.name))[0], "00000006.genes.snapshot")
+        self.assert_restored()
+
+    def test_new_checkpointer_continues_numbering(self):
+        with Checkpointer(self.directory.name) as checkpointer:
+            checkpointer.checkpoint(self.population)
+        with Checkpointer(self.directory.name) as checkpointer:
+            self.step()
+            self.assertEqual(checkpointer.checkpoint(self.population), 1)
+        self.assert_restored()
+
+    def test_write_errors_are_raised(self):
+        checkpointer = Checkpointer(self.directory.name)
+        # Node keys that do not fit into a record fail on the background thread.
+        genome = self.population.genomes[self.population.alive[0]]
+        genome.nodes[1 << 40] = NodeGene(1 << 40, 0.0, Activations.TANH, Aggregations.SUM)
+        genome.version += 1
+        checkpointer.checkpoint(self.population)
+        with self.assertRaises(ValueError):
+            checkpointer.wait()
+        checkpointer.close()
+
+    def test_checkpoints_after_a_write_error_start_over_from_a_full_one(self):
+        """
+        A delta queued after a failed write is dropped, and the next checkpoint is full and replays correctly
+        """
+        checkpointer = Checkpointer(self.directory.name, full_every=10)
+        write, release = checkpointer._write, threading.Event()
+
+        def failing_write(capture):
+            if capture.index == 1:
+                release.wait()
+                raise OSError("disk full")
+            write(capture)
+        checkpointer._write = failing_write
+        checkpointer.checkpoint(self.population)
+        self.step()
+        checkpointer.checkpoint(self.population)
+        self.step()
+        checkpointer.checkpoint(self.population)
+        release.set()
+        with self.assertRaises(OSError):
+            checkpointer.wait()
+        self.assertEqual(checkpointer.dropped, 1)
+        self.assertEqual(_indices(self.directory.name), [0])
+
+        self.step()
+        checkpointer.checkpoint(self.population)
+        self.step()
+        checkpointer.checkpoint(self.population)
+        checkpointer.close()
+        self.assertEqual(_indices(self.directory.name), [3, 4])
+        self.assert_restored()
+
+    def test_replay_without_checkpoint(self):
+        with self.assertRaises(FileNotFoundError):
+            replay(self.directory.name)
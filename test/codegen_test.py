@@ -0,0 +1,70 @@
+from src.genome import Genome
+from src.nn.codegen import GeneratedNetwork, create_generated_network, generate_source
+from src.nn.network import FeedForwardNetwork, RecurrentNetwork
+from src.functions.aggregations import Aggregations
+from util import add_node, bare_genome, configure, connect, wired_genome
+import random
+import unittest
+
+class TestGeneratedNetwork(unittest.TestCase):
+    def setUp(self) -> None:
+        configure(self, num_inputs=3, num_outputs=2)
+
+    def test_matches_generic_evaluator(self):
+        """
+        Generated code computes bit-identical outputs to the generic evaluator for every function
+        """
+        rng = random.Random(0)
+        for _ in range(200):
+            genome = wired_genome(rng, rng.randint(0, 8))
+            generic, generated = FeedForwardNetwork.create(genome), GeneratedNetwork.create(genome)
+            for _ in range(3):
+                inputs = [rng.gauss(0, 1) for _ in Genome.INPUT_KEYS]
+                self.assertEqual(generated.activate(inputs), generic.activate(inputs), generate_source(generated))
+
+    def test_wide_fan_in_compiles(self):
+        """
+        Nodes with thousands of sources compile and match the generic evaluator
+        """
+        configure(self, num_inputs=3000, num_outputs=3)
+        rng = random.Random(5)
+        genome = bare_genome()
+        for key, aggregation in enumerate((Aggregations.SUM, Aggregations.PRODUCT, Aggregations.MEAN)):
+            add_node(genome, key, aggregation=aggregation)
+            for a in Genome.INPUT_KEYS:
+                connect(genome, a, key, rng.uniform(0.99, 1.01))
+        inputs = [rng.uniform(0.99, 1.01) for _ in Genome.INPUT_KEYS]
+        self.assertEqual(GeneratedNetwork.create(genome).activate(inputs), FeedForwardNetwork.create(genome).activate(inputs))
+
+    def test_same_structure_shares_code(self):
+        rng = random.Random(1)
+        genome = wired_genome(rng, 4)
+        first = GeneratedNetwork.create(genome)
+        misses, hits = GeneratedNetwork.code_cache.misses, GeneratedNetwork.code_cache.hits
+        for cg in genome.connections.values():
+            cg.weight += 1.0
+        second = GeneratedNetwork.create(genome)
+        self.assertEqual((GeneratedNetwork.code_cache.misses, GeneratedNetwork.code_cache.hits), (misses, hits + 1))
+        self.assertIs(first.activate.__code__, second.activate.__code__)
+        inputs = [0.1, 0.2, 0.3]
+        self.assertEqual(second.activate(inputs), FeedForwardNetwork.create(genome).activate(inputs))
+
+    def test_update_rebinds_parameters_and_structure(self):
+        rng = random.Random(2)
+        genome = wired_genome(rng, 3)
+        net = GeneratedNetwork.create(genome)
+        genome.nodes[0].bias = 5.0
+        connect(genome, -1, 0, 0.5) if (-1, 0) not in genome.connections else None
+        net.update(genome, {0})
+        inputs = [0.4, -0.2, 1.0]
+        self.assertEqual(net.activate(inputs), FeedForwardNetwork.create(genome).activate(inputs))
+
+    def test_wrong_number_of_inputs_raises(self):
+        net = GeneratedNetwork.create(wired_genome(random.Random(3), 2))
+        self.assertRaises(RuntimeError, net.activate, [1.0])
+
+    def test_falls_back_on_cycles(self):
+        genome = wired_genome(random.Random(4), 2)
+        connect(genome, 0, 2, 1.0)
+        connect(genome, 2, 0, 1.0)
+        self.assertIsInstance(create_generated_network(genome), RecurrentNetwork)
@@ -0,0 +1,76 @@
+from src.config import Config
+from src.functions.activations import Activations
+from src.functions.aggregations import Aggregations
+import numpy as np
+import os
+import tempfile
+import unittest
+
+class TestConfig(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_precomputed_values(self):
+        config = Config(num_inputs=3, num_outputs=2, connection_add_prob=0.5, node_delete_prob=0.1)
+        np.testing.assert_array_equal(config.input_keys, [-1, -2, -3])
+        np.testing.assert_array_equal(config.output_keys, [0, 1])
+        self.assertEqual(config.input_key_set, {-1, -2, -3})
+        self.assertEqual(config.output_key_set, {0, 1})
+        np.testing.assert_array_equal(config.structural_chances.ravel(), [0.5, 0.0, 0.0, 0.1])
+        self.assertEqual([f.id for f in config.activation_table], list(range(len(Activations.registry))))
+        self.assertIs(config.aggregation_table[Aggregations.MEAN.id], Aggregations.MEAN)
+        with self.assertRaises(ValueError):
+            config.input_keys[0] = 5
+
+    def test_config_is_frozen(self):
+        config = Config()
+        with self.assertRaises(AttributeError):
+            config.node_add_prob = 0.5
+        self.assertEqual(config, Config())
+        self.assertEqual(hash(config), hash(Config()))
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            Config(weight_mutation_chance=1.5)
+        with self.assertRaises(ValueError):
+            Config(num_inputs=0)
+        with self.assertRaises(ValueError):
+            Config(compatibility_disjoint_coefficient=-1)
+        with self.assertRaises(TypeError):
+            Config(num_outputs=2.0)
+        with self.assertRaises(ValueError):
+            Config.from_dict({"pop_size": 100})
+
+    def test_neat_python_ini(self):
+        path = self.write("config.ini", "[NEAT]\npop_size = 150\n\n"
+                                        "[DefaultGenome]\nnum_inputs = 4\nnum_outputs = 2\nconn_add_prob = 0.5\n"
+                                        "weight_mutate_rate = 0.8\nfeed_forward = True\n\n"
+                                        "[DefaultSpeciesSet]\ncompatibility_threshold = 2.5\n")
+        config = Config.from_file(path)
+        self.assertEqual((config.num_inputs, config.num_outputs), (4, 2))
+        self.assertEqual(config.compatibility_threshold, 2.5)
+        self.assertEqual((config.connection_add_prob, config.weight_mutation_chance), (0.5, 0.8))
+
+    def test_unknown_option_in_own_section(self):
+        path = self.write("config.ini", "[Genome]\nnum_inputs = 4\nfeed_forward = True\n")
+        with self.assertRaises(ValueError):
+            Config.from_file(path)
+        path = self.write("config.ini", "[Genome]\nnum_inputs = four\n")
+        with self.assertRaises(ValueError):
+            Config.from_file(path)
+
+    def test_toml(self):
+        path = self.write("config.toml", "[Genome]\nnum_inputs = 5\nnode_add_prob = 0.25\nbias_mutation_chance = 1\n")
+        config = Config.from_file(path)
+        self.assertEqual(config.num_inputs, 5)
+        self.assertEqual(config.node_add_prob, 0.25)
+        self.assertIsInstance(config.bias_mutation_chance, float)
@@ -0,0 +1,43 @@
+from src.distance_cache import DistanceCache
+from src.genome import Genome
+import unittest
+
+class TestDistanceCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = DistanceCache(maxsize=2)
+        self.g1, self.g2, self.g3 = Genome(), Genome(), Genome()
+
+    def test_key_is_symmetric(self):
+        self.assertEqual(DistanceCache.key(self.g1, self.g2), DistanceCache.key(self.g2, self.g1))
+
+    def test_hits_and_misses_are_counted(self):
+        key = DistanceCache.key(self.g1, self.g2)
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, 0.5)
+        self.assertEqual(self.cache.get(key), 0.5)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(self.cache.hit_rate, 0.5)
+
+    def test_version_bump_invalidates(self):
+        """
+        A mutated genome no longer hits the distances of its previous state
+        """
+        self.cache.put(DistanceCache.key(self.g1, self.g2), 0.5)
+        self.g1.version += 1
+        self.assertIsNone(self.cache.get(DistanceCache.key(self.g1, self.g2)))
+
+    def test_least_recently_used_is_evicted(self):
+        k12 = DistanceCache.key(self.g1, self.g2)
+        k13 = DistanceCache.key(self.g1, self.g3)
+        k23 = DistanceCache.key(self.g2, self.g3)
+        self.cache.put(k12, 1.0)
+        self.cache.put(k13, 2.0)
+        self.cache.get(k12)
+        self.cache.put(k23, 3.0)
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertIsNone(self.cache.get(k13))
+        self.assertEqual(self.cache.get(k12), 1.0)
+
+    def test_invalid_size_raises(self):
+        self.assertRaises(ValueError, DistanceCache, 0)
@@ -0,0 +1,94 @@
+from src.environment import SpatialGrid
+import numpy as np
+import unittest
+
+class TestSpatialGrid(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rng = np.random.default_rng(0)
+        self.grid = SpatialGrid(100.0, 60.0, 7.0)
+        self.positions = self.rng.random((300, 2)) * [100.0, 60.0]
+        self.grid.insert(np.arange(300), self.positions)
+
+    def brute_force(self, points, radius, exclude=None):
+        distances = np.linalg.norm(points[:, None, :] - self.grid.positions[None, :, :], axis=2)
+        within = (distances <= radius) & self.grid.active[None, :]
+        if exclude is not None:
+            within[np.arange(len(points)), exclude] = False
+        return distances, within
+
+    def test_within_matches_brute_force(self):
+        points = self.rng.random((50, 2)) * [120.0, 80.0] - 10.0
+        for radius in (3.0, 7.0, 20.0):
+            queries, ids, distances = self.grid.within(points, radius)
+            expected, within = self.brute_force(points, radius)
+            self.assertEqual(sorted(zip(queries.tolist(), ids.tolist())), sorted(zip(*map(np.ndarray.tolist, np.nonzero(within)))))
+            np.testing.assert_allclose(distances, expected[queries, ids])
+
+    def test_fine_grid_matches_brute_force(self):
+        """
+        Grids of more cells than fit into the radix-sorted cell indices are indexed the same
+        """
+        self.grid = SpatialGrid(100.0, 60.0, 0.2)
+        self.assertGreater(self.grid.columns * self.grid.rows, 1 << 16)
+        self.grid.insert(np.arange(300), self.positions)
+        points = self.positions[:50]
+        queries, ids, _ = self.grid.within(points, 5.0)
+        _, within = self.brute_force(points, 5.0)
+        self.assertEqual(sorted(zip(queries.tolist(), ids.tolist())), sorted(zip(*map(np.ndarray.tolist, np.nonzero(within)))))
+
+    def test_nearest_matches_brute_force(self):
+        exclude = np.arange(40)
+        ids, distances = self.grid.nearest(self.positions[:40], 5, 10.0, exclude)
+        expected, within = self.brute_force(self.positions[:40], 10.0, exclude)
+        for i in range(40):
+            candidates = np.flatnonzero(within[i])
+            candidates = candidates[np.argsort(expected[i, candidates], kind="stable")][:5]
+            self.assertEqual(ids[i, :len(candidates)].tolist(), candidates.tolist())
+            self.assertTrue(np.all(ids[i, len(candidates):] == -1))
+            self.assertTrue(np.all(np.isinf(distances[i, len(candidates):])))
+
+    def test_moves_and_removals_update_the_index(self):
+        self.grid.nearest(self.positions[:1], 1, 5.0)
+        rebuilds = self.grid.rebuilds
+        # Moving within a cell does not rebuild the index.
+        cell = self.grid.cell_of(self.positions[:1])[0]
+        self.grid.move([0], self.grid.positions[[0]])
+        self.grid.nearest(self.positions[:1], 1, 5.0)
+        self.assertEqual(self.grid.rebuilds, rebuilds)
+
+        self.grid.move([0], [[50.0, 30.0]])
+        self.grid.remove([1, 2])
+        self.assertEqual(len(self.grid), 298)
+        self.assertNotEqual(self.grid.cell_of(np.array([[50.0, 30.0]]))[0], cell)
+        ids, _ = self.grid.nearest([[50.0, 30.0]], 1, 1.0)
+        self.assertEqual(ids[0, 0], 0)
+        _, ids, _ = self.grid.within(self.positions[1:3], 0.0)
+        self.assertNotIn(1, ids.tolist())
+        self.assertNotIn(2, ids.tolist())
+        # Removed ids cannot be moved back into the index.
+        self.assertRaises(ValueError, self.grid.move, [0, 1], [[1.0, 1.0], [2.0, 2.0]])
+        self.assertEqual(self.grid.cells[1], -1)
+        self.assertEqual(len(self.grid), 298)
+
+    def test_insert_grows_and_rejects_active_ids(self):
+        self.grid.insert([1000], [[1.0, 1.0]])
+        self.assertEqual(len(self.grid), 301)
+        self.assertRaises(ValueError, self.grid.insert, [1000], [[2.0, 2.0]])
+        self.assertRaises(ValueError, self.grid.remove, [999])
+
+    def test_sense_writes_into_input_columns(self):
+        grid = SpatialGrid(10.0, 10.0, 2.0)
+        grid.insert([0, 1, 2], [[5.0, 5.0], [6.0, 5.0], [5.0, 3.0]])
+        inputs = np.full((2, 8), 7.0)
+        ids = grid.sense([[5.0, 5.0], [0.0, 9.0]], 2, 4.0, inputs[:, 1:7], exclude=np.array([0, -1]))
+        self.assertEqual(ids.tolist(), [[1, 2], [-1, -1]])
+        np.testing.assert_allclose(inputs[0], [7.0, 0.25, 0.0, 0.75, 0.0, -0.5, 0.5, 7.0])
+        np.testing.assert_allclose(inputs[1], [7.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 7.0])
+        self.assertRaises(ValueError, grid.sense, [[5.0, 5.0]], 2, 4.0, inputs[:1, :5])
+        self.assertRaises(ValueError, grid.sense, [[5.0, 5.0]], 2, 0.0, inputs[:1, :6])
+
+    def test_empty_grid(self):
+        grid = SpatialGrid(10.0, 10.0, 2.0)
+        ids, distances = grid.nearest([[1.0, 1.0]], 3, 5.0)
+        self.assertEqual(ids.tolist(), [[-1, -1, -1]])
+        self.assertRaises(ValueError, SpatialGrid, 10.0, 10.0, 0.0)
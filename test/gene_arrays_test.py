@@ -0,0 +1,172 @@
+from src.gene import NodeGene, ConnectionGene, crossover_genes
+from src.functions.activations import Activations
+from src.gene_arrays import GeneArrays, GenomeStore, distance_matrix, draw_mutations, other_function
+from util import make_genome, random_genes
+import numpy as np
+import random
+import unittest
+
+def reference_distance(genes1: tuple[dict, dict], genes2: tuple[dict, dict]) -> float:
+    """
+    The per-gene dict walk Genome.distance used to do, with the node component fixed.
+    """
+    distance = 0.0
+    for d1, d2 in zip(genes1, genes2):
+        if d1 or d2:
+            homologous = sum(g.distance(d2[k]) for k, g in d1.items() if k in d2)
+            disjoint = sum(1 for k in d1 if k not in d2) + sum(1 for k in d2 if k not in d1)
+            distance += (homologous + disjoint) / max(len(d1), len(d2))
+    return distance
+
+class TestGeneArrays(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(11)
+        self.genes = [random_genes(rng) for _ in range(30)]
+        self.arrays = [GeneArrays.create(*g) for g in self.genes]
+
+    def test_arrays_are_sorted(self):
+        for arrays in self.arrays:
+            self.assertTrue(np.all(np.diff(arrays.node_keys) > 0))
+            self.assertTrue(np.all(np.diff(arrays.connection_keys) > 0))
+
+    def test_distance_matches_reference(self):
+        """
+        Array distance matches walking the gene dicts
+        """
+        for g1, a1 in zip(self.genes, self.arrays):
+            for g2, a2 in zip(self.genes, self.arrays):
+                self.assertAlmostEqual(a1.distance(a2, 1, 1), reference_distance(g1, g2))
+
+    def test_distance_to_self_is_zero(self):
+        for arrays in self.arrays:
+            self.assertEqual(arrays.distance(arrays, 1, 1), 0.0)
+
+    def test_distance_matrix_matches_pairwise(self):
+        """
+        The distance matrix holds the pairwise distances
+        """
+        matrix = distance_matrix(self.arrays, self.arrays[:7], 0.5, 2.0)
+        self.assertEqual(matrix.shape, (30, 7))
+        for i, a1 in enumerate(self.arrays):
+            for j, a2 in enumerate(self.arrays[:7]):
+                self.assertAlmostEqual(matrix[i, j], a1.distance(a2, 0.5, 2.0))
+
+    def test_distance_matrix_of_empty_lists(self):
+        self.assertEqual(distance_matrix([], self.arrays, 1, 1).shape, (0, 30))
+
+    def test_genes_round_trip(self):
+        """
+        Genes rebuilt from the arrays equal the original genes
+        """
+        for (nodes, connections), arrays in zip(self.genes, self.arrays):
+            rebuilt_nodes, rebuilt_connections = arrays.genes()
+            self.assertEqual(set(rebuilt_nodes), set(nodes))
+            self.assertEqual(set(rebuilt_connections), set(connections))
+            for key, ng in nodes.items():
+                self.assertEqual(ng.distance(rebuilt_nodes[key]), 0)
+            for key, cg in connections.items():
+                self.assertEqual(cg.distance(rebuilt_connections[key]), 0)
+
+    def test_crossover_inherits_from_parents(self):
+        """
+        Offspring keep every homologous gene, take each attribute from one parent, and have no dangling connections
+        """
+        random.seed(1)
+        for a, b in zip(self.arrays, self.arrays[1:]):
+            child = GeneArrays.crossover(a, b)
+            self.assertTrue(np.all(np.diff(child.node_keys) > 0))
+            self.assertTrue(np.all(np.diff(child.connection_keys) > 0))
+            self.assertTrue(set(np.intersect1d(a.node_keys, b.node_keys)) <= set(child.node_keys))
+            self.assertTrue(set(np.intersect1d(a.connection_keys, b.connection_keys)) <= set(child.connection_keys))
+            nodes, connections = child.genes()
+            for from_key, to_key in connections:
+                self.assertIn(from_key, nodes)
+                self.assertIn(to_key, nodes)
+            for fields, keys in ((GeneArrays.NODE_FIELDS, child.node_keys), (GeneArrays.CONNECTION_FIELDS, child.connection_keys)):
+                for name in fields[1:]:
+                    for key, value in zip(keys, getattr(child, name)):
+                        parents = [getattr(p, name)[np.searchsorted(getattr(p, fields[0]), key)]
+                                   for p in (a, b) if key in getattr(p, fields[0])]
+                        self.assertIn(value, parents)
+
+    def test_dict_crossover_matches_array_crossover(self):
+        """
+        Crossing over gene dicts keeps the same genes and has no dangling connections either
+        """
+        random.seed(2)
+        for (n1, c1), (n2, c2) in zip(self.genes, self.genes[1:]):
+            nodes, connections = crossover_genes(n1, c1, n2, c2)
+            self.assertTrue((n1.keys() & n2.keys()) <= nodes.keys() <= (n1.keys() | n2.keys()))
+            self.assertTrue((c1.keys() & c2.keys()) <= connections.keys() <= (c1.keys() | c2.keys()))
+            for (from_key, to_key), cg in connections.items():
+                self.assertIs(cg._from, nodes[from_key])
+                self.assertIs(cg._to, nodes[to_key])
+                self.assertIn(cg.weight, [c[cg.key].weight for c in (c1, c2) if cg.key in c])
+
+    def test_crossover_with_self_is_identity(self):
+        for arrays in self.arrays:
+            self.assertEqual(GeneArrays.crossover(arrays, arrays).distance(arrays, 1, 1), 0.0)
+
+class TestMutation(unittest.TestCase):
+    CHANCES = ((NodeGene, "BIAS_MUTATION_CHANCE", 0.2), (NodeGene, "ACTIVATION_FUNCTION_MUTATION_CHANCE", 0.1),
+               (NodeGene, "AGGREGATION_FUNCTION_MUTATION_CHANCE", 0.05), (NodeGene, "RESPONSE_FUNCTION_MUTATION_CHANCE", 0.3),
+               (ConnectionGene, "WEIGHT_MUTATION_CHANCE", 0.4), (ConnectionGene, "ENABLED_MUTATION_CHANCE", 0.15))
+
+    def setUp(self) -> None:
+        for cls, name, chance in TestMutation.CHANCES:
+            self.addCleanup(setattr, cls, name, getattr(cls, name))
+            setattr(cls, name, chance)
+        rng = random.Random(4)
+        self.store = GenomeStore.pack([make_genome(*random_genes(rng)) for i in range(200)])
+
+    def test_mutation_rates_match_chances(self):
+        """
+        Every field mutates at the chance set on its gene class
+        """
+        before = GeneArrays(*(getattr(self.store.genes, name).copy() for name in GeneArrays.FIELDS))
+        self.store.mutate(np.random.default_rng(0))
+        genes = self.store.genes
+        for (_, _, chance), changed in zip(TestMutation.CHANCES, (
+                genes.node_bias != before.node_bias, genes.node_activation != before.node_activation,
+                genes.node_aggregation != before.node_aggregation, genes.node_response != before.node_response,
+                genes.connection_weight != before.connection_weight, genes.connection_enabled != before.connection_enabled)):
+            self.assertAlmostEqual(changed.mean(), chance, delta=4 * np.sqrt(chance * (1 - chance) / len(changed)))
+        np.testing.assert_array_equal(genes.node_keys, before.node_keys)
+        self.assertTrue(np.all(genes.node_activation < len(Activations.registry)))
+
+    def test_same_seed_same_mutations(self):
+        mutations = [draw_mutations(np.random.default_rng(3), 500, 800) for _ in range(2)]
+        for name in mutations[0]:
+            for a, b in zip(mutations[0][name], mutations[1][name]):
+                np.testing.assert_array_equal(a, b)
+
+    def test_other_function_excludes_current(self):
+        current = np.full(1000, 3, dtype=np.uint8)
+        draw = np.random.default_rng(0).integers(0, len(Activations.registry) - 1, size=1000)
+        ids = other_function(draw, current)
+        self.assertNotIn(3, ids)
+        self.assertEqual(set(ids.tolist()), set(range(len(Activations.registry))) - {3})
+
+class TestGenomeStore(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(5)
+        self.genomes = [make_genome(*random_genes(rng)) for i in range(20)]
+        self.store = GenomeStore.pack(self.genomes)
+
+    def test_views_match_per_genome_arrays(self):
+        """
+        Every stored genome reads back as its own sorted gene arrays
+        """
+        self.assertEqual(len(self.store), 20)
+        for i, genome in enumerate(self.genomes):
+            expected = GeneArrays.create(genome.nodes, genome.connections)
+            view = self.store.gene_arrays(i)
+            for name in GeneArrays.FIELDS:
+                np.testing.assert_array_equal(getattr(view, name), getattr(expected, name))
+
+    def test_store_is_compact(self):
+        self.assertEqual(self.store.nbytes, sum(GeneArrays.create(g.nodes, g.connections).nbytes for g in self.genomes)
+                         + self.store.keys.nbytes + self.store.node_offsets.nbytes + self.store.connection_offsets.nbytes)
+
+    def test_empty_store(self):
+        self.assertEqual(len(GenomeStore.pack([])), 0)
@@ -0,0 +1,107 @@
+from src.config import Config
+from src.gene import NodeGene, ConnectionGene
+from src.gene_arrays import GenomeStore
+from src.genome import Genome
+from src.innovation import InnovationTracker
+from src.nn.network import create_network
+from src.nn.plan import PlanCache
+from src.rng import RandomStream
+from src.serialization import Snapshot, write_snapshot
+import os
+import tempfile
+import unittest
+
+class TestGenome(unittest.TestCase):
+    def setUp(self) -> None:
+        Genome.configure(Config(num_inputs=3, num_outputs=2, connection_add_prob=0.5, connection_delete_prob=0.05,
+                                node_add_prob=0.2, node_delete_prob=0.05, bias_mutation_chance=0.3,
+                                activation_mutation_chance=0.05, aggregation_mutation_chance=0.05,
+                                response_mutation_chance=0.1, weight_mutation_chance=0.8, enabled_mutation_chance=0.02))
+
+    def tearDown(self) -> None:
+        Genome.configure(Config())
+
+    def evolve(self, seed: int) -> list[Genome]:
+        rng = RandomStream(seed)
+        genomes = [Genome(rng=rng) for _ in range(10)]
+        for _ in range(15):
+            for genome in genomes:
+                genome.mutate(rng)
+            Genome.mutate_population(genomes, rng)
+            genomes = [Genome.crossover(genomes[i], genomes[i - 1], rng) for i in range(len(genomes))]
+        return genomes
+
+    def test_configure_sets_pins_and_chances(self):
+        genome = Genome()
+        self.assertEqual(sorted(genome.nodes), [-3, -2, -1, 0, 1])
+        self.assertEqual(NodeGene.BIAS_MUTATION_CHANCE, 0.3)
+        self.assertEqual(ConnectionGene.WEIGHT_MUTATION_CHANCE, 0.8)
+
+    def test_evolution_keeps_pins(self):
+        """
+        Mutation and crossover never delete input or output pins, and every genome stays activatable
+        """
+        for genome in self.evolve(0):
+            self.assertTrue({-3, -2, -1, 0, 1} <= genome.nodes.keys())
+            self.assertEqual(len(genome.activate([0.1, 0.2, 0.3])), 2)
+
+    def test_to_bytes_round_trip(self):
+        for genome in self.evolve(1):
+            restored = Genome.from_bytes(genome.to_bytes())
+            self.assertEqual(restored.distance(genome), 0)
+            self.assertEqual(restored.size(), genome.size())
+
+    def test_loaded_genomes_keep_innovation_numbering(self):
+        """
+        Splits after loading into a fresh tracker never hand out a node key a loaded genome already uses
+        """
+        genomes = self.evolve(4)
+        self.assertTrue(any(key > 1 for genome in genomes for key in genome.nodes))
+        store = GenomeStore.pack(genomes)
+        self.addCleanup(setattr, Genome, "innovations", Genome.innovations)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "population.snapshot")
+            write_snapshot(path, store)
+
+            def from_snapshot() -> list[Genome]:
+                with Snapshot(path) as snapshot:
+                    return list(snapshot)
+            loaders = {
+                "from_bytes": lambda: [Genome.from_bytes(genome.to_bytes()) for genome in genomes],
+                "snapshot": from_snapshot,
+                "store": lambda: [store.genome(i) for i in range(len(store))],
+            }
+            for name, load in loaders.items():
+                Genome.innovations = InnovationTracker()
+                loaded = load()
+                used = {key for genome in loaded for key in genome.nodes}
+                for genome in loaded:
+                    for cg in genome.connections.values():
+                        self.assertNotIn(genome.get_new_node_key(cg), used, name)
+
+    def test_plan_cache_matches_compiled_networks(self):
+        genomes = self.evolve(2)
+        Genome.plan_cache = PlanCache()
+        try:
+            planned = [Genome.plan_cache.create_network(g).activate([0.1, 0.2, 0.3]) for g in genomes + genomes]
+        finally:
+            Genome.plan_cache = None
+        self.assertEqual(planned, [create_network(g).activate([0.1, 0.2, 0.3]) for g in genomes + genomes])
+
+    def test_synced_network_follows_mutations(self):
+        """
+        A network patched after every mutation gives the same outputs as one compiled from scratch
+        """
+        rng = RandomStream(3)
+        genomes = [Genome(rng=rng) for _ in range(10)]
+        for step in range(20):
+            if step % 2:
+                Genome.mutate_population(genomes, rng)
+            else:
+                for genome in genomes:
+                    genome.mutate(rng)
+            for genome in genomes:
+                genome.activate([0.1, 0.2, 0.3])
+                # Recurrent networks carry their state over from the previous activation.
+                genome.network.reset()
+                self.assertEqual(genome.activate([0.1, 0.2, 0.3]), create_network(genome).activate([0.1, 0.2, 0.3]))
@@ -0,0 +1,45 @@
+from src.innovation import InnovationTracker
+import unittest
+
+class TestInnovationTracker(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tracker = InnovationTracker(window=2, next_key=5)
+
+    def test_same_split_same_key(self):
+        """
+        Splitting the same connection in different genomes yields the same node key
+        """
+        key = self.tracker.node_key((-1, 0))
+        self.assertEqual(key, 5)
+        self.assertEqual(self.tracker.node_key((-1, 0)), key)
+        self.assertNotEqual(self.tracker.node_key((-2, 0)), key)
+        self.assertEqual((self.tracker.hits, self.tracker.misses), (1, 2))
+
+    def test_reserve_skips_keys(self):
+        self.tracker.reserve(9)
+        self.assertEqual(self.tracker.node_key((-1, 0)), 10)
+        self.tracker.reserve(3)
+        self.assertEqual(self.tracker.new_node_key(), 11)
+
+    def test_unseen_splits_are_evicted(self):
+        """
+        A split is forgotten once it was not seen for longer than the window, and gets a fresh key afterwards
+        """
+        old = self.tracker.node_key((-1, 0))
+        recent = self.tracker.node_key((-2, 0))
+        self.tracker.advance(2)
+        self.assertEqual(self.tracker.node_key((-2, 0)), recent)
+        self.tracker.advance()
+        self.assertEqual(len(self.tracker), 1)
+        self.assertEqual(self.tracker.evictions, 1)
+        self.assertEqual(self.tracker.node_key((-2, 0)), recent)
+        self.assertNotEqual(self.tracker.node_key((-1, 0)), old)
+
+    def test_no_window_never_evicts(self):
+        tracker = InnovationTracker()
+        key = tracker.node_key((-1, 0))
+        tracker.advance(1000)
+        self.assertEqual(tracker.node_key((-1, 0)), key)
+
+    def test_negative_window_raises(self):
+        self.assertRaises(ValueError, InnovationTracker, -1)
@@ -0,0 +1,30 @@
+from src.lru import LRUCache
+import unittest
+
+class TestLRUCache(unittest.TestCase):
+    def test_least_recently_used_is_evicted(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual(cache.stats(), {"size": 2, "maxsize": 2, "hits": 3, "misses": 1, "evictions": 1, "hit_rate": 0.75})
+
+    def test_lowered_maxsize_applies_on_next_put(self):
+        cache = LRUCache(maxsize=3)
+        for key in "abc":
+            cache.put(key, key)
+        cache.maxsize = 1
+        cache.put("d", "d")
+        self.assertEqual(list(cache.entries), ["d"])
+        self.assertEqual(cache.evictions, 3)
+
+    def test_clear_and_invalid_size(self):
+        cache = LRUCache(maxsize=1)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.hit_rate), (0, 0, 0.0))
+        self.assertRaises(ValueError, LRUCache, 0)
@@ -0,0 +1,223 @@
+from src.functions.activations import Activations
+from src.genome import Genome
+from src.nn.network import FeedForwardNetwork, RecurrentNetwork, create_network, required_for_output, topological_order
+from util import add_node, bare_genome, configure, connect
+import random
+import unittest
+
+class TestFeedForwardNetwork(unittest.TestCase):
+    def setUp(self) -> None:
+        configure(self, num_inputs=2, num_outputs=1)
+        self.genome = bare_genome()
+        add_node(self.genome, 1)
+        connect(self.genome, -1, 1, 2.0)
+        connect(self.genome, 1, 0, 0.5)
+        connect(self.genome, -2, 0, -1.0)
+
+    def test_activate_matches_hand_computation(self):
+        """
+        Activation propagates the inputs through the compiled plan
+        """
+        net = FeedForwardNetwork.create(self.genome)
+        self.assertEqual(net.activate([3.0, 1.0]), [3.0 * 2.0 * 0.5 - 1.0])
+
+    def test_disabled_connections_are_ignored(self):
+        """
+        Disabled connections do not contribute to the output
+        """
+        self.genome.connections[(-2, 0)].enabled = False
+        net = FeedForwardNetwork.create(self.genome)
+        self.assertEqual(net.activate([3.0, 1.0]), [3.0])
+
+    def test_nodes_not_feeding_an_output_are_pruned(self):
+        """
+        Hidden nodes that do not feed an output are not part of the plan
+        """
+        add_node(self.genome, 2)
+        connect(self.genome, -1, 2, 1.0)
+        net = FeedForwardNetwork.create(self.genome)
+        self.assertNotIn(2, net.node_keys)
+        self.assertIn(1, net.node_keys)
+
+    def test_plan_is_topologically_sorted(self):
+        """
+        Every node is evaluated after the nodes feeding it
+        """
+        add_node(self.genome, 2)
+        self.genome.connections[(1, 0)].enabled = False
+        connect(self.genome, 1, 2, 1.0)
+        connect(self.genome, 2, 0, 1.0)
+        net = FeedForwardNetwork.create(self.genome)
+        order = [net.node_keys[e[0]] for e in net.node_evals]
+        self.assertEqual(order, [1, 2, 0])
+
+    def test_cycle_raises(self):
+        """
+        Compiling a genome with a cycle in its enabled connections fails
+        """
+        connect(self.genome, 0, 1, 1.0)
+        self.assertRaises(ValueError, FeedForwardNetwork.create, self.genome)
+
+    def test_wrong_number_of_inputs_raises(self):
+        net = FeedForwardNetwork.create(self.genome)
+        self.assertRaises(RuntimeError, net.activate, [1.0])
+
+    def test_required_for_output(self):
+        connections = [(-1, 1), (1, 0), (-1, 2), (3, 2)]
+        self.assertEqual(required_for_output([-1], [0], connections), {0, 1})
+
+    def test_topological_order(self):
+        connections = [(-1, 2), (2, 1), (1, 0), (2, 0)]
+        self.assertEqual(topological_order({0, 1, 2}, connections), [2, 1, 0])
+
+class TestRecurrentNetwork(unittest.TestCase):
+    def setUp(self) -> None:
+        configure(self, num_inputs=2, num_outputs=1)
+        self.genome = bare_genome()
+        connect(self.genome, -1, 0, 1.0)
+        connect(self.genome, 0, 0, 0.5)
+
+    def test_state_carries_over_between_steps(self):
+        """
+        Every step reads the node values of the previous step
+        """
+        net = RecurrentNetwork.create(self.genome)
+        self.assertEqual(net.step([1.0, 0.0]), [1.0])
+        self.assertEqual(net.step([1.0, 0.0]), [1.5])
+        self.assertEqual(net.step([1.0, 0.0]), [1.75])
+
+    def test_reset_clears_state(self):
+        net = RecurrentNetwork.create(self.genome)
+        net.step([1.0, 0.0])
+        net.step([1.0, 0.0])
+        net.reset()
+        self.assertEqual(net.step([1.0, 0.0]), [1.0])
+
+    def test_create_network_falls_back_on_cycles(self):
+        """
+        Genomes with a cycle compile to a recurrent network, others to a feed-forward one
+        """
+        self.assertIsInstance(create_network(self.genome), RecurrentNetwork)
+        self.genome.connections[(0, 0)].enabled = False
+        self.assertIsInstance(create_network(self.genome), FeedForwardNetwork)
+
+class TestIncrementalUpdate(unittest.TestCase):
+    def setUp(self) -> None:
+        configure(self, num_inputs=2, num_outputs=1)
+        self.genome = bare_genome()
+        add_node(self.genome, 1, activation=Activations.TANH)
+        connect(self.genome, -1, 1, 2.0)
+        connect(self.genome, 1, 0, 0.5)
+        connect(self.genome, -2, 0, -1.0)
+        self.net = FeedForwardNetwork.create(self.genome)
+
+    def assert_in_sync(self, inputs=(0.3, -0.7)):
+        self.assertEqual(self.net.activate(list(inputs)), FeedForwardNetwork.create(self.genome).activate(list(inputs)))
+
+    def test_weight_change_is_patched_without_reordering(self):
+        """
+        Weight-only changes rebuild the entries of the dirty nodes but keep the evaluation order
+        """
+        order = list(self.net.order)
+        self.genome.connections[(1, 0)].weight = 3.0
+        self.genome.nodes[1].bias = 0.25
+        self.net.update(self.genome, {0, 1})
+        self.assertEqual(self.net.order, order)
+        self.assert_in_sync()
+
+        entry = self.net.node_evals[self.net.order.index(1)]
+        self.genome.connections[(-2, 0)].weight = 0.5
+        self.net.update(self.genome, {0})
+        self.assertIs(self.net.node_evals[self.net.order.index(1)], entry)
+        self.assert_in_sync()
+
+    def test_split_connection_is_patched(self):
+        """
+        Splitting a connection adds the new node before its target
+        """
+        add_node(self.genome, 2, activation=Activations.SIGMOID)
+        self.genome.connections[(1, 0)].enabled = False
+        connect(self.genome, 1, 2, 1.0)
+        connect(self.genome, 2, 0, 0.5)
+        self.net.update(self.genome, {0, 2})
+        self.assertLess(self.net.order.index(2), self.net.order.index(0))
+        self.assert_in_sync()
+
+    def test_backward_connection_reorders(self):
+        """
+        A new connection against the current evaluation order moves the nodes it connects
+        """
+        add_node(self.genome, 2)
+        add_node(self.genome, 3)
+        connect(self.genome, -1, 2, 1.0)
+        connect(self.genome, 2, 0, 1.0)
+        connect(self.genome, -2, 3, 1.0)
+        connect(self.genome, 3, 0, 1.0)
+        self.net = FeedForwardNetwork.create(self.genome)
+        connect(self.genome, 3, 1, 1.5)
+        connect(self.genome, 1, 2, 1.5)
+        self.net.update(self.genome, {1, 2})
+        order = self.net.order
+        self.assertLess(order.index(3), order.index(1))
+        self.assertLess(order.index(1), order.index(2))
+        self.assert_in_sync()
+
+    def test_deleted_node_frees_its_slot(self):
+        del self.genome.connections[(-1, 1)]
+        del self.genome.connections[(1, 0)]
+        del self.genome.nodes[1]
+        self.net.update(self.genome, {0, 1})
+        self.assertNotIn(1, self.net.order)
+        self.assert_in_sync()
+
+    def test_cycle_raises(self):
+        connect(self.genome, 0, 1, 1.0)
+        self.assertRaises(ValueError, self.net.update, self.genome, {1})
+
+    def test_random_edits_stay_in_sync(self):
+        """
+        Random structural edits patched one at a time give the same outputs as compiling from scratch
+        """
+        rng = random.Random(3)
+        rank = [1]
+        for step in range(200):
+            dirty = set()
+            enabled = [cg for cg in self.genome.connections.values() if cg.enabled]
+            choice = rng.random()
+            if choice < 0.3 and enabled:
+                # Split a connection, keeping the new node between its ends in `rank`.
+                cg = rng.choice(enabled)
+                key = 100 + step
+                a, b = cg.key
+                rank.insert(rank.index(b) if b in rank else len(rank), key)
+                add_node(self.genome, key, bias=rng.gauss(0, 1), activation=Activations.TANH)
+                cg.enabled = False
+                connect(self.genome, a, key, 1.0)
+                connect(self.genome, key, b, cg.weight)
+                dirty |= {key, b}
+            elif choice < 0.6:
+                # Connect two nodes forward in `rank`.
+                a = rng.choice(Genome.INPUT_KEYS + rank)
+                later = rank[rank.index(a) + 1:] if a in rank else rank
+                b = rng.choice(later + Genome.OUTPUT_KEYS)
+                if (a, b) not in self.genome.connections:
+                    connect(self.genome, a, b, rng.gauss(0, 1))
+                    dirty.add(b)
+            elif choice < 0.8 and self.genome.connections:
+                key = rng.choice(list(self.genome.connections))
+                self.genome.connections[key].enabled = not self.genome.connections[key].enabled
+                dirty.add(key[1])
+            elif rank:
+                key = rng.choice(rank)
+                rank.remove(key)
+                for ck in [ck for ck in self.genome.connections if key in ck]:
+                    del self.genome.connections[ck]
+                    dirty.add(ck[1])
+                del self.genome.nodes[key]
+                dirty.add(key)
+            for cg in self.genome.connections.values():
+                cg.weight += rng.gauss(0, 0.1)
+                dirty.add(cg.key[1])
+
+            self.net.update(self.genome, dirty)
+            self.assert_in_sync((rng.gauss(0, 1), rng.gauss(0, 1)))
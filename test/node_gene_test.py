@@ -1,7 +1,8 @@
 
-from src.gene import Gene, NodeGene
+from src.gene import Gene, NodeGene, ConnectionGene
 from src.functions.activations import Activations
 from src.functions.aggregations import Aggregations
+import random
 import unittest
 
 class TestNodeGene(unittest.TestCase):
@@ -55,6 +56,26 @@ class TestNodeGene(TestNodeGene):
         self.assertEqual(self.node_gene.aggregation, original_aggregation)
         self.assertEqual(self.node_gene.response, original_response)
 
+    def test_zero_chance_never_mutates(self):
+        """
+        A chance of 0 never mutates, even on a draw of exactly 0.0, like the vectorized `draw_mutations`
+        """
+        class ZeroRandom(random.Random):
+            def random(self) -> float:
+                return 0.0
+
+        NodeGene.BIAS_MUTATION_CHANCE = 0
+        NodeGene.ACTIVATION_FUNCTION_MUTATION_CHANCE = 0
+        NodeGene.AGGREGATION_FUNCTION_MUTATION_CHANCE = 0
+        NodeGene.RESPONSE_FUNCTION_MUTATION_CHANCE = 0
+        self.assertFalse(self.node_gene.mutate(ZeroRandom()))
+        connection = ConnectionGene(self.node_gene, NodeGene(2), 0.5)
+        self.addCleanup(setattr, ConnectionGene, "WEIGHT_MUTATION_CHANCE", ConnectionGene.WEIGHT_MUTATION_CHANCE)
+        self.addCleanup(setattr, ConnectionGene, "ENABLED_MUTATION_CHANCE", ConnectionGene.ENABLED_MUTATION_CHANCE)
+        ConnectionGene.WEIGHT_MUTATION_CHANCE = ConnectionGene.ENABLED_MUTATION_CHANCE = 0
+        self.assertFalse(connection.mutate(ZeroRandom()))
+        self.assertEqual((connection.weight, connection.enabled), (0.5, True))
+
     def test_node_gene_initializes_with_specified_values(self):
         """
         NodeGene initializes with specified values for bias, activation, aggregation, and response
@@ -0,0 +1,50 @@
+from src.nn.network import FeedForwardNetwork
+from src.nn.batch import BatchNetwork
+from src.nn.parallel import ParallelBatchNetwork
+from util import configure, wired_genome
+import numpy as np
+import random
+import unittest
+
+class TestParallelBatchNetwork(unittest.TestCase):
+    def setUp(self) -> None:
+        configure(self, num_inputs=3, num_outputs=2)
+        rng = random.Random(3)
+        self.genomes = [wired_genome(rng, rng.randint(0, 6)) for _ in range(40)]
+        self.inputs = np.random.default_rng(3).normal(size=(len(self.genomes), 3))
+        self.batch = ParallelBatchNetwork.create(self.genomes, 3)
+        self.addCleanup(self.batch.close)
+
+    def test_matches_batch(self):
+        """
+        Activating the shards in worker processes matches activating a single batch
+        """
+        expected = BatchNetwork.create(self.genomes).activate(self.inputs)
+        np.testing.assert_array_equal(self.batch.activate(self.inputs), expected)
+        self.assertEqual(self.batch.bounds[0], 0)
+        self.assertEqual(self.batch.bounds[-1], len(self.genomes))
+
+    def test_update_reuses_shared_memory(self):
+        """
+        Replacing the networks by fewer ones keeps the shared blocks
+        """
+        names = [block.name for block in self.batch.blocks] + [self.batch.io.name]
+        genomes = self.genomes[5:30]
+        self.batch.update([FeedForwardNetwork.create(genome) for genome in genomes])
+        self.assertEqual([block.name for block in self.batch.blocks] + [self.batch.io.name], names)
+        expected = BatchNetwork.create(genomes).activate(self.inputs[5:30])
+        np.testing.assert_array_equal(self.batch.activate(self.inputs[5:30]), expected)
+
+    def test_update_grows_shared_memory(self):
+        genomes = self.genomes * 20
+        inputs = np.tile(self.inputs, (20, 1))
+        self.batch.update([FeedForwardNetwork.create(genome) for genome in genomes])
+        np.testing.assert_array_equal(self.batch.activate(inputs), BatchNetwork.create(genomes).activate(inputs))
+
+    def test_more_workers_than_networks(self):
+        with ParallelBatchNetwork.create(self.genomes[:2], 4) as batch:
+            expected = BatchNetwork.create(self.genomes[:2]).activate(self.inputs[:2])
+            np.testing.assert_array_equal(batch.activate(self.inputs[:2]), expected)
+
+    def test_wrong_input_shape_raises(self):
+        self.assertRaises(RuntimeError, self.batch.activate, self.inputs[:, :2])
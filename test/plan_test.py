@@ -0,0 +1,130 @@
+from src.gene import NodeGene
+from src.functions.activations import Activations
+from src.genome import Genome
+from src.nn.codegen import GeneratedNetwork
+from src.nn.network import FeedForwardNetwork, RecurrentNetwork
+from src.nn.plan import EvaluationPlan, PlanCache, structure_hash
+from util import configure, connect, make_genome, wired_genome
+import random
+import unittest
+
+def offspring(genome: Genome, rng: random.Random, reorder: bool = False) -> Genome:
+    """
+    A copy with the same structure and new parameters, with the genes in reverse order if `reorder`.
+    """
+    child = make_genome({key: NodeGene(key, rng.gauss(0, 1), ng.activation, ng.aggregation, rng.gauss(1, 0.5))
+                         for key, ng in genome.nodes.items()}, {})
+    for (a, b), cg in (reversed(genome.connections.items()) if reorder else genome.connections.items()):
+        connect(child, a, b, rng.gauss(0, 1), cg.enabled)
+    return child
+
+class TestStructureHash(unittest.TestCase):
+    def setUp(self) -> None:
+        configure(self, num_inputs=3, num_outputs=2)
+        self.rng = random.Random(0)
+        self.genome = wired_genome(self.rng, 4)
+
+    def test_parameters_do_not_change_the_hash(self):
+        """
+        Offspring with new weights, biases and responses and reordered gene dicts share the hash
+        """
+        self.assertEqual(structure_hash(offspring(self.genome, self.rng, reorder=True)), structure_hash(self.genome))
+
+    def test_structure_changes_the_hash(self):
+        before = structure_hash(self.genome)
+        cg = next(iter(self.genome.connections.values()))
+        cg.enabled = not cg.enabled
+        self.genome.version += 1
+        self.assertNotEqual(structure_hash(self.genome), before)
+        cg.enabled = not cg.enabled
+        self.genome.nodes[0].activation = Activations.ID if self.genome.nodes[0].activation is not Activations.ID else Activations.ABS
+        self.genome.version += 1
+        self.assertNotEqual(structure_hash(self.genome), before)
+
+    def test_disabled_connections_do_not_change_the_hash(self):
+        before = structure_hash(self.genome)
+        if (-1, 0) not in self.genome.connections:
+            connect(self.genome, -1, 0, 1.0, enabled=False)
+            self.genome.version += 1
+            self.assertEqual(structure_hash(self.genome), before)
+
+class TestEvaluationPlan(unittest.TestCase):
+    def setUp(self) -> None:
+        configure(self, num_inputs=3, num_outputs=2)
+
+    def test_networks_match_compiled_networks(self):
+        """
+        Networks built from the plan of a parent match the networks compiled from the offspring
+        """
+        rng = random.Random(1)
+        for _ in range(100):
+            parent = wired_genome(rng, rng.randint(0, 6))
+            plan = EvaluationPlan.create(parent)
+            child = offspring(parent, rng)
+            for planned, compiled in ((plan.network(child), FeedForwardNetwork.create(child)),
+                                      (plan.network(child, generate=True), FeedForwardNetwork.create(child))):
+                inputs = [rng.gauss(0, 1) for _ in Genome.INPUT_KEYS]
+                self.assertEqual(planned.activate(inputs), compiled.activate(inputs))
+
+    def test_generated_networks(self):
+        genome = wired_genome(random.Random(2), 3)
+        self.assertIsInstance(EvaluationPlan.create(genome).network(genome, generate=True), GeneratedNetwork)
+
+    def test_cycles_are_planned_as_recurrent_networks(self):
+        rng = random.Random(3)
+        genome = wired_genome(rng, 2)
+        connect(genome, 0, 2, 1.0)
+        connect(genome, 2, 0, 1.0)
+        genome.version += 1
+        plan = EvaluationPlan.create(genome)
+        self.assertTrue(plan.recurrent)
+        planned, compiled = plan.network(genome, generate=True), RecurrentNetwork.create(genome)
+        self.assertIsInstance(planned, RecurrentNetwork)
+        for _ in range(3):
+            inputs = [rng.gauss(0, 1) for _ in Genome.INPUT_KEYS]
+            self.assertEqual(planned.step(inputs), compiled.step(inputs))
+
+    def test_networks_do_not_share_state(self):
+        genome = wired_genome(random.Random(4), 3)
+        plan = EvaluationPlan.create(genome)
+        first, second = plan.network(genome), plan.network(genome)
+        self.assertIsNot(first.node_keys, second.node_keys)
+        self.assertIsNot(first.values, second.values)
+
+class TestPlanCache(unittest.TestCase):
+    def setUp(self) -> None:
+        configure(self, num_inputs=3, num_outputs=2)
+
+    def test_offspring_hit_the_plan_of_their_parent(self):
+        rng = random.Random(5)
+        cache = PlanCache()
+        parent = wired_genome(rng, 4)
+        cache.create_network(parent)
+        child = offspring(parent, rng)
+        network = cache.create_network(child)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate, 0.5)
+        inputs = [0.1, 0.2, 0.3]
+        self.assertEqual(network.activate(inputs), FeedForwardNetwork.create(child).activate(inputs))
+
+    def test_least_recently_used_is_evicted(self):
+        rng = random.Random(6)
+        cache = PlanCache(maxsize=2)
+        g1, g2, g3 = wired_genome(rng, 1), wired_genome(rng, 2), wired_genome(rng, 3)
+        cache.plan(g1)
+        cache.plan(g2)
+        cache.plan(g1)
+        cache.plan(g3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertIsNone(cache.get(structure_hash(g2)))
+        self.assertIsNotNone(cache.get(structure_hash(g1)))
+
+    def test_clear_resets_counters(self):
+        cache = PlanCache()
+        cache.plan(wired_genome(random.Random(7), 1))
+        cache.clear()
+        self.assertEqual(cache.stats(), {"size": 0, "maxsize": 10_000, "hits": 0, "misses": 0, "evictions": 0, "hit_rate": 0.0})
+
+    def test_invalid_size_raises(self):
+        self.assertRaises(ValueError, PlanCache, 0)
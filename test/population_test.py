@@ -0,0 +1,107 @@
+from src.genome import Genome
+from src.population import RealTimePopulation
+from util import wired_genome
+import random
+import unittest
+
+class StubSpeciesSet:
+    def __init__(self) -> None:
+        self.assigned = set()
+
+    def assign(self, genome) -> None:
+        self.assigned.add(genome.key)
+
+    def remove(self, genome) -> None:
+        self.assigned.remove(genome.key)
+
+class TestRealTimePopulation(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(3)
+        self.population = RealTimePopulation([wired_genome(random.Random(i), i) for i in range(5)], energy=1.0)
+
+    def check_consistency(self):
+        population = self.population
+        self.assertEqual(len(population.alive), len(set(population.alive)))
+        self.assertEqual(sorted(population.alive), population.alive_mask.nonzero()[0].tolist())
+        for position, slot in enumerate(population.alive):
+            self.assertEqual(population.alive_position[slot], position)
+            self.assertIsNotNone(population.genomes[slot])
+        self.assertEqual(len(population.alive) + len(population.free_slots), len(population.genomes))
+
+    def test_remove_recycles_slot(self):
+        genome = self.population.genomes[2]
+        self.assertIs(self.population.remove(2), genome)
+        self.assertEqual(len(self.population), 4)
+        self.assertEqual(self.population.add(Genome(), 1.0), 2)
+        self.check_consistency()
+
+    def test_founders_survive_the_first_update(self):
+        """
+        By default founders start with positive energy, and a population that would die at once is rejected
+        """
+        population = RealTimePopulation([Genome() for _ in range(4)])
+        self.assertEqual(population.update(), ([], []))
+        self.assertEqual(len(population), 4)
+        self.assertTrue(all(population.energy[population.alive] > 0))
+        self.assertRaises(ValueError, RealTimePopulation, [Genome()], 0.0)
+        self.assertEqual(len(RealTimePopulation(energy=0.0)), 0)
+
+    def test_remove_dead_slot_raises(self):
+        self.population.remove(0)
+        with self.assertRaises(ValueError):
+            self.population.remove(0)
+
+    def test_update_reproduces_and_kills(self):
+        """
+        Agents over the threshold split their energy with an offspring, agents without energy die
+        """
+        population = self.population
+        population.energy[0] = population.REPRODUCTION_THRESHOLD
+        population.energy[1] = 0.0
+        births, deaths = population.update()
+        self.assertEqual(deaths, [1])
+        self.assertEqual(len(births), 1)
+        self.assertEqual(population.energy[0], population.REPRODUCTION_THRESHOLD / 2)
+        self.assertEqual(population.energy[births[0]], population.REPRODUCTION_THRESHOLD / 2)
+        self.assertEqual(population.genomes[births[0]].version, 1)
+        self.assertEqual((population.births, population.deaths), (1, 1))
+        self.check_consistency()
+
+    def test_mate_is_compatible(self):
+        population = self.population
+        population.energy[:] = population.REPRODUCTION_THRESHOLD
+        for _ in range(50):
+            mate = population.select_mate(0)
+            self.assertTrue(mate is None or (mate != 0 and population.genomes[mate].distance(population.genomes[0]) < Genome.compatibility_threshold))
+
+    def test_no_mate_without_energy(self):
+        """
+        Candidates without energy are never accepted
+        """
+        self.population.energy[1:] = 0.0
+        self.assertIsNone(self.population.select_mate(0))
+
+    def test_random_churn_stays_consistent(self):
+        population = self.population
+        for _ in range(300):
+            population.energy[population.alive] += [random.uniform(-3, 3) for _ in population.alive]
+            population.update()
+            if not population.alive:
+                population.add(Genome(), 1.0)
+        self.check_consistency()
+
+    def test_deferred_speciation(self):
+        """
+        Deferred agents are only assigned by assign_species, and removing a queued agent drops it from the queue
+        """
+        species = StubSpeciesSet()
+        population = RealTimePopulation([Genome() for _ in range(3)], energy=1.0, species=species)
+        population.defer_speciation = True
+        slots = [population.add(Genome(), 1.0) for _ in range(4)]
+        self.assertEqual(len(species.assigned), 3)
+        population.remove(slots[0])
+        self.assertEqual(population.assign_species(2), 2)
+        self.assertEqual(len(species.assigned), 5)
+        self.assertEqual(population.assign_species(), 1)
+        self.assertEqual(species.assigned, {g.key for g in population.genomes if g is not None})
+        self.assertEqual(population.unassigned, {})
@@ -0,0 +1,135 @@
+from src.config import Config
+from src.genome import Genome
+from src.nn.network import FeedForwardNetwork, RecurrentNetwork
+from src.profiling import OPERATIONS, Histogram, Profiler, size_bucket, size_bucket_label
+from src.rng import RandomStream
+import json
+import os
+import tempfile
+import unittest
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self) -> None:
+        Genome.configure(Config(num_inputs=3, num_outputs=2, connection_add_prob=0.5, node_add_prob=0.2,
+                                weight_mutation_chance=0.8))
+        self.rng = RandomStream(0)
+        self.genomes = [Genome(rng=self.rng) for _ in range(6)]
+        self.originals = {name: owner.__dict__[attribute] for name, (owner, attribute) in OPERATIONS.items()}
+
+    def tearDown(self) -> None:
+        if Profiler.active is not None:
+            Profiler.active.disable()
+        Genome.configure(Config())
+
+    def run_generation(self) -> None:
+        for genome in self.genomes:
+            genome.mutate(self.rng)
+            genome.activate([1.0, 0.5, -0.5])
+        self.genomes[0].distance(self.genomes[1])
+        self.genomes.append(Genome.crossover(self.genomes[0], self.genomes[1], self.rng))
+
+    def test_disabled_profiler_leaves_operations_untouched(self):
+        """
+        Nothing is patched before enabling, and disabling restores the original functions
+        """
+        profiler = Profiler()
+        self.run_generation()
+        self.assertEqual(profiler.stats(), {})
+        with profiler:
+            self.assertIsNot(Genome.__dict__["activate"], self.originals["activate"])
+            self.assertIsInstance(Genome.__dict__["crossover"], classmethod)
+            self.assertIsInstance(RecurrentNetwork.__dict__["create"], staticmethod)
+        for name, (owner, attribute) in OPERATIONS.items():
+            self.assertIs(owner.__dict__[attribute], self.originals[name])
+        self.assertFalse(profiler.enabled)
+
+    def test_counts_and_times_calls(self):
+        with Profiler() as profiler:
+            self.run_generation()
+        stats = profiler.stats()
+        self.assertEqual(stats["mutate"]["count"], 6)
+        self.assertEqual(stats["activate"]["count"], 6)
+        self.assertEqual(stats["sync_network"]["count"], 6)
+        self.assertEqual(stats["distance"]["count"], 1)
+        self.assertEqual(stats["crossover"]["count"], 1)
+        self.assertEqual(stats["create_feed_forward"]["count"], 6)
+        self.assertGreater(stats["mutate"]["seconds"], 0.0)
+        self.assertEqual(stats["mutate"]["histogram"]["+Inf"], 6)
+        self.assertEqual(stats["mutate"]["sampled"], {})
+        self.run_generation()
+        self.assertEqual(profiler.stats()["mutate"]["count"], 6)
+        with profiler:
+            profiler.reset()
+            self.assertEqual(profiler.stats(), {})
+            self.run_generation()
+        self.assertEqual(profiler.stats()["mutate"]["histogram"]["+Inf"], len(self.genomes) - 1)
+
+    def test_operations_still_work_when_enabled(self):
+        rng = RandomStream(1)
+        genomes = [Genome(rng=rng) for _ in range(2)]
+        for genome in genomes:
+            genome.mutate(rng)
+        child = Genome.crossover(genomes[0], genomes[1], rng)
+        expected = child.activate([1.0, 2.0, 3.0])
+        with Profiler(sample_every=1):
+            self.assertIsInstance(Genome.crossover(genomes[0], genomes[1], RandomStream(2)), Genome)
+            self.assertIsInstance(FeedForwardNetwork.create(child), FeedForwardNetwork)
+            child.network, child.network_version = None, -1
+            self.assertEqual(child.activate([1.0, 2.0, 3.0]), expected)
+            empty = Genome()
+            empty.nodes = {}
+            self.assertRaises(ValueError, empty.mutate_add_connection, rng)
+
+    def test_sampling_attributes_time_to_size_buckets(self):
+        with Profiler(sample_every=2) as profiler:
+            for _ in range(3):
+                self.run_generation()
+        mutate = profiler.stats()["mutate"]
+        sampled = sum(bucket["count"] for bucket in mutate["sampled"].values())
+        self.assertEqual(sampled, mutate["count"] // 2)
+        self.assertLessEqual(sum(bucket["seconds"] for bucket in mutate["sampled"].values()), mutate["seconds"])
+
+    def test_sampling_finds_genomes_passed_by_keyword(self):
+        with Profiler(sample_every=1) as profiler:
+            child = Genome.crossover(nn1=self.genomes[0], nn2=self.genomes[1], rng=self.rng)
+            FeedForwardNetwork.create(genome=child)
+            Genome.mutate(self=child, rng=self.rng)
+        stats = profiler.stats()
+        for name in ("crossover", "create_feed_forward", "mutate"):
+            self.assertEqual(sum(bucket["count"] for bucket in stats[name]["sampled"].values()), 1, name)
+
+    def test_size_buckets(self):
+        self.assertEqual([size_bucket(n) for n in (0, 1, 2, 3, 4, 7, 8)], [0, 1, 2, 2, 3, 3, 4])
+        self.assertEqual([size_bucket_label(b) for b in (0, 1, 2, 4)], ["0", "1", "2-3", "8-15"])
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram()
+        for elapsed in (5e-7, 1e-6, 3e-3, 2.0):
+            histogram.record(elapsed)
+        counts = histogram.to_dict()["histogram"]
+        self.assertEqual((counts["1e-06"], counts["0.005"], counts["1"], counts["+Inf"]), (2, 3, 3, 4))
+
+    def test_dump_json_and_prometheus(self):
+        with Profiler(sample_every=1) as profiler:
+            self.run_generation()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.json")
+            profiler.dump(path)
+            with open(path) as f:
+                data = json.load(f)
+            self.assertEqual(data["operations"]["mutate"]["count"], 6)
+
+            path = os.path.join(directory, "profile.prom")
+            profiler.dump(path, format="prometheus")
+            with open(path) as f:
+                text = f.read()
+            self.assertFalse(os.path.exists(path + ".tmp"))
+            self.assertRaises(ValueError, profiler.dump, path, "csv")
+        self.assertIn('neat_operation_seconds_count{operation="mutate"} 6\n', text)
+        self.assertIn('neat_operation_seconds_bucket{operation="mutate",le="+Inf"} 6\n', text)
+        self.assertIn('neat_operation_sampled_calls_total{operation="mutate",connections="0"}', text)
+
+    def test_only_one_profiler_is_enabled(self):
+        with Profiler():
+            self.assertRaises(ValueError, Profiler().enable)
+        self.assertRaises(ValueError, Profiler, 0)
@@ -0,0 +1,47 @@
+from src.functions.activations import Activations
+from src.functions.aggregations import Aggregations
+from src.functions.registry import Function
+import pickle
+import unittest
+
+class TestFunctionRegistry(unittest.TestCase):
+    def test_ids_index_the_registry(self):
+        """
+        Every registered function sits at its id in the dispatch table
+        """
+        for registry in (Activations.registry, Aggregations.registry):
+            for i, f in enumerate(registry):
+                self.assertEqual(f.id, i)
+                self.assertIs(registry[f.id], f)
+
+    def test_ids_are_stable(self):
+        self.assertEqual(Activations.TANH.id, 0)
+        self.assertEqual(Activations.SIGMOID.id, 1)
+        self.assertEqual(Aggregations.SUM.id, 1)
+
+    def test_every_aggregation_is_valid(self):
+        for f in (Aggregations.SUM, Aggregations.PRODUCT, Aggregations.MAX, Aggregations.MIN,
+                  Aggregations.MAX_ABS, Aggregations.MEDIAN, Aggregations.MEAN):
+            self.assertTrue(Aggregations.is_valid_aggregation(f))
+
+    def test_resolve_scalar_implementation(self):
+        self.assertIs(Activations.resolve(Activations.sigmoid_activation), Activations.SIGMOID)
+        self.assertIs(Activations.resolve(Activations.SIGMOID), Activations.SIGMOID)
+
+    def test_resolve_unknown_function_raises(self):
+        self.assertRaises(ValueError, Activations.resolve, abs)
+        self.assertRaises(ValueError, Activations.resolve, Aggregations.SUM)
+        self.assertFalse(Activations.is_valid_activation(abs))
+
+    def test_get_random_excludes(self):
+        for _ in range(100):
+            f = Aggregations.get_random(exclude=Aggregations.SUM)
+            self.assertIsInstance(f, Function)
+            self.assertIsNot(f, Aggregations.SUM)
+
+    def test_call_runs_scalar_implementation(self):
+        self.assertEqual(Activations.RELU(-1.0), 0.0)
+        self.assertEqual(Aggregations.SUM([1.0, 2.0]), 3.0)
+
+    def test_pickle_keeps_identity(self):
+        self.assertIs(pickle.loads(pickle.dumps(Activations.GAUSS)), Activations.GAUSS)
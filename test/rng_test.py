@@ -0,0 +1,71 @@
+from concurrent.futures import ProcessPoolExecutor
+from src.gene import crossover_genes
+from src.gene_arrays import GeneArrays
+from src.rng import RandomStream
+from util import random_genes
+import numpy as np
+import pickle
+import random
+import unittest
+
+def mutate_shard(arrays: GeneArrays, rng: RandomStream) -> GeneArrays:
+    arrays.mutate(rng.numpy)
+    return arrays
+
+class TestRandomStream(unittest.TestCase):
+    def test_same_seed_same_numbers(self):
+        a, b = RandomStream(42), RandomStream(42)
+        self.assertEqual([a.random() for _ in range(5)], [b.random() for _ in range(5)])
+        np.testing.assert_array_equal(a.numpy.random(5), b.numpy.random(5))
+        self.assertNotEqual(RandomStream(43).random(), RandomStream(42).random())
+
+    def test_spawn_is_independent_of_draws(self):
+        """
+        Spawned streams only depend on the seed and on the streams spawned before
+        """
+        a, b = RandomStream(7), RandomStream(7)
+        a.random()
+        a.numpy.random(10)
+        for x, y in zip(a.spawn(3), b.spawn(3)):
+            self.assertEqual(x.getrandbits(64), y.getrandbits(64))
+        children = a.spawn(2)
+        self.assertNotEqual(children[0].getrandbits(64), children[1].getrandbits(64))
+
+    def test_pickle_keeps_state(self):
+        rng = RandomStream(3)
+        rng.random()
+        rng.numpy.random()
+        copy = pickle.loads(pickle.dumps(rng))
+        self.assertEqual(copy.random(), rng.random())
+        self.assertEqual(copy.numpy.random(), rng.numpy.random())
+        self.assertEqual(copy.spawn(1)[0].random(), rng.spawn(1)[0].random())
+
+    def test_genes_follow_the_stream(self):
+        """
+        Gene construction, mutation and crossover draw only from the given stream
+        """
+        results = []
+        for _ in range(2):
+            rng = RandomStream(11)
+            random.seed(rng.getrandbits(32)) # Must not matter.
+            nodes, connections = random_genes(rng)
+            for gene in (*nodes.values(), *connections.values()):
+                gene.mutate(rng)
+            child = crossover_genes(nodes, connections, *random_genes(rng), rng)
+            arrays = GeneArrays.crossover(GeneArrays.create(nodes, connections), GeneArrays.create(*child), rng)
+            results.append(arrays)
+        for name, array in results[0].__dict__.items():
+            np.testing.assert_array_equal(array, getattr(results[1], name))
+
+    def test_parallel_matches_serial(self):
+        """
+        Mutating shards in worker processes with spawned streams gives bit-identical genes to a serial run
+        """
+        setup = random.Random(0)
+        shards = [GeneArrays.create(*random_genes(setup, 20, 60)) for _ in range(4)]
+        serial = [mutate_shard(pickle.loads(pickle.dumps(shard)), rng) for shard, rng in zip(shards, RandomStream(5).spawn(4))]
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            parallel = list(executor.map(mutate_shard, shards, RandomStream(5).spawn(4)))
+        for a, b in zip(serial, parallel):
+            for name, array in a.__dict__.items():
+                np.testing.assert_array_equal(array, getattr(b, name))
@@ -0,0 +1,99 @@
+from src.checkpoint import Checkpointer, replay
+from src.config import Config
+from src.genome import Genome
+from src.population import RealTimePopulation
+from src.rng import RandomStream
+from src.runner import RealTimeRunner
+from src.speciation import SpeciesSet
+from src.world import World
+import asyncio
+import os
+import tempfile
+import unittest
+
+class TestRealTimeRunner(unittest.TestCase):
+    def setUp(self) -> None:
+        Genome.configure(Config(num_inputs=World.NUM_INPUTS, num_outputs=World.NUM_OUTPUTS, connection_add_prob=0.5,
+                                node_add_prob=0.2, weight_mutation_chance=0.8))
+        rng = RandomStream(0)
+        genomes = [Genome(rng=rng) for _ in range(20)]
+        for genome in genomes:
+            genome.mutate(rng)
+        self.species = SpeciesSet()
+        self.population = RealTimePopulation(genomes, energy=9.0, species=self.species, rng=rng)
+        self.world = World(self.population, 30.0, 30.0, 100, rng=rng)
+
+    def tearDown(self) -> None:
+        Genome.configure(Config())
+
+    def check_speciated(self):
+        self.assertEqual(set(self.species.genome_to_species), {self.population.genomes[slot].key for slot in self.population.alive})
+        self.assertEqual(self.population.unassigned, {})
+        self.assertFalse(self.population.defer_speciation)
+
+    def test_runs_ticks_and_checkpoints(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with Checkpointer(os.path.join(directory, "checkpoints")) as checkpointer:
+                runner = RealTimeRunner(self.world, tick_rate=1000.0, checkpointer=checkpointer, checkpoint_every=5)
+                asyncio.run(runner.run(ticks=20))
+                checkpointer.wait()
+                self.assertEqual(runner.ticks, 20)
+                self.assertEqual(self.world.ticks, 20)
+                keys, _, _ = replay(os.path.join(directory, "checkpoints"))
+                self.assertTrue(keys)
+        self.check_speciated()
+        stats = runner.stats()
+        self.assertEqual(stats["ticks"], 20)
+        self.assertLessEqual(stats["tick_p50"], stats["tick_p99"])
+
+    def test_overrunning_ticks_defer_speciation(self):
+        """
+        With no time left in any tick, speciation is deferred for MAX_DEFERRAL ticks in a row, then the whole queue is assigned
+        """
+        runner = RealTimeRunner(self.world, tick_rate=1e9)
+        runner.MAX_DEFERRAL = 3
+        population = self.population
+        born, waits, limits = {}, [], []
+        add, assign_species = population.add, population.assign_species
+
+        def counted_add(genome, energy):
+            born[genome.key] = runner.ticks
+            return add(genome, energy)
+
+        def counted_assign_species(limit=None):
+            queued = list(population.unassigned)
+            count = assign_species(limit)
+            if runner._running:
+                limits.append(limit)
+                waits.extend(runner.ticks - born[key] for key in queued if key not in population.unassigned)
+            return count
+        population.add, population.assign_species = counted_add, counted_assign_species
+        population.energy[population.alive] = RealTimePopulation.REPRODUCTION_THRESHOLD
+        asyncio.run(runner.run(ticks=40))
+        self.assertEqual(runner.overruns, 40)
+        self.assertGreater(runner.deferrals["speciation"], 0)
+        self.assertEqual(set(limits), {None})
+        # Born during a tick, deferred on MAX_DEFERRAL ticks and assigned on the next one at the latest.
+        self.assertGreater(len(waits), 4 * len(limits))
+        self.assertLessEqual(max(waits), runner.MAX_DEFERRAL + 1)
+        self.check_speciated()
+
+    def test_other_coroutines_run_between_phases(self):
+        runner = RealTimeRunner(self.world, tick_rate=1000.0)
+        seen = []
+
+        async def viewer():
+            while runner.ticks < 5:
+                seen.append(runner.ticks)
+                await asyncio.sleep(0)
+            runner.stop()
+
+        async def main():
+            await asyncio.gather(runner.run(), viewer())
+        asyncio.run(main())
+        self.assertGreaterEqual(len(seen), 5 * 4)
+        self.assertGreaterEqual(runner.ticks, 5)
+
+    def test_invalid_arguments_raise(self):
+        self.assertRaises(ValueError, RealTimeRunner, self.world, 0.0)
+        self.assertRaises(ValueError, RealTimeRunner, self.world, checkpointer=object())
@@ -0,0 +1,86 @@
+from src.gene import NodeGene, ConnectionGene
+from src.functions.activations import Activations
+from src.functions.aggregations import Aggregations
+from src.gene_arrays import GeneArrays, GenomeStore
+from src.serialization import Snapshot, pack_genes, unpack_genes, write_snapshot, NODE_RECORD, CONNECTION_RECORD
+from util import make_genome, random_genes
+import numpy as np
+import os
+import random
+import tempfile
+import unittest
+
+def assert_genes_equal(a: GeneArrays, b: GeneArrays) -> None:
+    for name in GeneArrays.FIELDS:
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name))
+        assert getattr(a, name).dtype == getattr(b, name).dtype, name
+
+class TestGenes(unittest.TestCase):
+    def test_round_trip(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            arrays = GeneArrays.create(*random_genes(rng))
+            data = pack_genes(arrays)
+            self.assertEqual(len(data), 14 + NODE_RECORD.itemsize * len(arrays.node_keys)
+                             + CONNECTION_RECORD.itemsize * len(arrays.connection_keys))
+            assert_genes_equal(unpack_genes(data), arrays)
+
+    def test_negative_keys_survive(self):
+        nodes = {-2: NodeGene(-2, 0.5, Activations.TANH, Aggregations.SUM), 3: NodeGene(3, 0.0, Activations.RELU, Aggregations.MAX)}
+        cg = ConnectionGene(nodes[-2], nodes[3], -1.5, False)
+        arrays = unpack_genes(pack_genes(GeneArrays.create(nodes, {cg.key: cg})))
+        restored = arrays.genes()[1]
+        self.assertEqual(list(restored), [(-2, 3)])
+        self.assertEqual((restored[(-2, 3)].weight, restored[(-2, 3)].enabled), (-1.5, False))
+
+    def test_rejects_invalid_data(self):
+        data = pack_genes(GeneArrays.create(*random_genes(random.Random(1))))
+        with self.assertRaises(ValueError):
+            unpack_genes(data[:-1])
+        with self.assertRaises(ValueError):
+            unpack_genes(b"XXXX" + data[4:])
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(2)
+        self.genomes = [make_genome(*random_genes(rng)) for i in range(30)]
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "population.snapshot")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_genomes_read_back_lazily(self):
+        size = write_snapshot(self.path, GenomeStore.pack(self.genomes))
+        self.assertEqual(size, os.path.getsize(self.path))
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(len(snapshot), 30)
+            self.assertEqual(snapshot.keys.tolist(), [g.key for g in self.genomes])
+            for i in (29, 0, 17):
+                assert_genes_equal(snapshot.gene_arrays(i), self.genomes[i].gene_arrays())
+            arrays = snapshot.gene_arrays(5)
+        # Gene arrays are copies and outlive the mapping.
+        assert_genes_equal(arrays, self.genomes[5].gene_arrays())
+
+    def test_store_round_trip(self):
+        store = GenomeStore.pack(self.genomes)
+        write_snapshot(self.path, store)
+        with Snapshot(self.path) as snapshot:
+            restored = snapshot.store()
+        for name in ("keys", "node_offsets", "connection_offsets"):
+            np.testing.assert_array_equal(getattr(restored, name), getattr(store, name))
+        assert_genes_equal(restored.genes, store.genes)
+
+    def test_empty_population(self):
+        write_snapshot(self.path, GenomeStore.pack([]))
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(len(snapshot), 0)
+            self.assertEqual(len(snapshot.store()), 0)
+
+    def test_rejects_truncated_file(self):
+        write_snapshot(self.path, GenomeStore.pack(self.genomes))
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 8)
+        with self.assertRaises(ValueError):
+            Snapshot(self.path)
@@ -0,0 +1,87 @@
+from src.config import Config
+from src.genome import Genome
+from src.speciation import SpeciesSet
+from util import make_genome, random_genes
+import random
+import unittest
+
+class TestSpeciesSet(unittest.TestCase):
+    def setUp(self) -> None:
+        Genome.configure(Config(compatibility_threshold=1.5))
+        rng = random.Random(7)
+        self.genomes = [make_genome(*random_genes(rng)) for _ in range(60)]
+        self.species_set = SpeciesSet()
+
+    def tearDown(self) -> None:
+        Genome.configure(Config())
+
+    def test_assignment_matches_full_scan(self):
+        """
+        Newborns join a compatible species, and found one only if no representative is compatible
+        """
+        species_set = self.species_set
+        for genome in self.genomes:
+            compatible = [s for s in species_set.species.values() if genome.distance(s.representative) < Genome.compatibility_threshold]
+            before = len(species_set)
+            species, evaluations = species_set.assign(genome)
+            self.assertLessEqual(evaluations, before)
+            if compatible:
+                self.assertIn(species, compatible)
+                self.assertIn(genome.key, species.members)
+            else:
+                self.assertEqual(len(species_set), before + 1)
+                self.assertIs(species.representative, genome)
+        self.assertLess(species_set.evaluations, sum(range(len(self.genomes))))
+
+    def test_bounds_follow_the_configured_coefficient(self):
+        """
+        A lower disjoint coefficient lowers the bounds, so no compatible species is rejected by them
+        """
+        Genome.configure(Config(compatibility_disjoint_coefficient=0.25, compatibility_threshold=0.5))
+        species_set = self.species_set
+        for genome in self.genomes:
+            compatible = [s for s in species_set.species.values() if genome.distance(s.representative) < 0.5]
+            species, _ = species_set.assign(genome)
+            if compatible:
+                self.assertIn(species, compatible)
+            for bound, other in zip(species_set.lower_bounds(SpeciesSet._gene_counts(genome)), species_set._indexed):
+                self.assertLessEqual(bound, genome.distance(other.representative) + 1e-12)
+
+    def test_bounds_are_lower_bounds(self):
+        for genome in self.genomes:
+            self.species_set.assign(genome)
+        representatives = [s.representative for s in self.species_set._indexed]
+        for genome in self.genomes[:20]:
+            counts = len(genome.gene_arrays().node_keys), len(genome.gene_arrays().connection_keys)
+            for bound, representative in zip(self.species_set.lower_bounds(counts), representatives):
+                self.assertLessEqual(bound, genome.distance(representative) + 1e-12)
+
+    def test_representatives_are_refreshed_lazily(self):
+        """
+        A removed representative is replaced on the next assignment, and empty species are dropped
+        """
+        species_set = self.species_set
+        for genome in self.genomes:
+            species_set.assign(genome)
+        species = max(species_set.species.values(), key=len)
+        representative = species.representative
+        species_set.remove(representative)
+        self.assertIs(species.representative, representative)
+        species_set.assign(Genome())
+        self.assertIsNot(species.representative, representative)
+        self.assertIn(species.representative.key, species.members)
+
+        for genome in list(species.members.values()):
+            species_set.remove(genome)
+        species_set.assign(Genome())
+        self.assertNotIn(species.key, species_set.species)
+        self.assertEqual([s.index for s in species_set._indexed], list(range(len(species_set._indexed))))
+
+    def test_assign_twice_raises(self):
+        self.species_set.assign(self.genomes[0])
+        with self.assertRaises(ValueError):
+            self.species_set.assign(self.genomes[0])
+
+    def test_remove_unassigned_raises(self):
+        with self.assertRaises(ValueError):
+            self.species_set.remove(self.genomes[0])
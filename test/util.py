@@ -0,0 +1,94 @@
+"""
+Fixtures shared by the tests, like `benchmarks/util.py` for the benchmarks.
+
+All genomes are real `Genome`s over the pins of the current config, so a test building networks from
+them applies its own config with `configure`. Genes changed directly instead of through a mutation are
+not tracked by the genome: bump its `version` before relying on `gene_arrays()` again.
+"""
+from __future__ import annotations
+import random
+import unittest
+
+from src.config import Config
+from src.gene import NodeGene, ConnectionGene
+from src.genome import Genome
+from src.functions.activations import Activations
+from src.functions.aggregations import Aggregations
+
+
+def configure(test: unittest.TestCase, **options) -> None:
+    """
+    Apply a config with the given options to all genomes until the end of the test.
+    """
+    Genome.configure(Config(**options))
+    test.addCleanup(Genome.configure, Config())
+
+
+def make_genome(nodes: dict[int, NodeGene], connections: dict[tuple[int, int], ConnectionGene]) -> Genome:
+    """
+    Return a genome of exactly the given genes. Unlike the constructor, an empty genome stays empty.
+    """
+    genome = Genome(nodes, connections)
+    genome.nodes, genome.connections = nodes, connections
+    return genome
+
+
+def bare_genome() -> Genome:
+    """
+    Return a genome of identity pins without bias or connections, to be wired by hand with `add_node`
+    and `connect`.
+    """
+    genome = make_genome({}, {})
+    for key in Genome.INPUT_KEYS + Genome.OUTPUT_KEYS:
+        add_node(genome, key)
+    return genome
+
+
+def add_node(genome: Genome, key: int, bias: float = 0.0, activation=Activations.ID, aggregation=Aggregations.SUM,
+             response: float = 1.0) -> NodeGene:
+    genome.nodes[key] = NodeGene(key, bias, activation, aggregation, response)
+    return genome.nodes[key]
+
+
+def connect(genome: Genome, a: int, b: int, weight: float, enabled: bool = True) -> ConnectionGene:
+    cg = ConnectionGene(genome.nodes[a], genome.nodes[b], weight, enabled)
+    genome.connections[cg.key] = cg
+    return cg
+
+
+def wired_genome(rng: random.Random, num_hidden: int, connection_prob: float = 0.5, enabled_prob: float = 0.9,
+                 recurrent: bool = False) -> Genome:
+    """
+    Return a genome with `num_hidden` hidden nodes of random functions and parameters, connecting every
+    pair of nodes with `connection_prob`. Unless recurrent, connections only go from lower to higher rank
+    (inputs, hidden nodes, outputs), so that the genome stays acyclic.
+    """
+    hidden = list(range(len(Genome.OUTPUT_KEYS), len(Genome.OUTPUT_KEYS) + num_hidden))
+    rank = Genome.INPUT_KEYS + hidden + Genome.OUTPUT_KEYS
+    num_inputs = len(Genome.INPUT_KEYS)
+    genome = make_genome({}, {})
+    for key in Genome.INPUT_KEYS + Genome.OUTPUT_KEYS + hidden:
+        add_node(genome, key, rng.gauss(0, 1), rng.choice(Activations.registry.functions),
+                 rng.choice(Aggregations.registry.functions), rng.gauss(1, 0.5))
+    for i, a in enumerate(rank):
+        for b in rank[num_inputs if recurrent else max(i + 1, num_inputs):]:
+            if rng.random() < connection_prob:
+                connect(genome, a, b, rng.gauss(0, 1), rng.random() < enabled_prob)
+    return genome
+
+
+def random_genes(rng: random.Random, max_nodes: int = 12, max_connections: int = 20) -> tuple[dict, dict]:
+    """
+    Return up to `max_nodes` nodes with keys from -3 on and up to `max_connections` connections between
+    them, mixing exact and random parameters so that both equal and differing genes occur.
+    """
+    nodes = {}
+    for key in rng.sample(range(-3, max_nodes + 3), rng.randint(0, max_nodes)):
+        nodes[key] = NodeGene(key, rng.choice([0.0, 0.5, rng.gauss(0, 1)]), rng.choice([Activations.TANH, Activations.RELU]),
+                              rng.choice([Aggregations.SUM, Aggregations.MAX]), rng.choice([1.0, rng.gauss(1, 1)]))
+    connections = {}
+    keys = list(nodes)
+    for _ in range(rng.randint(0, max_connections) if keys else 0):
+        cg = ConnectionGene(nodes[rng.choice(keys)], nodes[rng.choice(keys)], rng.choice([0.5, rng.gauss(0, 1)]), rng.random() < 0.8)
+        connections[cg.key] = cg
+    return nodes, connections
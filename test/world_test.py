@@ -0,0 +1,81 @@
+from src.config import Config
+from src.genome import Genome
+from src.population import RealTimePopulation
+from src.rng import RandomStream
+from src.world import World
+import numpy as np
+import unittest
+
+class TestWorld(unittest.TestCase):
+    def setUp(self) -> None:
+        Genome.configure(Config(num_inputs=World.NUM_INPUTS, num_outputs=World.NUM_OUTPUTS, connection_add_prob=0.5,
+                                node_add_prob=0.2, weight_mutation_chance=0.8, bias_mutation_chance=0.3))
+        self.rng = RandomStream(0)
+        genomes = [Genome(rng=self.rng) for _ in range(30)]
+        for genome in genomes:
+            for _ in range(5):
+                genome.mutate(self.rng)
+        self.population = RealTimePopulation(genomes, energy=2.0, rng=self.rng)
+        self.world = World(self.population, 40.0, 30.0, 150, rng=self.rng)
+
+    def tearDown(self) -> None:
+        Genome.configure(Config())
+
+    def check_consistency(self):
+        world, population = self.world, self.population
+        self.assertEqual(np.flatnonzero(world.agents.active).tolist(), sorted(population.alive))
+        alive = np.array(population.alive, dtype=np.intp)
+        np.testing.assert_array_equal(world.agents.positions[alive], world.positions[alive])
+        self.assertTrue(np.all((world.positions[alive] >= 0.0) & (world.positions[alive] <= world.size)))
+
+    def test_steps_keep_world_and_population_consistent(self):
+        births = deaths = 0
+        for _ in range(200):
+            born, died = self.world.step()
+            births += len(born)
+            deaths += len(died)
+            self.check_consistency()
+        self.assertGreater(births, 0)
+        self.assertGreater(deaths, 0)
+        self.assertEqual((births, deaths), (self.population.births, self.population.deaths))
+        self.assertEqual(self.world.ticks, 200)
+        self.assertGreater(self.world.food_eaten, 0)
+
+    def test_sense_layout(self):
+        world = self.world
+        world.velocities[world.population.alive] = [0.5, -0.25]
+        world._sync_batch()
+        inputs = world.sense()
+        self.assertEqual(inputs.shape, (30, World.NUM_INPUTS))
+        np.testing.assert_allclose(inputs[:, -3], 0.2)
+        np.testing.assert_allclose(inputs[:, -2:], np.tile([0.5, -0.25], (30, 1)))
+        self.assertTrue(np.all((inputs[:, 2:-3:3] >= 0.0) & (inputs[:, 2:-3:3] <= 1.0)))
+
+    def test_eating_moves_food_and_adds_energy(self):
+        world, slot = self.world, self.population.alive[0]
+        world.positions[slot] = world.food_positions[0]
+        world.agents.move([slot], world.positions[[slot]])
+        world._sync_batch()
+        before = self.population.energy.copy()
+        world.feed(np.zeros(len(world.rows)))
+        self.assertAlmostEqual(self.population.energy[slot], before[slot] - World.BASE_DRAIN + World.FOOD_ENERGY)
+
+    def test_births_and_deaths_only_replace_their_rows(self):
+        self.world.step()
+        batch = self.world.batch
+        slot = self.population.alive[0]
+        self.population.energy[slot] = World.BASE_DRAIN
+        parent = self.population.alive[1]
+        self.population.energy[parent] = RealTimePopulation.REPRODUCTION_THRESHOLD
+        born, died = self.world.step()
+        self.assertEqual(died, [slot])
+        self.assertEqual(self.world.changed, set(born + died))
+        self.world.step()
+        self.assertIs(self.world.batch, batch)
+        self.assertFalse(np.isin(batch.layer.agents, died).any())
+        self.assertTrue(np.isin(born, batch.layer.agents).all())
+
+    def test_rejects_genomes_of_another_shape(self):
+        Genome.configure(Config(num_inputs=2, num_outputs=2))
+        world = World(RealTimePopulation([Genome()], energy=1.0), 10.0, 10.0, 5)
+        self.assertRaises(ValueError, world.step)